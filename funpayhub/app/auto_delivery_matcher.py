@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+
+__all__ = ['AutoDeliveryMatcher']
+
+
+from typing import TYPE_CHECKING, Any
+
+
+if TYPE_CHECKING:
+    from funpayhub.app.properties.auto_delivery_properties import (
+        AutoDeliveryProperties,
+        AutoDeliveryEntryProperties,
+    )
+
+
+_SEPARATOR = ', '
+
+
+class AutoDeliveryMatcher:
+    """
+    Индекс названий лотов из настроек автовыдачи.
+
+    Название лота совпадает с названием заказа, если оно стоит в начале названия заказа или
+    сразу после `', '` и заканчивается запятой или концом названия (как и регулярное выражение
+    `(?:^|, )(name)(?:,|$)`). Названия хранятся в префиксном дереве, поэтому поиск
+    выполняется за один проход по названию заказа, без компиляции регулярных выражений.
+
+    Если подходят несколько названий, возвращается то, которое раньше добавлено в настройки
+    автовыдачи (порядок `AutoDeliveryProperties.entries`).
+
+    Индекс обновляется обработчиками событий добавления / удаления записей автовыдачи.
+    Если записи изменили без событий (например, при загрузке конфига), индекс
+    перестраивается при следующем поиске.
+    """
+
+    def __init__(self, properties: AutoDeliveryProperties) -> None:
+        self._properties = properties
+        self._root: dict[str | None, Any] = {}
+        self._order: dict[str, int] = {}
+        self._counter = 0
+        self._dirty = True
+
+    def __len__(self) -> int:
+        self._ensure_built()
+        return len(self._order)
+
+    def __contains__(self, offer_name: str) -> bool:
+        self._ensure_built()
+        return offer_name in self._order
+
+    def invalidate(self) -> None:
+        """
+        Помечает индекс устаревшим. Он будет перестроен при следующем поиске.
+        """
+        self._dirty = True
+
+    def rebuild(self) -> None:
+        self._root = {}
+        self._order = {}
+        self._counter = 0
+        for offer_name in self._properties.entries:
+            self._insert(offer_name)
+        self._dirty = False
+
+    def add(self, offer_name: str) -> None:
+        if self._dirty:
+            return
+        if offer_name in self._order:
+            # Повторно добавленная запись оказывается в конце словаря записей.
+            self._delete(offer_name)
+        self._insert(offer_name)
+
+    def remove(self, offer_name: str) -> None:
+        if self._dirty:
+            return
+        self._delete(offer_name)
+
+    def match_name(self, title: str) -> str | None:
+        """
+        Ищет название лота из настроек автовыдачи в названии заказа.
+
+        :param title: название заказа.
+
+        :return: название лота или `None`.
+        """
+        self._ensure_built()
+        if not self._root:
+            return None
+
+        best: str | None = None
+        best_order = self._counter
+        length = len(title)
+        start = 0
+        while start != -1:
+            node = self._root
+            index = start
+            while True:
+                name = node.get(None)
+                if (
+                    name is not None
+                    and self._order[name] < best_order
+                    and (index == length or title[index] == ',' or title[index:] == '\n')
+                ):
+                    best, best_order = name, self._order[name]
+
+                if index == length or (node := node.get(title[index])) is None:
+                    break
+                index += 1
+
+            start = title.find(_SEPARATOR, start)
+            if start != -1:
+                start += len(_SEPARATOR)
+        return best
+
+    def match(self, title: str) -> AutoDeliveryEntryProperties | None:
+        """
+        Ищет запись автовыдачи, подходящую под название заказа.
+
+        :param title: название заказа.
+
+        :return: запись автовыдачи или `None`.
+        """
+        name = self.match_name(title)
+        return self._properties.entries.get(name) if name is not None else None
+
+    def _ensure_built(self) -> None:
+        if self._dirty or len(self._order) != len(self._properties.entries):
+            self.rebuild()
+
+    def _insert(self, offer_name: str) -> None:
+        node = self._root
+        for char in offer_name:
+            node = node.setdefault(char, {})
+        node[None] = offer_name
+        self._order[offer_name] = self._counter
+        self._counter += 1
+
+    def _delete(self, offer_name: str) -> None:
+        if self._order.pop(offer_name, None) is None:
+            return
+
+        path = [self._root]
+        for char in offer_name:
+            path.append(path[-1][char])
+        del path[-1][None]
+
+        for i in range(len(offer_name), 0, -1):
+            if path[i]:
+                break
+            del path[i - 1][offer_name[i - 1]]
@@ -176,6 +176,8 @@ class DateTimeFormatter(
     name=_('📆 Дата и время ($datetime)'),
     description=DATETIME_DESC,
     context_type=FormattersContext,
+    pure=True,
+    concurrent=True,
 ):
     def __init__(self, context: FormattersContext, mode: str = 'time', *args, **kwargs) -> None:
         super().__init__(context)
@@ -196,6 +198,8 @@ class ImageFormatter(
     name=_('🖼️ Изображение ($image)'),
     description=_(IMAGE_DESC),
     context_type=FormattersContext,
+    pure=True,
+    concurrent=True,
 ):
     def __init__(self, context: FormattersContext, path_or_id: int | str, *args, **kwargs) -> None:
         super().__init__(context)
@@ -214,6 +218,8 @@ class OrderFormatter(
     name=_('🛍️ Информация о заказе ($order)'),
     description=ORDER_DESC,
     context_type=(NewOrderContext, NewReviewContext),
+    pure=True,
+    concurrent=True,
 ):
     def __init__(
         self,
@@ -276,6 +282,8 @@ class MessageFormatter(
     name=_('💬 Информация о сообщении ($message)'),
     description=MESSAGE_DESC,
     context_type=NewMessageContext,
+    pure=True,
+    concurrent=True,
 ):
     def __init__(self, context: NewMessageContext, mode: str, *args, **kwargs) -> None:
         super().__init__(context)
@@ -304,6 +312,8 @@ class MeFormatter(
     name=_('👤 Информация о вас ($me)'),
     description=ME_DESC,
     context_type=FormattersContext,
+    cache_ttl=60,
+    concurrent=True,
 ):
     def __init__(
         self,
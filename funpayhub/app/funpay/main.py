@@ -4,14 +4,22 @@ import time
 import asyncio
 from typing import TYPE_CHECKING, Any, ParamSpec
 from io import BytesIO
+from functools import partial
+from itertools import pairwise
 from collections import Counter
-from collections.abc import Callable, Awaitable
+from collections.abc import Callable, Hashable, Awaitable
 
 from funpaybotengine import Bot, Dispatcher
 from funpaybotengine.types import Message, Category
 from funpaybotengine.client import Response, AioHttpSession
-from funpaybotengine.methods import FunPayMethod, MethodReturnType
+from funpaybotengine.methods import (
+    UploadImage,
+    FunPayMethod,
+    GetOrderPage,
+    MethodReturnType,
+)
 from funpaybotengine.exceptions import (
+    BadRequestError,
     FunPayServerError,
     UnauthorizedError,
     FunPayBotEngineError,
@@ -20,17 +28,21 @@ from funpaybotengine.exceptions import (
 )
 from funpaybotengine.types.pages import ProfilePage
 from funpaybotengine.runner.config import RunnerConfig
+from funpaybotengine.client.session import HTTPMethod
 
 from funpayhub.loggers import main as logger
 
-from funpayhub.lib.exceptions import TranslatableException
 from funpayhub.lib.translater import _en
 from funpayhub.lib.hub.text_formatters import Image, FormattersRegistry
 
 from funpayhub.app.funpay import middlewares as mdwr
 from funpayhub.app.formatters import CATEGORIES_LIST, FORMATTERS_LIST
 from funpayhub.app.dispatching import FunPayStartEvent, OffersRaisedEvent
+from funpayhub.app.images_cache import ImagesCache
 from funpayhub.app.funpay.routers import ALL_ROUTERS
+from funpayhub.app.manual_messages import ManualMessagesStore
+from funpayhub.app.funpay.send_queue import SendQueue, SendRequest
+from funpayhub.app.funpay.rate_limiter import RequestsLimiter, request_priority
 from funpayhub.app.first_response_cache import FirstResponseCache
 from funpayhub.app.funpay.offers_raiser import OffersRaiser
 from funpayhub.app.utils.get_profile_categories import get_profile_raisable_categories
@@ -45,17 +57,50 @@ if TYPE_CHECKING:
 
 
 P = ParamSpec('P')
+_RESPONSES_CACHE_SIZE = 256
+
+
+def _cancel_if_failed(future: asyncio.Future[Any], next_future: asyncio.Future[Any]) -> None:
+    if future.cancelled() or future.exception() is not None:
+        next_future.cancel()
 
 
 class HubSession(AioHttpSession):
+    """
+    Сессия FunPay Hub.
+
+    Помимо подсчета запросов:
+    - ограничивает частоту запросов через `RequestsLimiter`;
+    - объединяет одновременные одинаковые GET-запросы (singleflight): пока запрос
+      выполняется, остальные вызовы с тем же URL и параметрами ждут его результат,
+      а не делают свой запрос;
+    - кеширует ответы GET-запросов на `cache_ttls[type(method)]` секунд
+      (только для указанных типов методов).
+
+    Ответы из singleflight и кеша — один и тот же объект для всех вызывающих, его нельзя
+    изменять.
+    """
+
+    DEFAULT_CACHE_TTLS: dict[type[FunPayMethod[Any]], float] = {
+        GetOrderPage: 5.0,
+    }
+
     def __init__(
         self,
         proxy: str | None = None,
         default_headers: dict[str, str] | None = None,
+        limiter: RequestsLimiter | None = None,
+        cache_ttls: dict[type[FunPayMethod[Any]], float] | None = None,
     ):
         super().__init__(proxy, default_headers)
         self._first_request = 0
         self._counter = Counter()
+        self._limiter = limiter if limiter is not None else RequestsLimiter()
+
+        self._cache_ttls = self.DEFAULT_CACHE_TTLS | (cache_ttls or {})
+        self._in_flight: dict[Hashable, asyncio.Task[Response[Any]]] = {}
+        self._responses: dict[Hashable, tuple[float, Response[Any]]] = {}
+        self._cache_counter = Counter()
 
     async def make_request(
         self,
@@ -64,18 +109,124 @@ class HubSession(AioHttpSession):
         timeout: float | None = None,
         skip_session_cookies: bool = False,
     ) -> Response[MethodReturnType]:
+        if method.method is not HTTPMethod.GET:
+            return await self._make_request(method, bot, timeout, skip_session_cookies)
+
+        key = await self._request_key(method, bot, skip_session_cookies)
+        cached = self._responses.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self._cache_counter.update(['hits'])
+                return cached[1]
+            del self._responses[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._cache_counter.update(['joined'])
+        else:
+            self._cache_counter.update(['misses'])
+            task = asyncio.create_task(
+                self._make_request(method, bot, timeout, skip_session_cookies),
+            )
+            task.add_done_callback(partial(self._on_request_done, key=key, method=method))
+            self._in_flight[key] = task
+
+        # Отмена одного из ожидающих не должна отменять запрос для остальных.
+        return await asyncio.shield(task)
+
+    async def _make_request(
+        self,
+        method: FunPayMethod[MethodReturnType],
+        bot: Bot,
+        timeout: float | None = None,
+        skip_session_cookies: bool = False,
+    ) -> Response[MethodReturnType]:
+        endpoint = await self._limiter.acquire(method)
+
         request_time = time.time()
         if not self._first_request:
             self._first_request = request_time
         self._counter.update([method.url])
 
-        result = await super().make_request(method, bot, timeout, skip_session_cookies)
+        try:
+            result = await super().make_request(method, bot, timeout, skip_session_cookies)
+        except RateLimitExceededError:
+            self._limiter.on_rate_limited(endpoint)
+            raise
+
+        self._limiter.on_success(endpoint)
         return result
 
+    def _on_request_done(
+        self,
+        task: asyncio.Task[Response[Any]],
+        key: Hashable,
+        method: FunPayMethod[Any],
+    ) -> None:
+        del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        ttl = self._cache_ttls.get(type(method))
+        if not ttl:
+            return
+
+        now = time.monotonic()
+        if len(self._responses) >= _RESPONSES_CACHE_SIZE:
+            self._responses = {k: v for k, v in self._responses.items() if v[0] > now}
+            while len(self._responses) >= _RESPONSES_CACHE_SIZE:
+                del self._responses[next(iter(self._responses))]
+        self._responses[key] = (now + ttl, task.result())
+
+    @staticmethod
+    async def _request_key(
+        method: FunPayMethod[Any],
+        bot: Bot,
+        skip_session_cookies: bool,
+    ) -> Hashable:
+        params = await method.get_data(bot)
+        return (
+            type(method),
+            await method.get_url(bot),
+            method.locale,
+            method.ignore_locale,
+            tuple(sorted((k, str(v)) for k, v in params.items())),
+            skip_session_cookies,
+            id(bot),
+        )
+
+    def set_cache_ttl(self, method_type: type[FunPayMethod[Any]], ttl: float | None) -> None:
+        """
+        Устанавливает время жизни кеша ответов для типа метода.
+
+        :param ttl: время жизни (в секундах). `None` или `0` — не кешировать.
+        """
+        if ttl:
+            self._cache_ttls[method_type] = ttl
+            return
+
+        self._cache_ttls.pop(method_type, None)
+        self._responses = {k: v for k, v in self._responses.items() if k[0] is not method_type}
+
+    def clear_cache(self) -> None:
+        self._responses.clear()
+
     @property
     def counter(self) -> Counter:
         return self._counter
 
+    @property
+    def cache_counter(self) -> Counter:
+        """
+        Счетчики GET-запросов: `hits` — ответ из кеша, `joined` — ожидание уже
+        выполняющегося запроса (singleflight), `misses` — новый запрос к FunPay.
+        """
+        return self._cache_counter
+
+    @property
+    def limiter(self) -> RequestsLimiter:
+        return self._limiter
+
     @property
     def first_request_timestamp(self) -> float:
         return self._first_request
@@ -95,7 +246,10 @@ class FunPay:
 
         self._hub = hub
 
-        self._text_formatters = FormattersRegistry(workflow_data=workflow_data)
+        self._text_formatters = FormattersRegistry(
+            workflow_data=workflow_data,
+            default_timeout=hub.properties.general.formatters_timeout.value or None,
+        )
         for c in CATEGORIES_LIST:
             self._text_formatters.add_category(c)
         for i in FORMATTERS_LIST:
@@ -108,11 +262,17 @@ class FunPay:
         self._offers_raiser = OffersRaiser(self._bot)
         self._dispatcher = Dispatcher(workflow_data=workflow_data)
 
-        self._sending_message_lock = asyncio.Lock()
-        self._manually_sent_messages: set[int] = set()
+        self._send_queue = SendQueue(
+            self._send_request,
+            max_concurrency=hub.properties.general.messages_sending_concurrency.value,
+        )
+        self._manually_sent_messages = ManualMessagesStore.from_file(
+            'storage/manual_messages.bin',
+        )
         self._first_response_cache = FirstResponseCache.from_file(
             'storage/first_response_cache.json',
         )
+        self._images_cache = ImagesCache.from_file('storage/images_cache.json')
         self._authenticated = False
         self._runner_config = runner_config if runner_config is not None else RunnerConfig()
         self.setup_dispatcher()
@@ -204,25 +364,49 @@ class FunPay:
         keep_chat_unread: bool = False,
         automatic_message: bool = True,
         attempts: int = 3,
-    ) -> None:
+        wait: bool = True,
+    ) -> list[asyncio.Future[Message]]:
+        """
+        Ставит сообщения из стака в очередь отправки чата `chat_id`.
+
+        :param wait: дождаться отправки всех сообщений. Если `False`, хэндлер может
+            продолжить работу сразу: сообщения будут отправлены в порядке стака,
+            а ошибки отправки — залогированы.
+            Если сообщение не удалось отправить, следующие сообщения стака отменяются.
+
+        :return: futures отправляемых сообщений (в порядке стака).
+        """
+        futures = []
         for entry in stack.entries:
             if isinstance(entry, str):
-                await self.send_message(
-                    chat_id=chat_id,
-                    text=entry,
-                    keep_chat_unread=keep_chat_unread,
-                    automatic_message=automatic_message,
-                    attempts=attempts,
+                futures.append(
+                    self.enqueue_message(
+                        chat_id=chat_id,
+                        text=entry,
+                        keep_chat_unread=keep_chat_unread,
+                        automatic_message=automatic_message,
+                        attempts=attempts,
+                    ),
                 )
             elif isinstance(entry, Image):
-                await self.send_message(
-                    chat_id=chat_id,
-                    image=entry.id or entry.path,
-                    keep_chat_unread=keep_chat_unread,
-                    automatic_message=automatic_message,
-                    attempts=attempts,
+                futures.append(
+                    self.enqueue_message(
+                        chat_id=chat_id,
+                        image=entry.id or entry.path,
+                        keep_chat_unread=keep_chat_unread,
+                        automatic_message=automatic_message,
+                        attempts=attempts,
+                    ),
                 )
 
+        for future, next_future in pairwise(futures):
+            future.add_done_callback(partial(_cancel_if_failed, next_future=next_future))
+
+        if wait:
+            for future in futures:
+                await future
+        return futures
+
     async def send_message(
         self,
         chat_id: int | str,
@@ -232,38 +416,94 @@ class FunPay:
         keep_chat_unread: bool = False,
         automatic_message: bool = True,
         attempts: int = 3,
-    ) -> Message | None:
+    ) -> Message:
         """
         Обёртка над funpaybotegine.Bot.send_message.
+
+        Сообщение отправляется через очередь отправки: метод ждет, пока будут отправлены
+        ранее поставленные в очередь сообщения этого чата.
         """
-        while attempts:
-            attempts -= 1
+        return await self.enqueue_message(
+            chat_id=chat_id,
+            text=text,
+            image=image,
+            enforce_whitespaces=enforce_whitespaces,
+            keep_chat_unread=keep_chat_unread,
+            automatic_message=automatic_message,
+            attempts=attempts,
+        )
+
+    def enqueue_message(
+        self,
+        chat_id: int | str,
+        text: str | None = None,
+        image: str | BytesIO | int | None = None,
+        enforce_whitespaces: bool = True,
+        keep_chat_unread: bool = False,
+        automatic_message: bool = True,
+        attempts: int = 3,
+    ) -> asyncio.Future[Message]:
+        """
+        Ставит сообщение в очередь отправки и сразу возвращает future с результатом отправки.
+        """
+        return self._send_queue.put(
+            SendRequest(
+                chat_id=chat_id,
+                text=text,
+                image=image,
+                enforce_whitespaces=enforce_whitespaces,
+                keep_chat_unread=keep_chat_unread,
+                automatic_message=automatic_message,
+                attempts=attempts,
+            ),
+        )
+
+    async def _send_request(self, request: SendRequest) -> Message:
+        with request_priority(request.priority):
+            image = request.image
+            cached = False
+            if isinstance(image, str):
+                image, cached = await self._upload_image(image)
+
             try:
                 result = await self.bot.send_message(
-                    chat_id=chat_id,
-                    text=text,
+                    chat_id=request.chat_id,
+                    text=request.text,
                     image=image,
-                    enforce_whitespaces=enforce_whitespaces,
-                    keep_chat_unread=keep_chat_unread,
+                    enforce_whitespaces=request.enforce_whitespaces,
+                    keep_chat_unread=request.keep_chat_unread,
                 )
-                if not automatic_message:
-                    self._manually_sent_messages.add(result.id)
-                return result
-            except RateLimitExceededError:
-                await asyncio.sleep(3)
-            except (BotUnauthenticatedError, UnauthorizedError) as e:
-                raise TranslatableException(_en('Unable to send message.')) from e
-            except Exception:
-                logger.error(_en('Unable to send message to %s.'), chat_id, exc_info=True)
+            except BadRequestError:
+                # FunPay не принял сохраненный ID: при следующей попытке изображение будет
+                # загружено заново. Сетевые ошибки и ошибки сервера ID не сбрасывают.
+                if cached:
+                    await self._images_cache.remove(request.image)
+                raise
+        if not request.automatic_message:
+            self._manually_sent_messages.add(result.id)
+        return result
 
-        raise TranslatableException(
-            _en('Unable to send message to %s. Attempts exceeded.'),
-            chat_id,
-        )
+    async def _upload_image(self, path: str) -> tuple[int, bool]:
+        """
+        Возвращает ID изображения на FunPay, загружая файл только если он еще не загружался
+        (или его содержимое изменилось).
+
+        :return: ID изображения и `True`, если ID взят из кеша.
+        """
+        image_id, data, digest = await self._images_cache.lookup(path)
+        if image_id is not None:
+            return image_id, True
+
+        image_id = (await UploadImage(BytesIO(data)).execute(self.bot)).response_obj
+        # Хэш берется из lookup: файл мог измениться, пока изображение загружалось.
+        await self._images_cache.put(path, image_id, digest=digest)
+        return image_id, False
 
     def is_manual_message(self, message_id: int) -> bool:
         """
         Проверяет, было ли сообщение отправлено вручную через FunPayHub.
+
+        Хранятся ID последних `ManualMessagesStore.capacity` сообщений, отправленных вручную.
         """
         return message_id in self._manually_sent_messages
 
@@ -331,6 +571,10 @@ class FunPay:
     def authenticated(self) -> bool:
         return self._authenticated
 
+    @property
+    def send_queue(self) -> SendQueue:
+        return self._send_queue
+
     @property
     def session(self) -> HubSession:
         return self._session
@@ -338,3 +582,11 @@ class FunPay:
     @property
     def first_response_cache(self) -> FirstResponseCache:
         return self._first_response_cache
+
+    @property
+    def images_cache(self) -> ImagesCache:
+        return self._images_cache
+
+    @property
+    def manually_sent_messages(self) -> ManualMessagesStore:
+        return self._manually_sent_messages
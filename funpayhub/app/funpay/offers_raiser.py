@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import time
+import heapq
 import asyncio
+import itertools
 from typing import Any
-from functools import partial
+from dataclasses import dataclass
 from contextlib import suppress
 from collections.abc import Callable, Awaitable
 
@@ -19,162 +22,73 @@ from funpayhub.loggers import offers_raiser as logger
 
 from funpayhub.lib.translater import _en
 
+from funpayhub.app.funpay.rate_limiter import RequestPriority, request_priority
+
 
 type RaiseCallback = Callable[[Category], Awaitable[Any]]
 
 
+RAISE_INTERVAL = 3600
+"""Интервал между поднятиями лотов категории, если FunPay не сообщил время ожидания."""
+
+DEFAULT_WAIT_TIME = 1800
+"""Время ожидания, если FunPay отказал в поднятии, не указав, сколько ждать."""
+
+REQUEST_TIMEOUT = 60
+MAX_RATE_LIMIT_RETRIES = 5
+
+
+@dataclass
+class RaiseSchedule:
+    category: Category
+    on_raise: RaiseCallback | None = None
+
+    next_raise: float = 0.0
+    """`time.monotonic()` следующей попытки поднятия."""
+
+    next_raise_at: float = 0.0
+    """`time.time()` следующей попытки поднятия."""
+
+    errors: int = 0
+    """Кол-во ошибок подряд (для экспоненциальной задержки)."""
+
+    rate_limit_retries: int = 0
+    """Кол-во 429 подряд."""
+
+
 class OffersRaiser:
     """
     Менеджер автоматического поднятия лотов по категориям.
 
-    Для каждой категории запускается отдельная асинхронная задача (task),
-    выполняющая бесконечный цикл поднятия лотов с учетом серверных ограничений
-    и кулдаунов FunPay.
-
-    Архитектура работы:
-    - На каждую категорию может существовать не более одной активной задачи.
-    - Все HTTP-запросы на поднятие лотов выполняются через общий
-      `_requesting_lock`, что фактически сериализует запросы между категориями.
-    - Каждый запрос ограничен таймаутом, чтобы зависший реквест
-      не удерживал лок
-    - Перед запросом удерживается короткая пауза, чтобы избежать избыточной
-      нагрузки и срабатывания rate-limit'ов.
-
-    Поведение цикла:
-    - При успешном поднятии лотов ожидание составляет фиксированный интервал
-      (обычно 1 час).
-    - При ошибке `RaiseOffersError` используется время ожидания, возвращённое
-      сервером (или дефолтное).
-    - При `RateLimitExceededError` идут ретраи, при исчерпании цикл переходит к
-      увелечению множителя и продолжает работу
-    - При сетевых/серверных ошибках (включая таймауты на реквесах) цикл
-      продолжается.
-    - При любой непредвиденной ошибке цикл логирует traceback, чутка спит и продолжает
-    - Только `UnauthorizedError` завершает цикл, ибо без авторизации
-      ретраи юзлесс
-
-    Таким образом, несмотря на наличие отдельных задач для категорий,
-    поднятие лотов фактически происходит последовательно:
-    пока выполняется запрос для одной категории, остальные ожидают освобождения
-    блокировки.
+    Все категории обслуживает одна задача-планировщик. Она хранит мин-кучу
+    `(время следующего поднятия, категория)`, спит до ближайшего поднятия и поднимает
+    лоты категорий по очереди. Поэтому ожидания разных категорий не складываются, а число
+    задач не зависит от числа категорий.
+
+    Частоту запросов ограничивает общий лимитер `HubSession` (класс эндпоинтов `raise`,
+    приоритет `RequestPriority.RAISE`), поэтому поднятие не мешает выдаче товаров и
+    ответам в чатах.
+
+    Когда поднимать категорию в следующий раз:
+    - после успешного поднятия — через `RAISE_INTERVAL`;
+    - при `RaiseOffersError` — через время, которое вернул FunPay (или `DEFAULT_WAIT_TIME`);
+    - при `RateLimitExceededError` — через `8 * n` секунд, после
+      `MAX_RATE_LIMIT_RETRIES` попыток — как при сетевой ошибке;
+    - при сетевых/серверных ошибках (включая таймауты) — с экспоненциальной задержкой;
+    - при непредвиденной ошибке — traceback в лог и экспоненциальная задержка.
+
+    Только `UnauthorizedError` снимает категорию с поднятия, ибо без авторизации
+    ретраи юзлесс.
     """
 
     def __init__(self, bot: Bot) -> None:
-        self._tasks: dict[int, asyncio.Task] = {}
         self._bot = bot
+        self._schedules: dict[int, RaiseSchedule] = {}
+        self._heap: list[tuple[float, int, RaiseSchedule]] = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._scheduler: asyncio.Task[None] | None = None
         self._modifying_lock = asyncio.Lock()
-        self._requesting_lock = asyncio.Lock()
-
-    async def _raise_category_until_complete(self, category: Category) -> None:
-        retries = 0
-        while True:
-            try:
-                # Искусственное замедление запроса, чтобы не превысить rate-лимиты FunPay.
-                await asyncio.sleep(2)
-                await asyncio.wait_for(self._bot.raise_offers(category.id), timeout=60)
-                return
-            except RateLimitExceededError:
-                retries += 1
-                if retries >= 5:
-                    raise
-                wait = 8 * retries
-                logger.warning(
-                    _en(
-                        'An 429 error occurred while raising offers of category %s. '
-                        'Waiting for %d seconds.',
-                    ),
-                    category.name,
-                    wait,
-                )
-                await asyncio.sleep(wait)
-
-    async def _raising_loop(
-        self,
-        category: Category,
-        on_raise: RaiseCallback | None = None,
-    ) -> None:
-        logger.info(_en('Offer raiser loop for category %s has been started.'), category.name)
-        cerrors = 0
-        while True:
-            try:
-                async with self._requesting_lock:
-                    await self._raise_category_until_complete(category)
-                    logger.info(
-                        _en('Offers of category %s has been raised. Next try in %d.'),
-                        category.name,
-                        3600,
-                    )
-                    if on_raise is not None:
-                        with suppress(Exception):
-                            await on_raise(category)
-                cerrors = 0
-                await asyncio.sleep(3600)
-            except UnauthorizedError:
-                logger.error(
-                    _en('Unable to raise offers of category %s: not authorized.'),
-                    category.name,
-                )
-                return
-            except RaiseOffersError as e:
-                cerrors = 0
-                wait_time = e.wait_time if e.wait_time is not None else 1800
-                logger.info(
-                    _en('Unable to raise offers of category %s: need to wait for %d.'),
-                    category.name,
-                    wait_time,
-                )
-                await asyncio.sleep(wait_time)
-            except (FunPayServerError, asyncio.TimeoutError, RateLimitExceededError):
-                cerrors += 1
-                backoff = min(600, 10 * 2 ** (cerrors - 1))
-                logger.warning(
-                    _en(
-                        'A network/server error occurred while raising offers of category %s. '
-                        'Retrying in %d seconds.',
-                    ),
-                    category.name,
-                    backoff,
-                )
-                await asyncio.sleep(backoff)
-            except Exception:
-                cerrors += 1
-                backoff = min(600, 30 * 2 ** (cerrors - 1))
-                logger.error(
-                    _en(
-                        'An unexpected error occurred while raising offers of category %s. '
-                        'Retrying in %d seconds.',
-                    ),
-                    category.name,
-                    backoff,
-                    exc_info=True,
-                )
-                await asyncio.sleep(backoff)
-
-    async def _wrapped_raising_loop(
-        self,
-        category: Category,
-        on_raise: RaiseCallback | None,
-    ) -> None:
-        try:
-            await self._raising_loop(category, on_raise)
-        except asyncio.CancelledError:
-            logger.info(_en('Offer raising loop of category %s has been stopped.'), category.name)
-            raise
-
-    def _on_task_done(self, category: Category, task: asyncio.Task) -> None:
-        if category.id in self._tasks and self._tasks[category.id] is task:
-            del self._tasks[category.id]
-            logger.debug(
-                _en('Offer raising loop task of category %s (%s) has been removed from manager.'),
-                category.name,
-                task.get_name(),
-            )
-        else:
-            logger.debug(
-                _en('Offer raising loop task of category %s (%s) has not been found in manager.'),
-                category.name,
-                task.get_name(),
-            )
 
     async def start_raising_loop(
         self,
@@ -182,35 +96,186 @@ class OffersRaiser:
         on_raise: RaiseCallback | None = None,
     ) -> None:
         async with self._modifying_lock:
-            if task := self._tasks.get(category_id):
-                task.cancel()
-                with suppress(asyncio.CancelledError):
-                    await task
-
             category = await self._bot.storage.get_category(category_id)
-            new_task = asyncio.create_task(
-                self._wrapped_raising_loop(category, on_raise),
-                name=f'offers_raiser:{category.id}',
+            schedule = RaiseSchedule(category=category, on_raise=on_raise)
+            self._schedules[category_id] = schedule
+            self._push(schedule, 0)
+            logger.info(
+                _en('Offer raiser loop for category %s has been started.'),
+                category.name,
             )
-            new_task.add_done_callback(partial(self._on_task_done, category))
-            self._tasks[category_id] = new_task
+
+            if self._scheduler is None or self._scheduler.done():
+                self._scheduler = asyncio.create_task(
+                    self._scheduler_loop(),
+                    name='offers_raiser',
+                )
+            self._wakeup.set()
 
     async def stop_raising_loop(self, category_id: int) -> None:
         async with self._modifying_lock:
-            task = self._tasks.get(category_id)
-            if task:
-                task.cancel()
-                with suppress(asyncio.CancelledError):
-                    await task
+            schedule = self._schedules.pop(category_id, None)
+            if schedule is not None:
+                logger.info(
+                    _en('Offer raising loop of category %s has been stopped.'),
+                    schedule.category.name,
+                )
+            if not self._schedules:
+                await self._stop_scheduler()
 
     async def stop_all_raising_loops(self) -> None:
         async with self._modifying_lock:
-            tasks = list(self._tasks.values())
-            for task in tasks:
-                task.cancel()
-            for i in tasks:
-                with suppress(asyncio.CancelledError):
-                    await i
+            self._schedules.clear()
+            await self._stop_scheduler()
 
     def is_raising(self, category_id: int) -> bool:
-        return category_id in self._tasks
+        return category_id in self._schedules
+
+    def next_raise_time(self, category_id: int) -> float | None:
+        """
+        Время (`time.time()`) следующей попытки поднятия лотов категории или `None`,
+        если категория не поднимается.
+        """
+        schedule = self._schedules.get(category_id)
+        return schedule.next_raise_at if schedule is not None else None
+
+    def scheduled_raises(self) -> list[tuple[Category, float]]:
+        """
+        Категории, лоты которых поднимаются, и время (`time.time()`) следующей попытки
+        поднятия, в порядке очереди.
+        """
+        return sorted(
+            ((i.category, i.next_raise_at) for i in self._schedules.values()),
+            key=lambda i: i[1],
+        )
+
+    def _push(self, schedule: RaiseSchedule, delay: float) -> None:
+        schedule.next_raise = time.monotonic() + delay
+        schedule.next_raise_at = time.time() + delay
+        heapq.heappush(self._heap, (schedule.next_raise, next(self._counter), schedule))
+
+    def _is_actual(self, schedule: RaiseSchedule, due: float) -> bool:
+        # Записи кучи не удаляются при перепланировании / остановке категории,
+        # а пропускаются, когда до них доходит очередь.
+        return self._schedules.get(schedule.category.id) is schedule and schedule.next_raise == due
+
+    async def _scheduler_loop(self) -> None:
+        try:
+            while self._schedules:
+                while self._heap and not self._is_actual(self._heap[0][2], self._heap[0][0]):
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    return
+
+                due, _, schedule = self._heap[0]
+                if (delay := due - time.monotonic()) > 0:
+                    self._wakeup.clear()
+                    with suppress(TimeoutError):
+                        await asyncio.wait_for(self._wakeup.wait(), delay)
+                    continue
+
+                heapq.heappop(self._heap)
+                next_delay = await self._raise(schedule)
+                if self._schedules.get(schedule.category.id) is not schedule:
+                    continue  # категорию остановили или перезапустили во время запроса
+                if next_delay is None:
+                    del self._schedules[schedule.category.id]
+                    continue
+                self._push(schedule, next_delay)
+        finally:
+            self._heap.clear()
+
+    async def _stop_scheduler(self) -> None:
+        if self._scheduler is None:
+            return
+        self._scheduler.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._scheduler
+        self._scheduler = None
+        self._heap.clear()
+
+    async def _raise(self, schedule: RaiseSchedule) -> float | None:
+        """
+        Поднимает лоты категории.
+
+        :return: через сколько секунд поднять лоты категории снова или `None`, если
+            категорию нужно снять с поднятия.
+        """
+        category = schedule.category
+        try:
+            with request_priority(RequestPriority.RAISE):
+                await asyncio.wait_for(
+                    self._bot.raise_offers(category.id),
+                    timeout=REQUEST_TIMEOUT,
+                )
+        except UnauthorizedError:
+            logger.error(
+                _en('Unable to raise offers of category %s: not authorized.'),
+                category.name,
+            )
+            return None
+        except RaiseOffersError as e:
+            schedule.errors = schedule.rate_limit_retries = 0
+            wait_time = e.wait_time if e.wait_time is not None else DEFAULT_WAIT_TIME
+            logger.info(
+                _en('Unable to raise offers of category %s: need to wait for %d.'),
+                category.name,
+                wait_time,
+            )
+            return wait_time
+        except RateLimitExceededError:
+            schedule.rate_limit_retries += 1
+            if schedule.rate_limit_retries < MAX_RATE_LIMIT_RETRIES:
+                wait = 8 * schedule.rate_limit_retries
+                logger.warning(
+                    _en(
+                        'An 429 error occurred while raising offers of category %s. '
+                        'Waiting for %d seconds.',
+                    ),
+                    category.name,
+                    wait,
+                )
+                return wait
+
+            schedule.rate_limit_retries = 0
+            return self._network_error_backoff(schedule)
+        except (FunPayServerError, asyncio.TimeoutError):
+            return self._network_error_backoff(schedule)
+        except Exception:
+            schedule.errors += 1
+            backoff = min(600, 30 * 2 ** (schedule.errors - 1))
+            logger.error(
+                _en(
+                    'An unexpected error occurred while raising offers of category %s. '
+                    'Retrying in %d seconds.',
+                ),
+                category.name,
+                backoff,
+                exc_info=True,
+            )
+            return backoff
+
+        schedule.errors = schedule.rate_limit_retries = 0
+        logger.info(
+            _en('Offers of category %s has been raised. Next try in %d.'),
+            category.name,
+            RAISE_INTERVAL,
+        )
+        if schedule.on_raise is not None:
+            with suppress(Exception):
+                await schedule.on_raise(category)
+        return RAISE_INTERVAL
+
+    @staticmethod
+    def _network_error_backoff(schedule: RaiseSchedule) -> float:
+        schedule.errors += 1
+        backoff = min(600, 10 * 2 ** (schedule.errors - 1))
+        logger.warning(
+            _en(
+                'A network/server error occurred while raising offers of category %s. '
+                'Retrying in %d seconds.',
+            ),
+            schedule.category.name,
+            backoff,
+        )
+        return backoff
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+
+__all__ = [
+    'RequestPriority',
+    'request_priority',
+    'current_priority',
+    'TokenBucket',
+    'BucketStats',
+    'RequestsLimiter',
+]
+
+
+import time
+import heapq
+import asyncio
+import itertools
+from typing import TYPE_CHECKING, Any
+from dataclasses import dataclass
+from enum import IntEnum
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections.abc import Iterator
+
+from funpaybotengine.methods import RaiseOffers, UploadImage, RunnerRequest
+
+from funpayhub.loggers import main as logger
+
+from funpayhub.lib.translater import _en
+
+
+if TYPE_CHECKING:
+    from funpaybotengine.methods import FunPayMethod
+
+
+class RequestPriority(IntEnum):
+    """
+    Приоритет запроса к FunPay. Чем меньше значение, тем раньше запрос получает токен.
+    """
+
+    DELIVERY = 0
+    """Выдача товаров."""
+
+    NORMAL = 1
+    """Ответы в чатах и все запросы без явно указанного приоритета."""
+
+    BACKGROUND = 2
+    """Приветствия, запросы CPU и прочие фоновые запросы."""
+
+    RAISE = 3
+    """Поднятие лотов."""
+
+
+_priority: ContextVar[RequestPriority | None] = ContextVar('fph_request_priority', default=None)
+
+
+def current_priority() -> RequestPriority | None:
+    """
+    Приоритет, установленный для текущего контекста через `request_priority`.
+    """
+    return _priority.get()
+
+
+@contextmanager
+def request_priority(priority: RequestPriority | None) -> Iterator[None]:
+    """
+    Устанавливает приоритет всех запросов к FunPay, выполняемых внутри блока `with`.
+
+    Задачи, созданные внутри блока, наследуют приоритет.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@dataclass
+class BucketStats:
+    acquired: int = 0
+    """Кол-во выданных токенов."""
+
+    waited: int = 0
+    """Кол-во запросов, которым пришлось ждать токен."""
+
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    rate_limited: int = 0
+    """Кол-во полученных 429."""
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.waited if self.waited else 0.0
+
+
+class TokenBucket:
+    """
+    Token bucket с очередью ожидания по приоритетам.
+
+    Пока есть ожидающие запросы, новые запросы не обгоняют их, а встают в очередь:
+    токены выдаются в порядке приоритета, внутри приоритета — в порядке очереди.
+
+    Скорость адаптивная: при 429 она уменьшается в `decrease_factor` раз (не ниже `min_rate`),
+    а после `recovery_delay` секунд без 429 каждый успешный запрос увеличивает ее на
+    `increase_step` от начальной скорости (не выше начальной).
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        min_rate: float | None = None,
+        decrease_factor: float = 2.0,
+        increase_step: float = 0.05,
+        recovery_delay: float = 30.0,
+    ) -> None:
+        if rate <= 0 or capacity < 1:
+            raise ValueError(
+                f'Rate must be positive and capacity must be at least 1, '
+                f'got rate={rate}, capacity={capacity}.',
+            )
+
+        self._max_rate = rate
+        self._rate = rate
+        self._min_rate = min_rate if min_rate is not None else rate / 16
+        self._capacity = capacity
+        self._decrease_factor = decrease_factor
+        self._increase_step = increase_step
+        self._recovery_delay = recovery_delay
+
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._limited_at = 0.0
+
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+        self._dispatcher: asyncio.Task[None] | None = None
+        self.stats = BucketStats()
+
+    async def acquire(self, priority: RequestPriority = RequestPriority.NORMAL) -> None:
+        if not self._waiters:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.stats.acquired += 1
+                return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        started_at = time.monotonic()
+        await future
+        waited = time.monotonic() - started_at
+        self.stats.waited += 1
+        self.stats.total_wait += waited
+        self.stats.max_wait = max(self.stats.max_wait, waited)
+
+    def on_rate_limited(self) -> None:
+        now = time.monotonic()
+        self.stats.rate_limited += 1
+        self._refill()
+        self._tokens = min(self._tokens, 0)
+        if now - self._limited_at < 1 / self._rate:  # 429 на запросы из одной пачки
+            return
+
+        self._limited_at = now
+        self._rate = max(self._min_rate, self._rate / self._decrease_factor)
+
+    def on_success(self) -> None:
+        if self._rate >= self._max_rate:
+            return
+        if time.monotonic() - self._limited_at < self._recovery_delay:
+            return
+        self._refill()
+        self._rate = min(self._max_rate, self._rate + self._max_rate * self._increase_step)
+
+    def depth(self, priority: RequestPriority | None = None) -> int:
+        """
+        Кол-во запросов, ожидающих токен (с приоритетом `priority` или всего).
+        """
+        if priority is None:
+            return sum(1 for *_, f in self._waiters if not f.done())
+        return sum(1 for p, _, f in self._waiters if p == priority and not f.done())
+
+    @property
+    def rate(self) -> float:
+        """Текущая скорость (токенов в секунду)."""
+        return self._rate
+
+    @property
+    def max_rate(self) -> float:
+        return self._max_rate
+
+    @property
+    def capacity(self) -> float:
+        return self._capacity
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+                continue
+
+            *_, future = heapq.heappop(self._waiters)
+            if future.done():  # запрос отменили, пока он ждал
+                continue
+            self._tokens -= 1
+            self.stats.acquired += 1
+            future.set_result(None)
+
+
+_ENDPOINTS_PRIORITIES: dict[str, RequestPriority] = {
+    'raise': RequestPriority.RAISE,
+}
+
+
+class RequestsLimiter:
+    """
+    Ограничитель запросов к FunPay: по одному `TokenBucket` на класс эндпоинтов.
+
+    Классы эндпоинтов:
+    - `runner` — запросы к `runner/` (получение событий, отправка сообщений, CPU);
+    - `raise` — поднятие лотов;
+    - `upload` — загрузка изображений;
+    - `pages` — все остальные запросы (страницы заказов, профилей, чатов и т.д.).
+    """
+
+    DEFAULT_LIMITS: dict[str, tuple[float, float]] = {
+        'runner': (2.0, 4),
+        'pages': (2.0, 5),
+        'raise': (0.5, 1),
+        'upload': (1.0, 2),
+    }
+    """Скорость (запросов в секунду) и размер пачки для каждого класса эндпоинтов."""
+
+    def __init__(self, limits: dict[str, tuple[float, float]] | None = None) -> None:
+        limits = self.DEFAULT_LIMITS | (limits or {})
+        self._buckets = {
+            endpoint: TokenBucket(rate, capacity) for endpoint, (rate, capacity) in limits.items()
+        }
+
+    @staticmethod
+    def endpoint(method: FunPayMethod[Any]) -> str:
+        if isinstance(method, RunnerRequest):
+            return 'runner'
+        if isinstance(method, RaiseOffers):
+            return 'raise'
+        if isinstance(method, UploadImage):
+            return 'upload'
+        return 'pages'
+
+    async def acquire(self, method: FunPayMethod[Any]) -> str:
+        """
+        Ожидает токен для запроса `method`.
+
+        :return: класс эндпоинта запроса.
+        """
+        endpoint = self.endpoint(method)
+        priority = current_priority()
+        if priority is None:
+            priority = _ENDPOINTS_PRIORITIES.get(endpoint, RequestPriority.NORMAL)
+
+        await self._buckets[endpoint].acquire(priority)
+        return endpoint
+
+    def on_rate_limited(self, endpoint: str) -> None:
+        bucket = self._buckets[endpoint]
+        bucket.on_rate_limited()
+        logger.warning(
+            _en('FunPay rate limit exceeded (%s). Requests rate lowered to %.2f per second.'),
+            endpoint,
+            bucket.rate,
+        )
+
+    def on_success(self, endpoint: str) -> None:
+        self._buckets[endpoint].on_success()
+
+    @property
+    def buckets(self) -> dict[str, TokenBucket]:
+        return self._buckets
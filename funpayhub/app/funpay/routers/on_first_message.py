@@ -32,6 +32,7 @@ from funpayhub.app.formatters import (
     MessageFormattersCategory,
 )
 from funpayhub.app.properties import FunPayHubProperties
+from funpayhub.app.funpay.rate_limiter import RequestPriority, request_priority
 
 
 if TYPE_CHECKING:
@@ -149,8 +150,9 @@ class UpdateLastChats:
         logger.debug(_en('Getting CPU data for users %s.'), (user_ids,))
         chunks = [tuple(user_ids[i : i + 10]) for i in range(0, len(user_ids), 10)]
         data = {}
-        for i in chunks:
-            data |= await self._get_cpu_data(bot, *i, attempts=attempts)
+        with request_priority(RequestPriority.BACKGROUND):
+            for i in chunks:
+                data |= await self._get_cpu_data(bot, *i, attempts=attempts)
         logger.debug(_en('Got CPU data for users %s.'), ([i for i in data.keys()],))
         return data
 
@@ -257,7 +259,7 @@ async def on_first_message(
             )
             return
 
-        message = properties.first_response.text.value
+        message = properties.first_response.text
         if event.message.chat_id in new_chats.cpu_data:
             logger.debug(
                 _en('Chat %s found in CPU data: %s.'),
@@ -269,9 +271,9 @@ async def on_first_message(
             )
             if props is not None:
                 logger.debug(_en('Per-offer greetings props found.'))
-                message = props.text.value
+                message = props.text
 
-        if not message:
+        if not message.value:
             logger.debug(_en('Greetings text is empty. Exiting handler.'))
             return
 
@@ -289,7 +291,8 @@ async def on_first_message(
             return
 
         try:
-            await fp.send_messages_stack(formatted, event.message.chat_id)
+            with request_priority(RequestPriority.BACKGROUND):
+                await fp.send_messages_stack(formatted, event.message.chat_id)
             await first_response_cache.update(event.message.chat_id)
         except Exception as e:
             logger.error(
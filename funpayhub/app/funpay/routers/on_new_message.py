@@ -45,13 +45,13 @@ async def process_command(
 
     if command.reply.value:
         text = await fp_formatters.format_text(
-            text=command.response_text.value,
+            text=command.response_text,
             query=GeneralFormattersCategory.or_(MessageFormattersCategory),
             context=NewMessageContext(new_message_event=event),
             raise_on_error=not command.ignore_formatters_errors.value,
         )
 
-        await fp.send_messages_stack(text, chat_id=event.message.chat_id)
+        await fp.send_messages_stack(text, chat_id=event.message.chat_id, wait=False)
 
 
 @r.on_chat_changed(handler_id='fph:new_message_notification')
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+import asyncio
 from typing import TYPE_CHECKING, Any
 from contextlib import suppress
 
@@ -14,6 +15,7 @@ from funpayhub.lib.translater import _
 
 from funpayhub.app.formatters import GoodsFormatter, NewOrderContext
 from funpayhub.app.telegram.ui.ids import MenuIds
+from funpayhub.app.funpay.rate_limiter import RequestPriority, request_priority
 from funpayhub.app.notification_channels import NotificationChannels
 from funpayhub.app.telegram.modules.autodelivery.ui import NewSaleMenuContext
 
@@ -24,12 +26,13 @@ if TYPE_CHECKING:
 
     from funpayhub.lib.translater import Translater
     from funpayhub.lib.telegram.ui import UIRegistry
-    from funpayhub.lib.goods_sources import GoodsSourcesManager
+    from funpayhub.lib.goods_sources import Reservation, GoodsSourcesManager
     from funpayhub.lib.hub.text_formatters import FormattersRegistry
 
     from funpayhub.app.main import FunPayHub
     from funpayhub.app.properties import FunPayHubProperties as FPHProps
     from funpayhub.app.telegram.main import Telegram
+    from funpayhub.app.auto_delivery_matcher import AutoDeliveryMatcher
     from funpayhub.app.properties.auto_delivery_properties import AutoDeliveryEntryProperties
 
 
@@ -45,22 +48,14 @@ ERR_TEXT = (
 )
 
 
-def _offer_name_re_factory(name: str) -> re.Pattern[str]:
-    return re.compile(rf'(?:^|, )({re.escape(name)})(?:,|$)')
-
-
 async def auto_delivery_enabled_filter(
     event: NewSaleEvent,
     properties: FPHProps,
+    auto_delivery_matcher: AutoDeliveryMatcher,
 ) -> bool | dict[str, Any]:
     order = await event.get_order_preview()
 
-    for k, v in properties.auto_delivery.entries.items():
-        pattern = _offer_name_re_factory(k)
-        if pattern.search(order.title):
-            props = v
-            break
-    else:
+    if (props := auto_delivery_matcher.match(order.title)) is None:
         return False
 
     if not props.auto_delivery.value or not props.delivery_text.value:
@@ -84,51 +79,87 @@ class DeliverGoodsHandler:
         order = await event.get_order_preview()
         goods_source_id = auto_delivery.goods_source.value
 
-        calls = fp_formatters.extract_calls(auto_delivery.delivery_text.value)
-        goods = []
+        calls = fp_formatters.compile(auto_delivery.delivery_text)
+        reservation = None
         if GoodsFormatter.key in calls.invocation_names:
-            goods = await self.get_goods(auto_delivery, order, goods_manager)
+            reservation = await self.reserve_goods(auto_delivery, order, goods_manager)
+        goods = reservation.goods if reservation is not None else []
 
-        context = NewOrderContext(
-            order_event=event,
-            goods_to_deliver=goods,
-            new_message_event=event.related_new_message_event,
-        )
+        sending = False
+        try:
+            context = NewOrderContext(
+                order_event=event,
+                goods_to_deliver=goods,
+                new_message_event=event.related_new_message_event,
+            )
 
-        response_text = await fp_formatters.format_text(
-            auto_delivery.delivery_text.value,
-            context=context,
-            raise_on_error=True,
-        )
+            response_text = await fp_formatters.format_text(
+                calls,
+                context=context,
+                raise_on_error=True,
+            )
 
-        try:
-            await hub.funpay.send_messages_stack(response_text, event.message.chat_id)
-            event['delivered_goods'] = goods
-            event['delivered_from_source_id'] = goods_source_id
-            return
+            sending = True
+            with request_priority(RequestPriority.DELIVERY):
+                await hub.funpay.send_messages_stack(response_text, event.message.chat_id)
+        except asyncio.CancelledError:
+            # Сообщения, поставленные в очередь отправки, уходят покупателю и после отмены
+            # хэндлера (например, при остановке бота), поэтому такие товары выдавать повторно
+            # нельзя.
+            if reservation is not None:
+                if sending:
+                    await asyncio.shield(self.commit_goods(goods_manager, reservation, order))
+                else:
+                    await asyncio.shield(self.rollback_goods(goods_manager, reservation))
+            raise
         except Exception:
-            if goods:
-                with suppress(Exception):
-                    await goods_manager.add_goods(goods_source_id, goods)
+            if reservation is not None:
+                await self.rollback_goods(goods_manager, reservation)
             raise
 
-    async def get_goods(
+        if reservation is not None:
+            await self.commit_goods(goods_manager, reservation, order)
+        event['delivered_goods'] = goods
+        event['delivered_from_source_id'] = goods_source_id
+
+    @staticmethod
+    async def commit_goods(
+        goods_manager: GoodsSourcesManager,
+        reservation: Reservation,
+        order: OrderPreview,
+    ) -> None:
+        # Товары уже у покупателя: ошибка подтверждения резерва не должна превращаться
+        # в ошибку выдачи.
+        try:
+            await goods_manager.commit(reservation)
+        except Exception:
+            logger.error(
+                _('Товары по заказу %s выданы, но не удалось удалить их из источника %s.'),
+                order.id,
+                reservation.source_id,
+                exc_info=True,
+            )
+
+    @staticmethod
+    async def rollback_goods(goods_manager: GoodsSourcesManager, reservation: Reservation) -> None:
+        with suppress(Exception):
+            await goods_manager.rollback(reservation)
+
+    async def reserve_goods(
         self,
         auto_delivery: AutoDeliveryEntryProperties,
         order: OrderPreview,
         goods_manager: GoodsSourcesManager,
-    ) -> list[str]:
+    ) -> Reservation | None:
         if not (goods_source_id := auto_delivery.goods_source.value):
-            return []
+            return None
 
         amount = 1
         if auto_delivery.multi_delivery.value:
             match = PCS_RE.search(order.title)
             amount = int(match.group(1)) if match else 1
 
-        goods = await goods_manager.pop_goods(goods_source_id, amount)
-
-        return goods
+        return await goods_manager.reserve(goods_source_id, amount)
 
 
 @router.on_new_sale(
@@ -108,7 +108,7 @@ async def reply_in_review(
     try:
         context = NewReviewContext(new_message_event=event, review_event=event)
         text = await fp_formatters.format_text(
-            p.review_reply_text.value,
+            p.review_reply_text,
             context=context,
             query=InCategory(ReviewFormattersCategory).or_(InCategory(GeneralFormattersCategory)),
         )
@@ -143,7 +143,7 @@ async def reply_in_chat(
     try:
         context = NewReviewContext(new_message_event=event, review_event=event)
         text = await fp_formatters.format_text(
-            p.chat_reply_text.value,
+            p.chat_reply_text,
             context=context,
             query=InCategory(ReviewFormattersCategory).or_(InCategory(GeneralFormattersCategory)),
         )
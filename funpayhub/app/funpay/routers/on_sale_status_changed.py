@@ -48,7 +48,7 @@ async def send_order_confirmation_message(
 ) -> None:
     try:
         messages_pack = await fp_formatters.format_text(
-            properties.on_sale_confirmation.response_text.value,
+            properties.on_sale_confirmation.response_text,
             context=NewOrderContext(
                 new_message_event=event.related_new_message_event,
                 order_event=event,
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+
+__all__ = ['SendQueue', 'SendRequest']
+
+
+import time
+import asyncio
+from typing import TYPE_CHECKING, Any
+from dataclasses import field, dataclass
+from contextlib import asynccontextmanager
+from collections import deque
+from collections.abc import Callable, Awaitable, AsyncIterator
+
+from funpaybotengine.exceptions import (
+    UnauthorizedError,
+    RateLimitExceededError,
+    BotUnauthenticatedError,
+)
+
+from funpayhub.loggers import main as logger
+
+from funpayhub.lib.exceptions import TranslatableException
+from funpayhub.lib.translater import _en
+
+from funpayhub.app.funpay.rate_limiter import RequestPriority, current_priority
+
+
+if TYPE_CHECKING:
+    from io import BytesIO
+
+    from funpaybotengine.types import Message
+
+
+type SendCallback = Callable[[SendRequest], Awaitable[Message]]
+
+
+@dataclass
+class SendRequest:
+    """
+    Сообщение, ожидающее отправки.
+    """
+
+    chat_id: int | str
+    text: str | None = None
+    image: str | BytesIO | int | None = None
+    enforce_whitespaces: bool = True
+    keep_chat_unread: bool = False
+    automatic_message: bool = True
+    attempts: int = 3
+    priority: RequestPriority | None = field(default_factory=current_priority)
+    """Приоритет запросов отправки. По умолчанию — приоритет контекста создания запроса."""
+
+    future: asyncio.Future[Message] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future(),
+    )
+
+
+class SendQueue:
+    """
+    Очередь исходящих сообщений FunPay.
+
+    Сообщения одного чата отправляются строго в порядке добавления, разные чаты
+    обрабатываются параллельно (не более `max_concurrency` запросов одновременно).
+
+    При `RateLimitExceededError` отправка приостанавливается во всех чатах: пауза начинается
+    с `rate_limit_delay` секунд и удваивается при каждом следующем 429 подряд
+    (не более `max_rate_limit_delay`).
+
+    `SendQueue.put` возвращает future с отправленным сообщением: хэндлер может дождаться
+    отправки или продолжить работу, не дожидаясь ее. Ошибки отправки логируются в любом
+    случае.
+    """
+
+    def __init__(
+        self,
+        send: SendCallback,
+        max_concurrency: int = 4,
+        rate_limit_delay: float = 3.0,
+        max_rate_limit_delay: float = 60.0,
+    ) -> None:
+        if max_concurrency <= 0:
+            raise ValueError(f'Max concurrency must be positive, got {max_concurrency}.')
+
+        self._send = send
+        self._max_concurrency = max_concurrency
+        self._active = 0
+        self._slot_released = asyncio.Condition()
+
+        self._rate_limit_delay = rate_limit_delay
+        self._max_rate_limit_delay = max_rate_limit_delay
+        self._current_delay = rate_limit_delay
+        self._paused_until = 0.0
+
+        self._chats: dict[int | str, deque[SendRequest]] = {}
+        self._workers: dict[int | str, asyncio.Task[None]] = {}
+
+    def put(self, request: SendRequest) -> asyncio.Future[Message]:
+        """
+        Добавляет сообщение в очередь чата.
+
+        :return: future, которая завершится отправленным сообщением или исключением.
+        """
+        queue = self._chats.setdefault(request.chat_id, deque())
+        queue.append(request)
+        request.future.add_done_callback(_retrieve_exception)
+
+        if request.chat_id not in self._workers:
+            self._workers[request.chat_id] = asyncio.create_task(
+                self._chat_worker(request.chat_id),
+            )
+        return request.future
+
+    async def join(self) -> None:
+        """
+        Ожидает отправки всех сообщений, находящихся в очереди.
+        """
+        while self._workers:
+            await asyncio.gather(*self._workers.values(), return_exceptions=True)
+
+    def pending(self, chat_id: int | str | None = None) -> int:
+        """
+        Кол-во сообщений в очереди чата `chat_id` (или во всех чатах).
+        """
+        if chat_id is not None:
+            return len(self._chats.get(chat_id, ()))
+        return sum(len(i) for i in self._chats.values())
+
+    @property
+    def max_concurrency(self) -> int:
+        return self._max_concurrency
+
+    @max_concurrency.setter
+    def max_concurrency(self, value: int) -> None:
+        if value <= 0:
+            raise ValueError(f'Max concurrency must be positive, got {value}.')
+        self._max_concurrency = value
+        asyncio.create_task(self._notify_slots())
+
+    @property
+    def paused_until(self) -> float:
+        """
+        `time.monotonic()`, до которого отправка приостановлена из-за rate limit'а.
+        """
+        return self._paused_until
+
+    async def _chat_worker(self, chat_id: int | str) -> None:
+        queue = self._chats[chat_id]
+        try:
+            while queue:
+                request = queue[0]
+                if not request.future.done():
+                    await self._process(request)
+                queue.popleft()
+        finally:
+            del self._workers[chat_id]
+            if queue:  # воркер отменили: незавершенные сообщения не должны зависнуть
+                for request in queue:
+                    request.future.cancel()
+            del self._chats[chat_id]
+
+    async def _process(self, request: SendRequest) -> None:
+        attempts = request.attempts
+        while attempts:
+            attempts -= 1
+            await self._wait_rate_limit()
+            async with self._slot():
+                try:
+                    result = await self._send(request)
+                except RateLimitExceededError:
+                    self._on_rate_limit()
+                    continue
+                except (BotUnauthenticatedError, UnauthorizedError) as e:
+                    if not request.future.done():
+                        exception = TranslatableException(_en('Unable to send message.'))
+                        exception.__cause__ = e
+                        request.future.set_exception(exception)
+                    return
+                except Exception:
+                    logger.error(
+                        _en('Unable to send message to %s.'),
+                        request.chat_id,
+                        exc_info=True,
+                    )
+                    continue
+
+            self._current_delay = self._rate_limit_delay
+            if not request.future.done():
+                request.future.set_result(result)
+            return
+
+        logger.error(_en('Unable to send message to %s. Attempts exceeded.'), request.chat_id)
+        if not request.future.done():
+            request.future.set_exception(
+                TranslatableException(
+                    _en('Unable to send message to %s. Attempts exceeded.'),
+                    request.chat_id,
+                ),
+            )
+
+    def _on_rate_limit(self) -> None:
+        now = time.monotonic()
+        if self._paused_until > now:  # 429 от запроса, отправленного до начала паузы
+            return
+
+        logger.warning(
+            _en('Rate limit exceeded while sending messages. Pausing sending for %s seconds.'),
+            self._current_delay,
+        )
+        self._paused_until = now + self._current_delay
+        self._current_delay = min(self._current_delay * 2, self._max_rate_limit_delay)
+
+    async def _wait_rate_limit(self) -> None:
+        while (delay := self._paused_until - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        async with self._slot_released:
+            await self._slot_released.wait_for(lambda: self._active < self._max_concurrency)
+            self._active += 1
+        try:
+            yield
+        finally:
+            async with self._slot_released:
+                self._active -= 1
+                self._slot_released.notify()
+
+    async def _notify_slots(self) -> None:
+        async with self._slot_released:
+            self._slot_released.notify_all()
+
+
+def _retrieve_exception(future: asyncio.Future[Any]) -> None:
+    # Ошибки уже залогированы очередью; если хэндлер не ждет отправки,
+    # asyncio не должен ругаться на неполученное исключение.
+    if not future.cancelled():
+        future.exception()
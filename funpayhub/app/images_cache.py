@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+
+__all__ = ['ImagesCache']
+
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+from typing import Any, Self
+from pathlib import Path
+
+
+TOUCH_SAVE_INTERVAL = 300
+"""Как часто (в секундах) сохраняется время последнего использования изображений."""
+
+
+class ImagesCache:
+    """
+    Кеш ID изображений, загруженных на FunPay: хэш содержимого файла -> ID изображения.
+
+    Изображение, отправляемое по пути, загружается на FunPay только один раз: повторные
+    отправки используют сохраненный ID. Если содержимое файла изменилось, меняется и хэш,
+    поэтому изображение будет загружено заново.
+
+    Хэш файла пересчитывается, только если изменились время изменения или размер файла.
+    Записи, которые не использовались `max_age` секунд, удаляются; если записей больше
+    `max_entries`, удаляются давно не использованные. Время использования сохраняется
+    не чаще раза в `TOUCH_SAVE_INTERVAL` секунд.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        max_entries: int = 1024,
+        max_age: float = 30 * 24 * 3600,
+    ) -> None:
+        self._path = Path(path)
+        self._max_entries = max_entries
+        self._max_age = max_age
+        self._cache: dict[str, dict[str, int | float]] = {}
+        self._hashes: dict[str, tuple[int, int, str]] = {}
+        self._saved_at = time.time()
+
+    async def lookup(self, path: str) -> tuple[int | None, bytes | None, str]:
+        """
+        Ищет ID изображения по пути к файлу.
+
+        :return: ID изображения (или `None`, если изображение не загружалось, его
+            содержимое изменилось или запись о нем удалена), содержимое файла, если файл
+            пришлось прочитать, и хэш содержимого. При промахе содержимое файла возвращается
+            всегда — чтобы не читать файл повторно для загрузки, а хэш стоит передать
+            в `put`, чтобы ID загруженного изображения был привязан именно к этому
+            содержимому.
+        """
+        stat = await asyncio.to_thread(os.stat, path)
+        cached = self._hashes.get(path)
+        data = None
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            digest = cached[2]
+        else:
+            data, digest = await self._read(path)
+
+        entry = self._cache.get(digest)
+        if entry is None:
+            # Хэш мог остаться от записи, удаленной при вытеснении, — тогда файл еще не читался.
+            if data is None:
+                data, digest = await self._read(path)
+            return None, data, digest
+
+        entry['used'] = now = time.time()
+        if now - self._saved_at > TOUCH_SAVE_INTERVAL:
+            # время использования сохраняется пачками, а не при каждой отправке
+            await self.save()
+        return int(entry['id']), data, digest
+
+    async def put(
+        self,
+        path: str,
+        image_id: int,
+        save: bool = True,
+        digest: str | None = None,
+    ) -> None:
+        """
+        :param digest: хэш содержимого, которое было загружено (из `lookup`). Если не указан,
+            хэш считается по текущему содержимому файла.
+        """
+        if digest is None:
+            digest = await self._hash(path)
+        self._cache[digest] = {'id': image_id, 'used': time.time()}
+        self._evict()
+        if save:
+            await self.save()
+
+    async def remove(self, path: str, save: bool = True) -> None:
+        cached = self._hashes.pop(path, None)
+        if cached is None or self._cache.pop(cached[2], None) is None:
+            return
+        if save:
+            await self.save()
+
+    async def reset(self, save: bool = True) -> None:
+        self._cache = {}
+        self._hashes = {}
+        if save:
+            await self.save()
+
+    async def save(self) -> None:
+        self._saved_at = time.time()
+        data = json.dumps(self._cache, ensure_ascii=False)
+        await asyncio.to_thread(self._write, data)
+
+    def _write(self, data: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with tmp_path.open('w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    async def _hash(self, path: str) -> str:
+        stat = await asyncio.to_thread(os.stat, path)
+        cached = self._hashes.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        return (await self._read(path))[1]
+
+    async def _read(self, path: str) -> tuple[bytes, str]:
+        data, stat = await asyncio.to_thread(_read, path)
+        digest = hashlib.sha256(data).hexdigest()
+        self._hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return data, digest
+
+    def _evict(self) -> None:
+        expired_at = time.time() - self._max_age
+        self._cache = {k: v for k, v in self._cache.items() if v['used'] > expired_at}
+        if len(self._cache) > self._max_entries:
+            by_usage = sorted(self._cache.items(), key=lambda i: i[1]['used'])
+            self._cache = dict(by_usage[-self._max_entries :])
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @classmethod
+    def from_file(cls, path: Path | str, **kwargs: Any) -> Self:
+        path = Path(path)
+
+        if path.exists() and not path.is_file():
+            raise IsADirectoryError(f'{path} is not a file.')
+
+        instance = cls(path, **kwargs)
+
+        if not path.exists():
+            return instance
+
+        with path.open('r', encoding='utf-8') as f:
+            instance._cache = json.load(f)
+        instance._evict()
+
+        return instance
+
+
+def _read(path: str) -> tuple[bytes, os.stat_result]:
+    with open(path, 'rb') as f:
+        return f.read(), os.fstat(f.fileno())
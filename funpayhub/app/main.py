@@ -17,6 +17,7 @@ from funpayhub.loggers import main as logger
 from funpayhub.lib.base_app import App
 from funpayhub.lib.translater import _en, translater
 from funpayhub.lib.base_app.app import AppConfig
+from funpayhub.lib.goods_sources import GoodsSourcesManager
 
 from funpayhub.app.plugin import PluginManager
 from funpayhub.app.routers import ROUTERS
@@ -29,6 +30,7 @@ from funpayhub.app.dispatching import (
 from funpayhub.app.funpay.main import FunPay
 from funpayhub.app.telegram.main import Telegram
 from funpayhub.app.workflow_data import get_wfd
+from funpayhub.app.auto_delivery_matcher import AutoDeliveryMatcher
 from funpayhub.app.dispatching.events.other_events import FunPayHubStoppedEvent
 
 from .dispatching.events.properties_events import NodeDetachedEvent
@@ -78,6 +80,10 @@ class FunPayHub(App):
             dispatcher=HubDispatcher(workflow_data=self._workflow_data),
             properties=props,
             plugin_manager=PluginManager(self, props.version.value),
+            goods_manager=GoodsSourcesManager(
+                max_workers=props.general.goods_io_workers.value,
+                watch_interval=props.general.goods_watch_interval.value,
+            ),
             translater=translater,
             safe_mode=safe_mode,
             telegram_app=telegram_app,
@@ -93,6 +99,8 @@ class FunPayHub(App):
             runner_config=RunnerConfig(interval=props.general.runner_request_interval.value),
         )
 
+        self._auto_delivery_matcher = AutoDeliveryMatcher(props.auto_delivery)
+
         self._plugin_manager._disabled_plugins = set(
             props.plugin_properties.disabled_plugins.value,
         )
@@ -110,6 +118,7 @@ class FunPayHub(App):
                 'fp_formatters': self._funpay.text_formatters,
                 'formatters_registry': self._funpay.text_formatters,
                 'first_response_cache': self._funpay.first_response_cache,
+                'auto_delivery_matcher': self._auto_delivery_matcher,
             },
         )
 
@@ -177,6 +186,15 @@ class FunPayHub(App):
                         await self.telegram.dispatcher.stop_polling()
                     except RuntimeError:
                         pass
+                    try:
+                        await self.funpay.manually_sent_messages.save()
+                    except Exception:
+                        logger.error(
+                            _en('Unable to save manually sent messages.'),
+                            exc_info=True,
+                        )
+
+                    await self.goods_managers.unload_sources()
 
                     await self.dispatcher.event_entry(FunPayHubStoppedEvent())
             finally:
@@ -224,3 +242,7 @@ class FunPayHub(App):
     @property
     def dispatcher(self) -> HubDispatcher:
         return self._dispatcher
+
+    @property
+    def auto_delivery_matcher(self) -> AutoDeliveryMatcher:
+        return self._auto_delivery_matcher
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+
+__all__ = ['ManualMessagesStore']
+
+
+import os
+import asyncio
+from typing import Self
+from array import array
+from pathlib import Path
+from contextlib import suppress
+
+from funpayhub.loggers import main as logger
+
+from funpayhub.lib.translater import _en
+
+
+SAVE_DELAY = 5.0
+"""Через сколько секунд после добавления ID несохраненные ID записываются на диск."""
+
+SAVE_BATCH_SIZE = 64
+"""Кол-во несохраненных ID, при котором они записываются на диск сразу."""
+
+
+class ManualMessagesStore:
+    """
+    Хранилище ID сообщений, отправленных вручную через FunPay Hub.
+
+    ID хранятся в кольцевом буфере на `capacity` элементов (`array` из int64): при
+    переполнении вытесняются самые старые ID, поэтому расход памяти не растет.
+    Проверка `in` выполняется за O(1) по множеству, дублирующему содержимое буфера.
+
+    Буфер сохраняется в бинарный файл пачками: через `SAVE_DELAY` секунд после первого
+    несохраненного ID или сразу, если несохраненных ID набралось `SAVE_BATCH_SIZE`.
+    """
+
+    def __init__(self, path: Path | str, capacity: int = 10_000) -> None:
+        if capacity <= 0:
+            raise ValueError(f'Capacity must be positive, got {capacity}.')
+
+        self._path = Path(path)
+        self._capacity = capacity
+        self._ring = array('q')
+        self._head = 0
+        self._ids: set[int] = set()
+
+        self._unsaved = 0
+        self._save_now = asyncio.Event()
+        self._save_lock = asyncio.Lock()
+        self._save_task: asyncio.Task[None] | None = None
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def add(self, message_id: int) -> None:
+        if message_id in self._ids:
+            return
+
+        if len(self._ring) < self._capacity:
+            self._ring.append(message_id)
+        else:
+            self._ids.discard(self._ring[self._head])
+            self._ring[self._head] = message_id
+            self._head = (self._head + 1) % self._capacity
+        self._ids.add(message_id)
+
+        self._unsaved += 1
+        if self._unsaved >= SAVE_BATCH_SIZE:
+            self._save_now.set()
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_later())
+
+    async def save(self) -> None:
+        """
+        Сразу записывает несохраненные ID на диск.
+        """
+        if self._save_task is not None and not self._save_task.done():
+            self._save_now.set()
+            await self._save_task
+        elif self._unsaved:
+            await self._save()
+
+    async def _save_later(self) -> None:
+        with suppress(TimeoutError):
+            await asyncio.wait_for(self._save_now.wait(), SAVE_DELAY)
+        self._save_now.clear()
+
+        try:
+            await self._save()
+        except Exception:
+            logger.error(_en('Unable to save manually sent messages.'), exc_info=True)
+
+    async def _save(self) -> None:
+        async with self._save_lock:
+            # ID записываются от старых к новым, чтобы после загрузки вытеснялись старые.
+            data = self._ring[self._head :] + self._ring[: self._head]
+            self._unsaved = 0
+            await asyncio.to_thread(self._write, data)
+
+    def _write(self, data: array[int]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with tmp_path.open('wb') as f:
+            data.tofile(f)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @classmethod
+    def from_file(cls, path: Path | str, capacity: int = 10_000) -> Self:
+        path = Path(path)
+
+        if path.exists() and not path.is_file():
+            raise IsADirectoryError(f'{path} is not a file.')
+
+        instance = cls(path, capacity=capacity)
+
+        if not path.exists():
+            return instance
+
+        data = array('q')
+        with path.open('rb') as f:
+            raw = f.read()
+        data.frombytes(raw[: len(raw) - len(raw) % data.itemsize])
+        for message_id in data[-capacity:]:
+            if message_id not in instance._ids:
+                instance._ring.append(message_id)
+                instance._ids.add(message_id)
+
+        return instance
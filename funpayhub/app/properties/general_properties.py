@@ -5,12 +5,24 @@ from funpayhub.lib.translater import _
 
 __all__ = ['GeneralProperties']
 
-from funpayhub.lib.properties import Properties, FloatParameter, ChoiceParameter, StringParameter
+from funpayhub.lib.properties import (
+    Properties,
+    IntParameter,
+    FloatParameter,
+    ChoiceParameter,
+    StringParameter,
+)
 from funpayhub.lib.properties.parameter.choice_parameter import Choice
 
 from funpayhub.app.properties.flags import ParameterFlags
 
-from .validators import proxy_validator
+from .validators import (
+    proxy_validator,
+    goods_io_workers_validator,
+    formatters_timeout_validator,
+    goods_watch_interval_validator,
+    messages_sending_concurrency_validator,
+)
 from ...lib.base_app.properties_flags import TelegramUIEmojiFlag
 
 
@@ -94,3 +106,62 @@ class GeneralProperties(Properties):
                 flags=[TelegramUIEmojiFlag('⏳')],
             ),
         )
+
+        self.goods_io_workers = self.attach_node(
+            IntParameter(
+                id='goods_io_workers',
+                name=_('Потоки для работы с товарами'),
+                description=_(
+                    'Кол-во потоков, в которых выполняются чтение и запись источников товаров.\n'
+                    'Операции с товарами не блокируют работу бота, пока свободен хотя бы '
+                    'один поток.',
+                ),
+                default_value=2,
+                validator=goods_io_workers_validator,
+                flags=[TelegramUIEmojiFlag('🧵')],
+            ),
+        )
+
+        self.goods_watch_interval = self.attach_node(
+            FloatParameter(
+                id='goods_watch_interval',
+                name=_('Интервал проверки товарных файлов'),
+                description=_(
+                    'Интервал (в секундах), с которым FunPay Hub проверяет, не были ли товарные '
+                    'файлы изменены в обход бота, и подхватывает новые файлы в storage/goods.\n'
+                    '0 — не проверять.',
+                ),
+                default_value=5.0,
+                validator=goods_watch_interval_validator,
+                flags=[TelegramUIEmojiFlag('👀')],
+            ),
+        )
+
+        self.formatters_timeout = self.attach_node(
+            FloatParameter(
+                id='formatters_timeout',
+                name=_('Ограничение времени форматтеров'),
+                description=_(
+                    'Максимальное время (в секундах) выполнения одного форматтера. '
+                    'Если форматтер не успевает, форматирование текста завершается ошибкой.\n'
+                    '0 — без ограничения.',
+                ),
+                default_value=10.0,
+                validator=formatters_timeout_validator,
+                flags=[TelegramUIEmojiFlag('⏱')],
+            ),
+        )
+
+        self.messages_sending_concurrency = self.attach_node(
+            IntParameter(
+                id='messages_sending_concurrency',
+                name=_('Параллельная отправка сообщений'),
+                description=_(
+                    'Максимальное кол-во чатов, в которые FunPay Hub одновременно отправляет '
+                    'сообщения. Сообщения внутри одного чата всегда отправляются по порядку.',
+                ),
+                default_value=4,
+                validator=messages_sending_concurrency_validator,
+                flags=[TelegramUIEmojiFlag('📨')],
+            ),
+        )
@@ -10,6 +10,26 @@ async def entries_validator(value: int) -> None:
         raise ValidationError('Значение должно быть числом от 1 до 100.')
 
 
+async def goods_io_workers_validator(value: int) -> None:
+    if value <= 0 or value > 32:
+        raise ValidationError('Значение должно быть числом от 1 до 32.')
+
+
+async def messages_sending_concurrency_validator(value: int) -> None:
+    if value <= 0 or value > 16:
+        raise ValidationError('Значение должно быть числом от 1 до 16.')
+
+
+async def goods_watch_interval_validator(value: float) -> None:
+    if value < 0:
+        raise ValidationError('Значение должно быть неотрицательным числом.')
+
+
+async def formatters_timeout_validator(value: float) -> None:
+    if value < 0:
+        raise ValidationError('Значение должно быть неотрицательным числом.')
+
+
 async def proxy_validator(value: str) -> None:
     if not value:
         return
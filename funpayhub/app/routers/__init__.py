@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from .other import router as other_router
+from .auto_delivery import router as auto_delivery_router
 from .on_parameter_change import router
 
 
 ROUTERS = [
     router,
     other_router,
+    auto_delivery_router,
 ]
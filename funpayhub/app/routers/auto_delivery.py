@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from funpayhub.app.dispatching import Router
+
+
+if TYPE_CHECKING:
+    from funpayhub.lib.properties import Node
+
+    from funpayhub.app.auto_delivery_matcher import AutoDeliveryMatcher
+
+
+router = r = Router(name='fph:auto_delivery_router')
+
+
+@r.on_node_attached(
+    lambda node, properties: node.parent is properties.auto_delivery,
+    handler_id='fph:auto_delivery_entry_attached',
+)
+async def add_auto_delivery_entry(node: Node, auto_delivery_matcher: AutoDeliveryMatcher) -> None:
+    auto_delivery_matcher.add(node.id)
+
+
+@r.on_node_detached(
+    lambda parent, properties: parent is properties.auto_delivery,
+    handler_id='fph:auto_delivery_entry_detached',
+)
+async def remove_auto_delivery_entry(
+    node: Node,
+    auto_delivery_matcher: AutoDeliveryMatcher,
+) -> None:
+    auto_delivery_matcher.remove(node.id)
@@ -10,10 +10,14 @@ if TYPE_CHECKING:
     from funpayhub.lib.properties import (
         IntParameter,
         ListParameter,
+        FloatParameter,
         ChoiceParameter,
+        StringParameter,
         ToggleParameter,
     )
     from funpayhub.lib.translater import Translater
+    from funpayhub.lib.goods_sources import GoodsSourcesManager
+    from funpayhub.lib.hub.text_formatters import FormattersRegistry
 
     from funpayhub.app.funpay.main import FunPay
     from funpayhub.app.telegram.main import Telegram
@@ -62,3 +66,55 @@ async def update_disabled_plugins(parameter: ListParameter, plugin_manager: Plug
 )
 async def update_runner_requests_interval(parameter: IntParameter, fp: FunPay) -> None:
     fp._runner_config.interval = parameter.value
+
+
+@r.on_parameter_value_changed(
+    lambda parameter, properties: parameter is properties.general.goods_io_workers,
+    handler_id='fph:change_goods_io_workers',
+)
+async def change_goods_io_workers(
+    parameter: IntParameter,
+    goods_manager: GoodsSourcesManager,
+) -> None:
+    goods_manager.executor.resize(parameter.value)
+
+
+@r.on_parameter_value_changed(
+    lambda parameter, properties: parameter is properties.general.goods_watch_interval,
+    handler_id='fph:change_goods_watch_interval',
+)
+async def change_goods_watch_interval(
+    parameter: FloatParameter,
+    goods_manager: GoodsSourcesManager,
+) -> None:
+    goods_manager.watch_interval = parameter.value
+
+
+@r.on_parameter_value_changed(
+    lambda parameter, properties: parameter is properties.general.formatters_timeout,
+    handler_id='fph:change_formatters_timeout',
+)
+async def change_formatters_timeout(
+    parameter: FloatParameter,
+    fp_formatters: FormattersRegistry,
+) -> None:
+    fp_formatters.default_timeout = parameter.value or None
+
+
+@r.on_parameter_value_changed(
+    lambda parameter, properties: parameter is properties.general.messages_sending_concurrency,
+    handler_id='fph:change_messages_sending_concurrency',
+)
+async def change_messages_sending_concurrency(parameter: IntParameter, fp: FunPay) -> None:
+    fp.send_queue.max_concurrency = parameter.value
+
+
+@r.on_parameter_value_changed(
+    lambda parameter, fp_formatters: fp_formatters.is_pinned(parameter),
+    handler_id='fph:unpin_formatters_template',
+)
+async def unpin_formatters_template(
+    parameter: StringParameter,
+    fp_formatters: FormattersRegistry,
+) -> None:
+    fp_formatters.unpin(parameter)
@@ -23,7 +23,7 @@ from funpayhub.lib.base_app.telegram.app.ui.ui_finalizers import StripAndNavigat
 
 from funpayhub.app.telegram.ui.ids import MenuIds
 from funpayhub.app.telegram.callbacks import SendMessage
-from funpayhub.app.telegram.ui.premade import AddRemoveButtonBaseModification
+from funpayhub.app.telegram.ui.premade import AddRemoveButtonBaseModification, goods_amount_text
 
 from . import callbacks as cbs
 
@@ -92,7 +92,7 @@ class AutoDeliveryGoodsSourcesListMenuBuilder(
         for source in goods_manager.values():
             kb.add_callback_button(
                 button_id=f'bind_goods_source:{source.source_id}',
-                text=f'[{len(source)}] {source.display_id}',
+                text=f'[{goods_amount_text(source)}] {source.display_id}',
                 callback_data=cbs.BindGoodsSourceToAutoDelivery(
                     rule=ctx.entry_path[-1],
                     source_id=source.source_id,
@@ -9,6 +9,8 @@ __all__ = [
     'RemoveGoodsSource',
     'ReloadGoodsSource',
     'AddGoodsTxtSource',
+    'ToggleGoodsDeduplication',
+    'ImportGoodsFile',
 ]
 
 
@@ -40,3 +42,11 @@ class ReloadGoodsSource(CallbackData, identifier='reload_goods_source'):
 
 
 class AddGoodsTxtSource(CallbackData, identifier='add_goods_txt_source'): ...
+
+
+class ToggleGoodsDeduplication(CallbackData, identifier='toggle_goods_deduplication'):
+    source_id: str
+
+
+class ImportGoodsFile(CallbackData, identifier='import_goods_file'):
+    source_id: str
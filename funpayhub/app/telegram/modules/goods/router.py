@@ -1,22 +1,34 @@
 from __future__ import annotations
 
+import os
 import re
 import html
+import uuid
+import codecs
+import asyncio
 from typing import TYPE_CHECKING, Any
-from io import BytesIO
 from pathlib import Path
+from collections.abc import AsyncIterator
 
 from aiogram import Router
 from aiogram.types import (
     Message,
+    InputFile,
     CallbackQuery as Query,
-    BufferedInputFile,
 )
 from aiogram.filters import StateFilter
 from aiogram.exceptions import TelegramBadRequest
 
-from funpayhub.lib.translater import translater
-from funpayhub.lib.goods_sources import GoodsSource, FileGoodsSource
+from funpayhub.loggers import goods as logger
+
+from funpayhub.lib.translater import _en, translater
+from funpayhub.lib.goods_sources import (
+    GoodsSource,
+    FileGoodsSource,
+    SqliteGoodsSource,
+    iter_lines,
+    encode_goods,
+)
 from funpayhub.lib.base_app.telegram import utils
 
 from funpayhub.app.workflow_data import get_wfd
@@ -41,6 +53,11 @@ if TYPE_CHECKING:
 r = router = Router(name='fph:goods')
 ru = translater.translate
 
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+DOWNLOAD_TIMEOUT = 300
+GZIP_GOODS_THRESHOLD = 100_000
+"""Кол-во товаров, начиная с которого выгружаемый файл сжимается в gzip."""
+
 
 # -------- Helpers --------
 async def _get_source(trigger: Query | Message, source_id: str) -> GoodsSource | None:
@@ -55,13 +72,70 @@ async def _get_source(trigger: Query | Message, source_id: str) -> GoodsSource |
     return source
 
 
-async def _get_goods_from_message(message: Message) -> list[str]:
+async def _iter_document(bot: TGBot, file_path: str) -> AsyncIterator[bytes]:
+    """
+    Скачивает файл из Telegram кусками, не сохраняя его целиком ни в памяти, ни на диске.
+    """
+    if bot.session.api.is_local:
+        path = bot.session.api.wrap_local_file.to_local(file_path)
+        with open(path, 'rb') as f:
+            while chunk := await asyncio.to_thread(f.read, DOWNLOAD_CHUNK_SIZE):
+                yield chunk
+        return
+
+    async for chunk in bot.session.stream_content(
+        url=bot.session.api.file_url(bot.token, file_path),
+        timeout=DOWNLOAD_TIMEOUT,
+        chunk_size=DOWNLOAD_CHUNK_SIZE,
+        raise_for_status=True,
+    ):
+        yield chunk
+
+
+async def _get_goods_from_message(message: Message) -> AsyncIterator[str]:
     if message.document:
-        io = BytesIO()
         file = await message.bot.get_file(message.document.file_id)
-        await message.bot.download_file(file.file_path, io)
-        return io.getbuffer().tobytes().decode('utf-8').splitlines()
-    return message.text.split('\n')
+        async for line in iter_lines(_iter_document(message.bot, file.file_path)):
+            yield line
+        return
+
+    for line in message.text.split('\n'):
+        yield line
+
+
+def _is_utf8(path: Path) -> bool:
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        with path.open('rb') as f:
+            while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+                decoder.decode(chunk)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _find_file_source(goods_manager: GoodsManager, path: Path) -> FileGoodsSource | None:
+    path = path.absolute()
+    for source in goods_manager.values():
+        if isinstance(source, FileGoodsSource) and source.path.absolute() == path:
+            return source
+    return None
+
+
+class GoodsInputFile(InputFile):
+    """
+    Файл с товарами источника, который формируется пачками во время отправки.
+    """
+
+    def __init__(self, source: GoodsSource, compress: bool = False) -> None:
+        super().__init__(filename='goods.txt.gz' if compress else 'goods.txt')
+        self.source = source
+        self.compress = compress
+
+    async def read(self, bot: TGBot) -> AsyncIterator[bytes]:
+        async for chunk in encode_goods(self.source.iter_goods(), compress=self.compress):
+            yield chunk
 
 
 # -------- Handlers --------
@@ -70,10 +144,8 @@ async def download_goods(q: Query, cbd: cbs.DownloadGoods) -> None:
     if (source := await _get_source(q, cbd.source_id)) is None:
         return
 
-    goods = await source.get_goods(-1)
-
     await q.message.answer_document(
-        BufferedInputFile('\n'.join(goods).encode('utf-8'), 'goods.txt'),
+        GoodsInputFile(source, compress=len(source) >= GZIP_GOODS_THRESHOLD),
         caption=f'<b>{html.escape(source.display_id)}</b>',
     )
     await q.answer()
@@ -92,13 +164,27 @@ async def reload_goods(q: Query, cbd: cbs.ReloadGoodsSource, tg_ui: UI) -> None:
         pass
 
 
+@router.callback_query(cbs.ToggleGoodsDeduplication.filter())
+async def toggle_deduplication(q: Query, cbd: cbs.ToggleGoodsDeduplication, tg_ui: UI) -> None:
+    if (source := await _get_source(q, cbd.source_id)) is None:
+        return
+    if not source.supports_deduplication:
+        await q.answer(ru('❌ Источник не поддерживает проверку дубликатов.'), show_alert=True)
+        return
+
+    await source.set_deduplication(not source.deduplicate)
+    await q.answer()
+    await tg_ui.context_from_history(cbd.ui_history, trigger=q).apply_to()
+
+
 @router.callback_query(cbs.UploadGoods.filter())
 @router.callback_query(cbs.RemoveGoods.filter())
 @router.callback_query(cbs.AddGoods.filter())
+@router.callback_query(cbs.ImportGoodsFile.filter())
 async def upload_goods_set_state(
     q: Query,
     state: FSM,
-    cbd: cbs.UploadGoods | cbs.RemoveGoods | cbs.AddGoods,
+    cbd: cbs.UploadGoods | cbs.RemoveGoods | cbs.AddGoods | cbs.ImportGoodsFile,
 ) -> Any:
     mapping = {
         cbs.UploadGoods: (
@@ -129,6 +215,14 @@ async def upload_goods_set_state(
             ),
             states.AddingGoods,
         ),
+        cbs.ImportGoodsFile: (
+            ru(
+                '📥 Отправьте имя файла с товарами из папки <code>storage/goods</code>, '
+                'где каждая новая строка — отдельный товар.\n\n'
+                'Товары будут <b><u>добавлены</u></b> к текущему списку, файл не изменится.',
+            ),
+            states.ImportingGoodsFile,
+        ),
     }
 
     text, state_cls = mapping[type(cbd)]
@@ -149,7 +243,10 @@ async def upload_goods(m: Message, state: FSM, tg_ui: UI) -> Any:
         return None
 
     try:
-        new_goods = await _get_goods_from_message(m)
+        duplicates = await source.add_goods_stream(
+            _get_goods_from_message(m),
+            replace=isinstance(data, states.UploadingGoods),
+        )
     except:
         return m.reply(
             ru(
@@ -158,12 +255,53 @@ async def upload_goods(m: Message, state: FSM, tg_ui: UI) -> Any:
             ),
         )
 
-    if isinstance(data, states.UploadingGoods):
-        await source.set_goods(new_goods)
-    elif isinstance(data, states.AddingGoods):
-        await source.add_goods(new_goods)
+    if duplicates:
+        await m.reply(
+            ru('♻️ Пропущено дубликатов: <b>{amount}</b>.', amount=duplicates),
+        )
+    await tg_ui.context_from_history(data.ui_history, trigger=m).answer_to()
+
+
+@router.message(states.ImportingGoodsFile.filter())
+async def import_goods_file(m: Message, state: FSM, tg_ui: UI, goods_manager: GoodsManager) -> Any:
+    data = await states.ImportingGoodsFile.clear(state)
+    utils.delete_message(data.state_message)
+
+    if (source := await _get_source(m, data.source_id)) is None:
+        return None
+    if not isinstance(source, SqliteGoodsSource):
+        return None
 
+    base_path = Path('storage/goods')
+    path = base_path / (m.text or '').strip()
+    if path.suffix != '.txt':
+        path = path.with_suffix('.txt')
+    if path.parent.resolve() != base_path.resolve() or not path.is_file():
+        return m.reply(ru('<b>❌ Файл {file} не найден.</b>', file=html.escape(str(path))))
+
+    try:
+        imported = await source.import_file(path)
+    except Exception:
+        logger.error(
+            _en('Unable to import goods from %s to %s.'),
+            path,
+            source.source_id,
+            exc_info=True,
+        )
+        return m.reply(
+            ru('<b>❌ Не удалось импортировать товары из файла. Подробности в логах.</b>'),
+        )
+
+    text = ru('📥 Импортировано товаров: <b>{amount}</b>.', amount=imported)
+    if 'file://' + str(path) in goods_manager:
+        text += '\n\n' + ru(
+            '⚠️ Файл {file} по-прежнему является источником товаров. '
+            'Удалите его, чтобы товары не были выданы дважды.',
+            file=html.escape(str(path)),
+        )
+    await m.reply(text)
     await tg_ui.context_from_history(data.ui_history, trigger=m).answer_to()
+    return None
 
 
 amount_re = re.compile(r'(\d+)-(\d+)')
@@ -240,18 +378,37 @@ async def add_source(m: Message, state: FSM, tg_bot: TGBot, goods_manager: Goods
     new_id = 'file://' + str(path)
 
     if new_id in goods_manager:
-        await m.reply(ru('<b>❌ Файл {file} уже существует.</b>', file=str(path)))
+        return m.reply(ru('<b>❌ Файл {file} уже существует.</b>', file=str(path)))
 
     await state.clear()
 
     if m.document:
         file = await tg_bot.get_file(m.document.file_id)
-        buffer = BytesIO()
-        await tg_bot.download_file(file.file_path, buffer)
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(buffer.getvalue().decode('utf-8'))
-
-    source = await goods_manager.add_source(FileGoodsSource, path)
+        # Файл скачивается под временным именем, которое не подхватит поиск новых товарных
+        # файлов, и появляется в storage/goods только целиком и после проверки.
+        tmp = path.with_name(f'.{uuid.uuid4().hex}.part')
+        try:
+            await tg_bot.download_file(file.file_path, tmp, timeout=DOWNLOAD_TIMEOUT)
+            if not await asyncio.to_thread(_is_utf8, tmp):
+                return m.reply(ru('<b>❌ Файл должен быть в кодировке UTF-8.</b>'))
+            os.replace(tmp, path)
+        except Exception:
+            logger.error(_en('Unable to download goods file %s.'), path, exc_info=True)
+            return m.reply(ru('<b>❌ Не удалось загрузить файл. Подробности в логах.</b>'))
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    source = _find_file_source(goods_manager, path)
+    try:
+        if source is None:
+            source = await goods_manager.add_source(FileGoodsSource, path)
+    except ValueError:
+        # Файл успели зарегистрировать при поиске новых товарных файлов.
+        if (source := _find_file_source(goods_manager, path)) is None:
+            raise
+    except Exception:
+        logger.error(_en('Unable to load goods file %s.'), path, exc_info=True)
+        return m.reply(ru('<b>❌ Не удалось загрузить файл. Подробности в логах.</b>'))
 
     await GoodsInfoMenuContext(
         menu_id=MenuIds.goods_source_info,
@@ -260,6 +417,7 @@ async def add_source(m: Message, state: FSM, tg_bot: TGBot, goods_manager: Goods
         ui_history=data.ui_history,
     ).answer_to()
     utils.delete_message(data.message)
+    return None
 
 
 @r.callback_query(cbs.RemoveGoodsSource.filter())
@@ -28,6 +28,12 @@ class AddingGoods(StateFromQuery, identifier='fph:adding_goods'):
     state_message: Message
 
 
+@dataclass
+class ImportingGoodsFile(StateFromQuery, identifier='fph:importing_goods_file'):
+    source_id: str
+    state_message: Message
+
+
 @dataclass
 class AddingGoodsTxtSource(StateFromQuery, identifier='fph:adding_goods_txt_source'):
     state_message: Message
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING
 
 from funpayhub.lib.translater import translater
 from funpayhub.lib.telegram.ui import Menu, Button, MenuBuilder, MenuContext, KeyboardBuilder
+from funpayhub.lib.goods_sources import SqliteGoodsSource
 from funpayhub.lib.base_app.telegram.app.ui.callbacks import OpenMenu
 from funpayhub.lib.base_app.telegram.app.ui.ui_finalizers import (
     StripAndNavigationFinalizer,
@@ -12,7 +13,7 @@ from funpayhub.lib.base_app.telegram.app.ui.ui_finalizers import (
 )
 
 from funpayhub.app.telegram.ui.ids import MenuIds
-from funpayhub.app.telegram.ui.premade import AddRemoveButtonBaseModification
+from funpayhub.app.telegram.ui.premade import AddRemoveButtonBaseModification, goods_amount_text
 
 from . import callbacks as cbs
 
@@ -38,7 +39,7 @@ class GoodsSourcesListMenuBuilder(
         for source in goods_manager.values():
             kb.add_callback_button(
                 button_id=f'open_source:{source.source_id}',
-                text=f'[{len(source)}] {source.display_id}',
+                text=f'[{goods_amount_text(source)}] {source.display_id}',
                 callback_data=OpenMenu(
                     menu_id=MenuIds.goods_source_info,
                     context_data={'source_id': source.source_id},
@@ -53,8 +54,22 @@ class GoodsSourcesListMenuBuilder(
             callback_data=cbs.AddGoodsTxtSource(ui_history=ctx.as_ui_history()).pack(),
         )
 
+        stats = goods_manager.executor.stats
+        text = ru('🗳 Источники товаров')
+        if stats.calls:
+            text += '\n\n' + ru(
+                '⏱ Операций с товарами: <b>{calls}</b>.\n'
+                'Ожидание в очереди: <b>{queued:.1f}</b> мс (макс. {max_queued:.1f} мс).\n'
+                'Выполнение: <b>{executing:.1f}</b> мс (макс. {max_executing:.1f} мс).',
+                calls=stats.calls,
+                queued=stats.avg_queued_time * 1000,
+                max_queued=stats.max_queued_time * 1000,
+                executing=stats.avg_executing_time * 1000,
+                max_executing=stats.max_executing_time * 1000,
+            )
+
         return Menu(
-            main_text=ru('🗳 Источники товаров'),
+            main_text=text,
             main_keyboard=kb,
             footer_keyboard=footer_kb,
             finalizer=StripAndNavigationFinalizer(),
@@ -108,6 +123,27 @@ class GoodsSourceInfoMenuBuilder(
             ),
         )
 
+        if source.supports_deduplication:
+            kb.add_callback_button(
+                button_id='toggle_deduplication',
+                text=ru('🔁 Проверка дубликатов: вкл.')
+                if source.deduplicate
+                else ru('🔁 Проверка дубликатов: выкл.'),
+                callback_data=cbs.ToggleGoodsDeduplication(
+                    source_id=source.source_id,
+                    ui_history=ctx.as_ui_history(),
+                ).pack(),
+            )
+        if isinstance(source, SqliteGoodsSource):
+            kb.add_callback_button(
+                button_id='import_goods_file',
+                text=ru('📥 Импортировать из файла'),
+                callback_data=cbs.ImportGoodsFile(
+                    source_id=source.source_id,
+                    ui_history=ctx.as_ui_history(),
+                ).pack(),
+            )
+
         kb.add_callback_button(
             button_id='reload_source',
             text=ru('🔄 Перезагрузить источник'),
@@ -124,7 +160,7 @@ class GoodsSourceInfoMenuBuilder(
             '🧩 Тип источника: <b><i>{goods_source_type}</i></b>.\n'
             '🧭 Источник: <code class="language-Источник">{goods_source}</code>',
             goods_source_id=source.display_id,
-            goods_amount=len(source),
+            goods_amount=goods_amount_text(source),
             goods_source_type=ru(source.display_source_type),
             goods_source=ru(source.display_source),
         )
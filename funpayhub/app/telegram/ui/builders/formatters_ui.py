@@ -72,6 +72,60 @@ class FormatterListMenuBuilder(
                 ).pack(),
             )
 
+        menu.footer_keyboard.add_callback_button(
+            button_id='open_formatters_stats',
+            text=ru('📊 Статистика'),
+            callback_data=OpenMenu(
+                menu_id=MenuIds.formatters_stats,
+                ui_history=ctx.as_ui_history(),
+            ).pack(),
+        )
+
+        return menu
+
+
+class FormattersStatsMenuBuilder(
+    MenuBuilder,
+    menu_id=MenuIds.formatters_stats,
+    context_type=MenuContext,
+):
+    async def build(self, ctx: MenuContext, fp_formatters: FormattersRegistry) -> Menu:
+        menu = Menu(finalizer=StripAndNavigationFinalizer())
+        menu.header_text = ru('📊 <b>Статистика форматтеров</b>')
+
+        stats = sorted(fp_formatters.stats.items(), key=lambda i: i[1].total_time, reverse=True)
+        lines = []
+        for key, formatter_stats in stats:
+            formatter = fp_formatters._formatters.get(key)
+            name = translater.translate(formatter.name) if formatter else f'${key}'
+            timeout = fp_formatters.get_timeout(formatter) if formatter else None
+            lines.append(
+                ru(
+                    '<b>{name}</b>\n'
+                    'Вызовов: <b>{calls}</b>, ошибок: <b>{errors}</b> '
+                    '(по таймауту: <b>{timeouts}</b>)\n'
+                    'p50: <b>{p50}</b> мс, p95: <b>{p95}</b> мс, max: <b>{max}</b> мс\n'
+                    'Ограничение: <b>{timeout}</b>',
+                    name=name,
+                    calls=formatter_stats.calls,
+                    errors=formatter_stats.errors,
+                    timeouts=formatter_stats.timeouts,
+                    p50=f'{formatter_stats.p50 * 1000:.1f}',
+                    p95=f'{formatter_stats.p95 * 1000:.1f}',
+                    max=f'{formatter_stats.max_time * 1000:.1f}',
+                    timeout=f'{timeout:g} с' if timeout else '—',
+                ),
+            )
+        menu.main_text = '\n\n'.join(lines) or ru('Форматтеры еще не выполнялись.')
+
+        menu.footer_keyboard.add_callback_button(
+            button_id='refresh_formatters_stats',
+            text=ru('🔄 Обновить'),
+            callback_data=OpenMenu(
+                menu_id=MenuIds.formatters_stats,
+                ui_history=ctx.ui_history,
+            ).pack(),
+        )
         return menu
 
 
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import html
+import time
 from typing import TYPE_CHECKING
+from datetime import datetime
 
 from funpaybotengine.exceptions import UnauthorizedError, BotUnauthenticatedError
 
@@ -158,6 +160,15 @@ class MainMenuBuilder(MenuBuilder, menu_id=MenuIds.main_menu, context_type=MenuC
             ).pack(),
         )
 
+        kb.add_callback_button(
+            button_id='open_offers_raising',
+            text=ru('⬆️ Поднятие лотов'),
+            callback_data=OpenMenu(
+                menu_id=MenuIds.offers_raising,
+                ui_history=ctx.as_ui_history(),
+            ).pack(),
+        )
+
         kb.add_callback_button(
             button_id='open_plugins_list',
             text=ru('🧩 Расширения'),
@@ -207,9 +218,61 @@ class RequestsMenuBuilder(MenuBuilder, menu_id='fph:request_menu', context_type=
                 continue
             text += f'<b>{html.escape(k)}: {v}</b>\n'
 
+        cache_counter = hub.funpay.session.cache_counter
+        text += (
+            f'\n<b>GET-запросы: из кеша {cache_counter["hits"]}, '
+            f'объединено {cache_counter["joined"]}, выполнено {cache_counter["misses"]}</b>\n'
+        )
+
+        text += '\n<b>Ограничения запросов:</b>\n'
+        for endpoint, bucket in hub.funpay.session.limiter.buckets.items():
+            stats = bucket.stats
+            text += (
+                f'<b>{endpoint}</b>: {bucket.rate:.2f}/{bucket.max_rate:.2f} в сек., '
+                f'в очереди {bucket.depth()}, ожидание ср. {stats.avg_wait:.2f} / '
+                f'макс. {stats.max_wait:.2f} сек., 429: {stats.rate_limited}\n'
+            )
+
         return Menu(main_text=text)
 
 
+class OffersRaisingMenuBuilder(
+    MenuBuilder,
+    menu_id=MenuIds.offers_raising,
+    context_type=MenuContext,
+):
+    async def build(self, ctx: MenuContext, fp: FunPay) -> Menu:
+        menu = Menu(finalizer=StripAndNavigationFinalizer())
+        menu.header_text = ru('⬆️ <b>Поднятие лотов</b>')
+
+        now = time.time()
+        lines = []
+        for category, next_raise_at in fp.offers_raiser.scheduled_raises():
+            wait = max(0, int(next_raise_at - now))
+            lines.append(
+                ru(
+                    '<b>{category}</b>: {time} (через {minutes} мин. {seconds} сек.)',
+                    category=html.escape(category.name),
+                    time=datetime.fromtimestamp(next_raise_at).strftime('%H:%M:%S'),
+                    minutes=wait // 60,
+                    seconds=wait % 60,
+                ),
+            )
+        menu.main_text = '\n'.join(lines) or ru(
+            'Автоподнятие выключено или на профиле нет лотов, которые можно поднять.',
+        )
+
+        menu.footer_keyboard.add_callback_button(
+            button_id='refresh_offers_raising',
+            text=ru('🔄 Обновить'),
+            callback_data=OpenMenu(
+                menu_id=MenuIds.offers_raising,
+                ui_history=ctx.ui_history,
+            ).pack(),
+        )
+        return menu
+
+
 class NewReviewNotificationMenuBuilder(
     MenuBuilder,
     menu_id=MenuIds.review_notification,
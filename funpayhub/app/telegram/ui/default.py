@@ -13,6 +13,7 @@ from .builders import (
 MENU_BUILDERS = [
     formatters_ui.FormatterListMenuBuilder,
     formatters_ui.FormatterInfoMenuBuilder,
+    formatters_ui.FormattersStatsMenuBuilder,
     notifications_ui.NotificationsMenuBuilder,
     message_ui.NewMessageNotificationMenuBuilder,
     message_ui.SendMessageMenuBuilder,
@@ -21,6 +22,7 @@ MENU_BUILDERS = [
     other_ui.FunPayStartNotificationMenuBuilder,
     other_ui.StateMenuBuilder,
     other_ui.RequestsMenuBuilder,
+    other_ui.OffersRaisingMenuBuilder,
     other_ui.NewReviewNotificationMenuBuilder,
 ]
 
@@ -11,6 +11,8 @@ class MenuIds(BaseMenuIds):
     main_menu = 'fph:main_menu'
     formatters_list = 'fph:formatters_list'
     formatter_info = 'fph:formatter_info'
+    formatters_stats = 'fph:formatters_stats'
+    offers_raising = 'fph:offers_raising'
     tg_chat_notifications = 'fph:tg_chat_notifications'
     add_command = 'fph:add_command'
     control = 'fph:control'
@@ -12,6 +12,7 @@ from funpayhub.app.properties.flags import FormattersQueryFlag
 from funpayhub.app.properties.review_reply import ReviewReplyPropertiesEntry
 
 from .ids import MenuIds
+from .premade import goods_amount_text
 
 
 if TYPE_CHECKING:
@@ -119,7 +120,8 @@ class AutoDeliveryNodeInfoModification(MenuModification, modification_id='fph:ad
                 parts.append(
                     f'<b><i>{ru("🗳 Источник товаров")}</i></b>: '
                     f'<code>{html.escape(source.display_id)}</code>\n'
-                    f'<b><i>{ru("🗳 Доступно товаров")}: <code>{len(source)}</code></i></b>',
+                    f'<b><i>{ru("🗳 Доступно товаров")}: '
+                    f'<code>{goods_amount_text(source)}</code></i></b>',
                 )
 
         if node.delivery_text.value:
@@ -4,8 +4,11 @@ from __future__ import annotations
 __all__ = [
     'AddRemoveButtonBaseModification',
     'confirmable_button',
+    'goods_amount_text',
 ]
 
+from typing import TYPE_CHECKING
+
 from funpayhub.lib.translater import translater
 from funpayhub.lib.telegram.ui import MenuContext, MenuModification
 from funpayhub.lib.telegram.ui.types import Menu, Button
@@ -14,9 +17,20 @@ from funpayhub.lib.base_app.telegram.app.ui.callbacks import Dummy
 from funpayhub.app.telegram.callbacks import Confirmation
 
 
+if TYPE_CHECKING:
+    from funpayhub.lib.goods_sources import GoodsSource
+
+
 ru = translater.translate
 
 
+def goods_amount_text(source: GoodsSource) -> str:
+    """
+    Возвращает кол-во товаров источника для отображения в меню.
+    """
+    return ru('подсчет…') if source.is_counting else str(len(source))
+
+
 def confirmable_button(
     ctx: MenuContext,
     button_id: str,
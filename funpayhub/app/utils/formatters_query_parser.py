@@ -8,6 +8,8 @@ __all__ = ['parse_categories_query']
 
 import re
 from typing import Iterator
+from functools import lru_cache
+from collections.abc import Hashable
 
 
 TOKEN_REGEX = re.compile(
@@ -57,6 +59,13 @@ class CategoryIDQuery(CategoriesQuery):
             return False
         return cat.contains(formatter, registry)
 
+    @property
+    def cache_key(self) -> Hashable:
+        return 'in', self.id
+
+    def mask(self, registry) -> int:
+        return registry.category_mask(self.id)
+
 
 class Parser:
     def __init__(self, tokens: list[Token]) -> None:
@@ -123,6 +132,7 @@ class Parser:
         raise SyntaxError(f'Unexpected token: {token}')
 
 
+@lru_cache(maxsize=128)
 def parse_categories_query(expr: str) -> CategoriesQuery:
     tokens = list(tokenize(expr))
     parser = Parser(tokens)
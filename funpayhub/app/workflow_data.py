@@ -21,6 +21,7 @@ if TYPE_CHECKING:
     from funpayhub.app.funpay.main import FunPay
     from funpayhub.app.telegram.main import Telegram
     from funpayhub.app.first_response_cache import FirstResponseCache
+    from funpayhub.app.auto_delivery_matcher import AutoDeliveryMatcher
 
 
 class WorkflowData(BaseWorkflowData):
@@ -34,6 +35,7 @@ class WorkflowData(BaseWorkflowData):
         fp_dispatcher: FPDispatcher
         plugins_manager: PluginManager
         first_response_cache: FirstResponseCache
+        auto_delivery_matcher: AutoDeliveryMatcher
 
     def __init__(self) -> None:
         super().__init__()
@@ -44,6 +46,7 @@ class WorkflowData(BaseWorkflowData):
         from funpayhub.app.funpay.main import FunPay
         from funpayhub.app.telegram.main import Telegram
         from funpayhub.app.first_response_cache import FirstResponseCache
+        from funpayhub.app.auto_delivery_matcher import AutoDeliveryMatcher
 
         self.check_items.update(
             {
@@ -57,6 +60,7 @@ class WorkflowData(BaseWorkflowData):
                 'properties': lambda v: isinstance(v, FunPayHubProperties),
                 'plugins_manager': lambda v: isinstance(v, PluginManager),
                 'first_response_cache': lambda v: isinstance(v, FirstResponseCache),
+                'auto_delivery_matcher': lambda v: isinstance(v, AutoDeliveryMatcher),
             },
         )
 
@@ -26,7 +26,11 @@ from funpayhub.lib.translater import (
     _en,
     translater as global_translater,
 )
-from funpayhub.lib.goods_sources import FileGoodsSource, GoodsSourcesManager
+from funpayhub.lib.goods_sources import (
+    FileGoodsSource,
+    SqliteGoodsSource,
+    GoodsSourcesManager,
+)
 
 from ... import exit_codes
 from .telegram import TelegramApp
@@ -62,6 +66,7 @@ class App:
         properties: Properties,
         plugin_manager: PluginManager,
         repositories_manager: RepositoriesManager | None = None,
+        goods_manager: GoodsSourcesManager | None = None,
         translater: Translater | None = None,
         telegram_app: TelegramApp | None = None,
         safe_mode: bool = False,
@@ -76,7 +81,7 @@ class App:
         self._safe_mode = safe_mode
         self._properties = properties
         self._translater = translater or global_translater
-        self._goods_manager = GoodsSourcesManager()
+        self._goods_manager = goods_manager if goods_manager is not None else GoodsSourcesManager()
         self._plugin_manager = plugin_manager
         self._plugin_manager._safe_mode = self._safe_mode
         self._repositories_manager = (
@@ -134,6 +139,8 @@ class App:
 
             await self._repositories_manager._load_repositories()
             await self._load_file_goods_sources()
+            await self._load_sqlite_goods_sources()
+            self._goods_manager.start_watching(Path('storage/goods'))
             await self._load_plugins()
 
             self._setup_completed = True
@@ -162,7 +169,7 @@ class App:
             if not file.is_file():
                 continue
 
-            if not file.suffix == '.txt':
+            if not file.suffix == '.txt' or file.name.startswith('.'):
                 continue
 
             logger.info(_en('Loading goods file %s.'), file)
@@ -176,6 +183,38 @@ class App:
                     e.format_args(self.translater.translate(e.message)),
                 )
 
+    async def _load_sqlite_goods_sources(self) -> None:
+        logger.info(_en('Loading goods databases.'))
+
+        base_path = Path('storage/goods')
+        if not base_path.exists():
+            return
+
+        for file in base_path.iterdir():
+            if not file.is_file():
+                continue
+
+            if file.suffix not in ('.db', '.sqlite', '.sqlite3'):
+                continue
+
+            try:
+                tables = SqliteGoodsSource.list_tables(file)
+            except Exception:
+                logger.error(_en('Unable to read goods database %s.'), file, exc_info=True)
+                continue
+
+            for table in tables:
+                logger.info(_en('Loading goods table %s from %s.'), table, file)
+                try:
+                    await self._goods_manager.add_source(SqliteGoodsSource, file, table)
+                except GoodsError as e:
+                    logger.error(
+                        _en('An error occurred while loading goods table %s from %s: %s'),
+                        table,
+                        file,
+                        e.format_args(self.translater.translate(e.message)),
+                    )
+
     async def create_crash_log(self) -> None:
         os.makedirs('logs', exist_ok=True)
         with open('logs/crashlog.log', 'w', encoding='utf-8') as f:
@@ -5,9 +5,15 @@ __all__ = [
     'classproperty',
     'SafeTuple',
     'safetuple',
+    'injection_plan',
+    'inject',
 ]
 
 
+from .injection import (
+    inject as inject,
+    injection_plan as injection_plan,
+)
 from .safe_tuple import (
     SafeTuple as SafeTuple,
     safetuple as safetuple,
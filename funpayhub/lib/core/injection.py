@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+
+__all__ = ['injection_plan', 'inject']
+
+
+from types import MethodType, FunctionType
+from weakref import WeakKeyDictionary
+from collections.abc import Callable
+
+from typing_extensions import Any
+from eventry.asyncio.callable_wrappers import CallableWrapper
+
+
+_plans: WeakKeyDictionary[FunctionType, CallableWrapper[Any]] = WeakKeyDictionary()
+
+
+def injection_plan(func: FunctionType) -> CallableWrapper[Any]:
+    """
+    Возвращает закешированный план внедрения зависимостей для функции.
+
+    План (`CallableWrapper` над несвязанной функцией) вычисляется один раз на функцию:
+    разбор сигнатуры не повторяется при каждом вызове, а экземпляр (`self`) передается
+    первым позиционным аргументом.
+
+    :param func: функция (в т.ч. несвязанный метод класса).
+    """
+    try:
+        return _plans[func]
+    except KeyError:
+        plan = _plans[func] = CallableWrapper(func)
+        return plan
+
+
+def _resolve(obj: Callable[..., Any]) -> tuple[FunctionType, tuple[Any, ...]] | None:
+    if isinstance(obj, FunctionType):
+        return obj, ()
+    if isinstance(obj, MethodType):
+        if isinstance(obj.__func__, FunctionType):
+            return obj.__func__, (obj.__self__,)
+        return None
+
+    call = getattr(type(obj), '__call__', None)
+    if isinstance(call, FunctionType):
+        return call, (obj,)
+    return None
+
+
+async def inject(
+    obj: Callable[..., Any],
+    args: tuple[Any, ...] = (),
+    data: dict[str, Any] | None = None,
+) -> Any:
+    """
+    Вызывает `obj`, подставляя недостающие аргументы из `data`, по закешированному плану.
+
+    Поведение совпадает с `CallableWrapper(obj)(args, data)`.
+
+    :param obj: функция, метод или объект с методом `__call__`.
+    :param args: позиционные аргументы.
+    :param data: данные, из которых берутся значения остальных аргументов.
+    """
+    resolved = _resolve(obj)
+    if resolved is None:
+        return await CallableWrapper(obj)(args, data)
+
+    func, bound = resolved
+    return await injection_plan(func)((*bound, *args), data)
@@ -7,6 +7,7 @@ __all__ = [
     'GoodsError',
     'GoodsSourceNotFoundError',
     'NotEnoughGoodsError',
+    'ReservationExpiredError',
     'PropertiesError',
     'ValidationError',
     'ConvertionError',
@@ -23,7 +24,12 @@ __all__ = [
 
 
 from .base import FunPayHubError, TranslatableException
-from .goods import GoodsError, NotEnoughGoodsError, GoodsSourceNotFoundError
+from .goods import (
+    GoodsError,
+    NotEnoughGoodsError,
+    ReservationExpiredError,
+    GoodsSourceNotFoundError,
+)
 from .plugins import (
     PluginError,
     SaveRepositoryError,
@@ -5,6 +5,7 @@ __all__ = [
     'GoodsError',
     'NotEnoughGoodsError',
     'GoodsSourceNotFoundError',
+    'ReservationExpiredError',
 ]
 
 from typing import TYPE_CHECKING
@@ -15,7 +16,7 @@ from .base import FunPayHubError
 
 
 if TYPE_CHECKING:
-    from funpayhub.lib.goods_sources import GoodsSource
+    from funpayhub.lib.goods_sources import GoodsSource, Reservation
 
 
 class GoodsError(FunPayHubError): ...
@@ -54,3 +55,17 @@ class GoodsSourceNotFoundError(GoodsError, KeyError):
     @property
     def source_id(self) -> str:
         return self._source_id
+
+
+class ReservationExpiredError(GoodsError):
+    def __init__(self, reservation: Reservation) -> None:
+        super().__init__(
+            _en('Reservation %s of goods source %s has expired or is no longer valid.'),
+            reservation.id,
+            reservation.source_id,
+        )
+        self._reservation = reservation
+
+    @property
+    def reservation(self) -> Reservation:
+        return self._reservation
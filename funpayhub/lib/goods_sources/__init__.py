@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+
+__all__ = [
+    'GoodsSource',
+    'Reservation',
+    'FileGoodsSource',
+    'SqliteGoodsSource',
+    'GoodsSourcesManager',
+    'GoodsIOExecutor',
+    'GoodsIOStats',
+    'iter_lines',
+    'encode_goods',
+]
+
+
+from .base import GoodsSource, Reservation
+from .file import FileGoodsSource
+from .sqlite import SqliteGoodsSource
+from .manager import GoodsSourcesManager
+from .executor import GoodsIOStats, GoodsIOExecutor
+from .streaming import iter_lines, encode_goods
@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+
+__all__ = ['GoodsSource', 'Reservation']
+
+
+import time
+import uuid
+from typing import TYPE_CHECKING, Any
+from dataclasses import field, dataclass
+from abc import ABC, abstractmethod
+from asyncio import Lock
+from collections import Counter
+from collections.abc import Callable, Sequence, AsyncIterable, AsyncIterator
+
+from funpayhub.lib.exceptions import NotEnoughGoodsError, ReservationExpiredError
+
+from .streaming import STREAM_BATCH_SIZE, batched
+
+
+if TYPE_CHECKING:
+    from .executor import GoodsIOExecutor
+
+
+DEFAULT_RESERVATION_TTL = 600.0
+
+
+@dataclass
+class Reservation:
+    """
+    Резерв товаров источника.
+
+    Зарезервированные товары остаются в источнике до подтверждения (`commit`), но не выдаются
+    другим резервам. Отмена (`rollback`) или истечение TTL просто освобождают их,
+    сохраняя исходный порядок товаров.
+    """
+
+    source_id: str
+    goods: list[str]
+    start: int
+    """Порядковый номер первого зарезервированного товара в источнике."""
+    expires_at: float
+    """Момент истечения резерва по `time.monotonic()`."""
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+    @property
+    def amount(self) -> int:
+        return len(self.goods)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+class GoodsSource(ABC):
+    executor: GoodsIOExecutor | None = None
+    """
+    Пул потоков для блокирующих операций источника.
+    Устанавливается `GoodsSourcesManager` при добавлении источника.
+    """
+
+    supports_deduplication: bool = False
+    """Поддерживает ли источник проверку добавляемых товаров на дубликаты."""
+
+    def __init__(self) -> None:
+        self._reservations: list[Reservation] = []
+        self._reservations_lock = Lock()
+
+    @abstractmethod
+    async def load(self) -> None: ...
+
+    @abstractmethod
+    async def reload(self) -> None: ...
+
+    @abstractmethod
+    async def add_goods(self, products: Sequence[str]) -> int:
+        """
+        :return: кол-во пропущенных дубликатов (если источник проверяет дубликаты).
+        """
+
+    @abstractmethod
+    async def pop_goods(self, amount: int) -> list[str]: ...
+
+    @abstractmethod
+    async def get_goods(self, amount: int, start: int = 0) -> list[str]: ...
+
+    @abstractmethod
+    async def set_goods(self, goods: list[str]) -> int:
+        """
+        :return: кол-во пропущенных дубликатов (если источник проверяет дубликаты).
+        """
+
+    @abstractmethod
+    async def remove_goods(self, from_index: int, amount: int) -> None: ...
+
+    @abstractmethod
+    async def unload(self) -> None: ...
+
+    @abstractmethod
+    async def remove(self) -> None: ...
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @property
+    @abstractmethod
+    def source_id(self) -> str: ...
+
+    @property
+    def display_id(self) -> str:
+        return self.source_id
+
+    @property
+    def display_source(self) -> str:
+        return self.source_id
+
+    @property
+    def display_source_type(self) -> str:
+        return self.__class__.__name__
+
+    async def _run_io[R](self, func: Callable[..., R], *args: Any) -> R:
+        """
+        Выполняет блокирующую операцию в пуле потоков источника (или на месте, если пул
+        не установлен).
+        """
+        if self.executor is None:
+            return func(*args)
+        return await self.executor.run(func, *args)
+
+    async def add_goods_stream(
+        self,
+        products: AsyncIterable[str],
+        replace: bool = False,
+    ) -> int:
+        """
+        Добавляет товары из асинхронного потока, не загружая их в память целиком.
+
+        Реализация по умолчанию добавляет товары пачками по `STREAM_BATCH_SIZE`, поэтому
+        при ошибке посреди потока в источнике остаются уже добавленные пачки.
+
+        :param replace: заменить текущие товары товарами из потока.
+
+        :return: кол-во пропущенных дубликатов (если источник проверяет дубликаты).
+        """
+        skipped = 0
+        replaced = False
+        async for batch in batched(products, STREAM_BATCH_SIZE):
+            if replace and not replaced:
+                skipped += await self.set_goods(batch)
+                replaced = True
+            else:
+                skipped += await self.add_goods(batch)
+
+        if replace and not replaced:
+            await self.set_goods([])
+        return skipped
+
+    async def iter_goods(self, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[list[str]]:
+        """
+        Постранично отдает все товары источника пачками по `batch_size`.
+        Если источник изменяется во время обхода, пачки могут пропустить или повторить товары.
+        """
+        start = 0
+        while batch := await self.get_goods(batch_size, start):
+            yield batch
+            if len(batch) < batch_size:
+                return
+            start += len(batch)
+
+    @property
+    def deduplicate(self) -> bool:
+        """
+        Проверяет ли источник добавляемые товары на дубликаты.
+        """
+        return False
+
+    async def set_deduplication(self, enabled: bool) -> None:
+        """
+        Включает / выключает проверку добавляемых товаров на дубликаты.
+        Источники, не поддерживающие проверку (`supports_deduplication`), игнорируют вызов.
+        """
+        return
+
+    async def refresh(self) -> bool:
+        """
+        Синхронизирует источник с хранилищем, если оно было изменено в обход источника.
+
+        :return: `True`, если хранилище было изменено.
+        """
+        return False
+
+    @property
+    def is_counting(self) -> bool:
+        """
+        Идет ли фоновый подсчет товаров. Пока он идет, `len()` может быть неточным.
+        """
+        return False
+
+    async def wait_counted(self) -> None:
+        """
+        Дожидается окончания фонового подсчета товаров.
+        """
+        return
+
+    @property
+    def reserved_amount(self) -> int:
+        """
+        Кол-во товаров, находящихся в активных резервах.
+        """
+        return sum(i.amount for i in self._live_reservations())
+
+    async def reserve(self, amount: int, ttl: float | None = None) -> Reservation:
+        """
+        Резервирует первые `amount` свободных товаров, не изменяя источник.
+
+        :param amount: кол-во товаров.
+        :param ttl: время жизни резерва в секундах. Неподтвержденный резерв по истечении
+            этого времени освобождается.
+        """
+        if amount < 1:
+            raise ValueError('Amount must be greater than 0.')
+
+        await self.wait_counted()
+        async with self._reservations_lock:
+            reservations = self._live_reservations()
+            start = 0
+            for i in sorted(reservations, key=lambda r: r.start):
+                if i.start - start >= amount:
+                    break
+                start = max(start, i.start + i.amount)
+
+            if start + amount > len(self):
+                raise NotEnoughGoodsError(self, amount)
+
+            goods = await self.get_goods(amount, start)
+            if len(goods) < amount:
+                raise NotEnoughGoodsError(self, amount)
+
+            reservation = Reservation(
+                source_id=self.source_id,
+                goods=goods,
+                start=start,
+                expires_at=time.monotonic() + (DEFAULT_RESERVATION_TTL if ttl is None else ttl),
+            )
+            reservations.append(reservation)
+            return reservation
+
+    async def commit(self, reservation: Reservation) -> None:
+        """
+        Подтверждает резерв: зарезервированные товары удаляются из источника.
+        """
+        error = (await self.commit_many([reservation]))[0]
+        if error is not None:
+            raise error
+
+    async def commit_many(self, reservations: Sequence[Reservation]) -> list[Exception | None]:
+        """
+        Подтверждает несколько резервов. Резервы, идущие в источнике подряд, удаляются
+        одной физической операцией.
+
+        Если резерв истек или его товары сдвинулись (например, источник изменили в обход
+        резервов), зарезервированные товары удаляются по значению: товары уже могли быть
+        выданы покупателю, поэтому оставлять их в источнике нельзя.
+
+        :return: ошибки подтверждения резервов (`None`, если резерв подтвержден)
+            в порядке передачи. Если часть товаров резерва не найдена в источнике,
+            найденные товары все равно удаляются, а для резерва возвращается
+            `ReservationExpiredError`.
+        """
+        errors: list[Exception | None] = [None] * len(reservations)
+
+        async with self._reservations_lock:
+            live = self._live_reservations()
+            # Удаляемые диапазоны: (начало, кол-во товаров, индексы резервов).
+            ranges: list[tuple[int, int, list[int]]] = []
+            by_value: list[int] = []
+            for index, reservation in enumerate(reservations):
+                if reservation in live:
+                    current = await self.get_goods(reservation.amount, reservation.start)
+                    if current == reservation.goods:
+                        ranges.append((reservation.start, reservation.amount, [index]))
+                        continue
+                    live.remove(reservation)
+                by_value.append(index)
+
+            claimed = [(i.start, i.amount) for i in live]
+            for index in by_value:
+                reservation = reservations[index]
+                positions = await self._find_goods(reservation.goods, claimed)
+                if len(positions) < reservation.amount:
+                    errors[index] = ReservationExpiredError(reservation)
+                claimed.extend((i, 1) for i in positions)
+                ranges.extend((i, 1, [index]) for i in positions)
+
+            runs: list[tuple[int, int, list[int]]] = []
+            for start, amount, owners in sorted(ranges, key=lambda r: r[0]):
+                if runs and runs[-1][0] + runs[-1][1] == start:
+                    runs[-1] = (runs[-1][0], runs[-1][1] + amount, runs[-1][2] + owners)
+                else:
+                    runs.append((start, amount, owners))
+
+            # Диапазоны удаляются с конца, чтобы не сдвигать позиции еще не удаленных.
+            for start, amount, owners in reversed(runs):
+                try:
+                    if start == 0:
+                        await self.pop_goods(amount)
+                    else:
+                        await self.remove_goods(start, amount)
+                except Exception as e:
+                    for index in owners:
+                        errors[index] = e
+                    continue
+
+                for index in owners:
+                    if reservations[index] in live:
+                        live.remove(reservations[index])
+                for i in live:
+                    if i.start > start:
+                        i.start -= amount
+
+        return errors
+
+    async def _find_goods(
+        self,
+        goods: Sequence[str],
+        exclude: Sequence[tuple[int, int]],
+    ) -> list[int]:
+        """
+        Ищет товары `goods` в источнике по значению, пропуская диапазоны `exclude`
+        (начало, кол-во товаров).
+
+        :return: порядковые номера найденных товаров (каждый товар из `goods` — не более
+            одного раза).
+        """
+        needed = Counter(goods)
+        found: list[int] = []
+        position = 0
+        async for batch in self.iter_goods():
+            for product in batch:
+                if needed[product] > 0 and not any(
+                    start <= position < start + amount for start, amount in exclude
+                ):
+                    needed[product] -= 1
+                    found.append(position)
+                position += 1
+            if len(found) == len(goods):
+                break
+        return found
+
+    async def rollback(self, reservation: Reservation) -> None:
+        """
+        Отменяет резерв. Товары остаются на своих местах.
+        """
+        async with self._reservations_lock:
+            reservations = self._live_reservations()
+            if reservation in reservations:
+                reservations.remove(reservation)
+
+    def _live_reservations(self) -> list[Reservation]:
+        self._reservations[:] = [i for i in self._reservations if not i.expired]
+        return self._reservations
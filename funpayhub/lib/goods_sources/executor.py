@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+
+__all__ = ['GoodsIOExecutor', 'GoodsIOStats']
+
+
+import time
+import asyncio
+from typing import Any
+from dataclasses import dataclass
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+
+@dataclass
+class GoodsIOStats:
+    """
+    Статистика дисковых операций источников товаров.
+
+    Время ожидания — от постановки операции в очередь до начала ее выполнения в потоке,
+    время выполнения — от начала до конца выполнения.
+    """
+
+    calls: int = 0
+    queued_time: float = 0.0
+    executing_time: float = 0.0
+    max_queued_time: float = 0.0
+    max_executing_time: float = 0.0
+
+    @property
+    def avg_queued_time(self) -> float:
+        return self.queued_time / self.calls if self.calls else 0.0
+
+    @property
+    def avg_executing_time(self) -> float:
+        return self.executing_time / self.calls if self.calls else 0.0
+
+    def record(self, queued: float, executing: float) -> None:
+        self.calls += 1
+        self.queued_time += queued
+        self.executing_time += executing
+        self.max_queued_time = max(self.max_queued_time, queued)
+        self.max_executing_time = max(self.max_executing_time, executing)
+
+
+class GoodsIOExecutor:
+    """
+    Ограниченный пул потоков для блокирующих операций источников товаров.
+
+    Позволяет не блокировать event loop чтением / записью больших товарных файлов.
+    """
+
+    def __init__(self, max_workers: int = 2) -> None:
+        if max_workers < 1:
+            raise ValueError('max_workers must be greater than 0.')
+
+        self._max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix='goods-io')
+        self._stats = GoodsIOStats()
+
+    async def run[R](self, func: Callable[..., R], *args: Any) -> R:
+        submitted_at = time.perf_counter()
+        started_at = 0.0
+
+        def wrapper() -> R:
+            nonlocal started_at
+            started_at = time.perf_counter()
+            return func(*args)
+
+        future = asyncio.get_running_loop().run_in_executor(self._pool, wrapper)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Операцию в потоке прервать нельзя: дожидаемся ее завершения, чтобы блокировка
+            # источника не освободилась раньше, чем закончится работа с файлом.
+            await asyncio.wait([future])
+            raise
+        finally:
+            # Статистика обновляется в потоке event loop'а, чтобы не синхронизировать потоки.
+            if started_at:
+                self._stats.record(started_at - submitted_at, time.perf_counter() - started_at)
+
+    def resize(self, max_workers: int) -> None:
+        """
+        Пересоздает пул с новым кол-вом потоков.
+        Уже поставленные в очередь операции дорабатывают в старом пуле.
+        """
+        if max_workers < 1:
+            raise ValueError('max_workers must be greater than 0.')
+        if max_workers == self._max_workers:
+            return
+
+        old_pool = self._pool
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix='goods-io')
+        self._max_workers = max_workers
+        old_pool.shutdown(wait=False)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    @property
+    def stats(self) -> GoodsIOStats:
+        return self._stats
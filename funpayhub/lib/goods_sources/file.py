@@ -0,0 +1,1028 @@
+from __future__ import annotations
+
+
+__all__ = ['FileGoodsSource']
+
+
+import os
+import sys
+import uuid
+import struct
+import asyncio
+import hashlib
+from typing import BinaryIO
+from array import array
+from asyncio import Lock
+from pathlib import Path
+from itertools import islice
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence, AsyncIterable
+
+from funpayhub.loggers import goods as logger
+
+from funpayhub.lib.exceptions import NotEnoughGoodsError
+from funpayhub.lib.translater import _en
+
+from .base import GoodsSource
+from .hashes import GoodsHashIndex
+from .scanning import copy_range, scan_offsets, copy_products, read_products, copy_file_tail
+from .streaming import STREAM_BATCH_SIZE, batched
+
+
+class _OffsetIndex:
+    """
+    Индекс товарного файла: упакованные uint64 байтовые смещения начал непустых строк.
+
+    Хранится рядом с товарным файлом (`goods.txt.idx`). В заголовке записаны размер, mtime
+    и отпечаток всего содержимого товарного файла на момент последней синхронизации, поэтому
+    любое изменение размера или mtime файла в обход источника делает индекс невалидным,
+    а по отпечатку можно понять, были ли товары лишь дописаны в конец файла.
+
+    Отпечаток — сумма хэшей блоков файла по `_FINGERPRINT_BLOCK` байт, поэтому при дописывании
+    товаров источником он пересчитывается только для последнего неполного блока и новых
+    байт.
+    """
+
+    _MAGIC = b'FPHGIDX3'
+    _HEADER = struct.Struct('<8sQQ16s')
+    _OFFSET = struct.Struct('<Q')
+    _FINGERPRINT_BLOCK = 1 << 20
+    _FINGERPRINT_MOD = 1 << 128
+
+    def __init__(self, file: Path) -> None:
+        self._file = file
+        self._path = file.with_name(file.name + '.idx')
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def _read_header(self) -> tuple[int, int, bytes] | None:
+        try:
+            with self._path.open('rb') as f:
+                header = f.read(self._HEADER.size)
+                size = os.fstat(f.fileno()).st_size
+        except FileNotFoundError:
+            return None
+
+        if len(header) != self._HEADER.size or (size - len(header)) % self._OFFSET.size:
+            return None
+
+        magic, file_size, file_mtime, fingerprint = self._HEADER.unpack(header)
+        if magic != self._MAGIC:
+            return None
+        return file_size, file_mtime, fingerprint
+
+    def is_valid(self, stat: os.stat_result) -> bool:
+        return self.synced_state() == (stat.st_size, stat.st_mtime_ns)
+
+    def synced_state(self) -> tuple[int, int] | None:
+        """
+        :return: размер и mtime (нс) товарного файла на момент последней синхронизации.
+        """
+        header = self._read_header()
+        return header[:2] if header is not None else None
+
+    def appended_from(self, stat: os.stat_result) -> int | None:
+        """
+        Проверяет, были ли в товарный файл с момента последней синхронизации лишь дописаны
+        строки в конец.
+
+        :return: размер файла на момент синхронизации (с этого байта начинаются новые строки)
+            или `None`, если файл уменьшился, его уже проиндексированная часть изменилась
+            (проверяется все ее содержимое) или последняя проиндексированная строка была
+            дописана.
+        """
+        header = self._read_header()
+        if header is None:
+            return None
+
+        size, _, fingerprint = header
+        if stat.st_size <= size:
+            return None
+
+        with self._file.open('rb') as f:
+            if size:
+                f.seek(size - 1)
+                if f.read(1) != b'\n':
+                    return None
+            if self._fingerprint(f, size) != fingerprint:
+                return None
+        return size
+
+    def __len__(self) -> int:
+        try:
+            size = self._path.stat().st_size
+        except FileNotFoundError:
+            return 0
+        return max(0, size - self._HEADER.size) // self._OFFSET.size
+
+    def get_offset(self, index: int) -> int | None:
+        with self._path.open('rb') as f:
+            f.seek(self._HEADER.size + index * self._OFFSET.size)
+            data = f.read(self._OFFSET.size)
+        if len(data) != self._OFFSET.size:
+            return None
+        return self._OFFSET.unpack(data)[0]
+
+    def read(self, start: int = 0, amount: int = -1) -> array[int]:
+        offsets = array('Q')
+        with self._path.open('rb') as f:
+            f.seek(self._HEADER.size + start * self._OFFSET.size)
+            offsets.frombytes(f.read(amount * self._OFFSET.size if amount >= 0 else -1))
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        return offsets
+
+    def write(self, offsets: array[int], stat: os.stat_result) -> None:
+        tmp = self._path.with_name(self._path.name + '.tmp')
+        with tmp.open('wb') as f:
+            f.write(self._header(stat))
+            f.write(self._pack(offsets))
+        tmp.replace(self._path)
+
+    def append(self, offsets: array[int], stat: os.stat_result) -> None:
+        """
+        Дописывает смещения товаров, дописанных в конец файла, проиндексированная часть
+        которого не изменилась.
+        """
+        synced = self._read_header()
+        # Заголовок пишется последним: если запись прервется, индекс останется невалидным
+        # и будет перестроен при следующем обращении.
+        with self._path.open('r+b') as f:
+            f.seek(0, os.SEEK_END)
+            f.write(self._pack(offsets))
+            f.seek(0)
+            f.write(self._header(stat, synced))
+
+    def remove(self) -> None:
+        self._path.unlink(missing_ok=True)
+
+    def _header(
+        self,
+        stat: os.stat_result,
+        synced: tuple[int, int, bytes] | None = None,
+    ) -> bytes:
+        """
+        :param synced: заголовок индекса до дописывания товаров в конец файла. Если передан,
+            отпечаток пересчитывается только для байт после последнего полного блока.
+        """
+        with self._file.open('rb') as f:
+            if synced is not None and synced[0] <= stat.st_size:
+                size, _, fingerprint = synced
+                fingerprint = self._fingerprint(f, stat.st_size, size, fingerprint)
+            else:
+                fingerprint = self._fingerprint(f, stat.st_size)
+        return self._HEADER.pack(self._MAGIC, stat.st_size, stat.st_mtime_ns, fingerprint)
+
+    @classmethod
+    def _fingerprint(
+        cls,
+        f: BinaryIO,
+        size: int,
+        synced_size: int = 0,
+        synced_fingerprint: bytes = bytes(16),
+    ) -> bytes:
+        """
+        Считает отпечаток первых `size` байт файла.
+
+        :param synced_size: размер файла, для которого уже посчитан `synced_fingerprint`
+            (байты до него не изменились).
+        """
+        block = cls._FINGERPRINT_BLOCK
+        total = int.from_bytes(synced_fingerprint, 'little')
+        index = synced_size // block
+        if synced_size % block:
+            f.seek(index * block)
+            total -= cls._block_digest(index, f.read(synced_size - index * block))
+
+        f.seek(index * block)
+        while index * block < size:
+            total += cls._block_digest(index, f.read(min(block, size - index * block)))
+            index += 1
+        return (total % cls._FINGERPRINT_MOD).to_bytes(16, 'little')
+
+    @staticmethod
+    def _block_digest(index: int, data: bytes) -> int:
+        digest = hashlib.blake2b(index.to_bytes(8, 'little'), digest_size=16)
+        digest.update(data)
+        return int.from_bytes(digest.digest(), 'little')
+
+    @staticmethod
+    def _pack(offsets: array[int]) -> bytes:
+        if sys.byteorder == 'little':
+            return offsets.tobytes()
+        swapped = array('Q', offsets)
+        swapped.byteswap()
+        return swapped.tobytes()
+
+
+class _Cursor:
+    """
+    Курсор потребления товарного файла: байтовое смещение первого невыданного товара,
+    кол-во уже выданных товаров перед ним и их дайджесты (`GoodsHashIndex.digest`).
+
+    Хранится рядом с товарным файлом (`goods.txt.cursor`): заголовок, за которым идут
+    дайджесты выданных товаров. Дайджесты нужны, чтобы удалить выданные товары по значению,
+    если файл изменили в обход источника. Курсор сбрасывается на диск (fsync) при каждом
+    изменении.
+    """
+
+    _MAGIC = b'FPHGCUR1'
+    _STATE = struct.Struct('<8sQQ')
+    _DIGEST = struct.Struct('<q')
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self.head = 0
+        self.consumed = 0
+        self.digests = array('q')
+
+    def load(self) -> None:
+        self.head, self.consumed, self.digests = 0, 0, array('q')
+        try:
+            with self._path.open('rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        if len(data) < self._STATE.size:
+            return
+
+        magic, head, consumed = self._STATE.unpack_from(data)
+        if magic != self._MAGIC:
+            return
+
+        digests = array('q')
+        tail = data[self._STATE.size :]
+        digests.frombytes(tail[: len(tail) - len(tail) % self._DIGEST.size])
+        if sys.byteorder != 'little':
+            digests.byteswap()
+        # Дайджесты, записанные после последнего обновления заголовка, не учитываются.
+        self.head, self.consumed, self.digests = head, consumed, digests[:consumed]
+
+    def save(self, head: int, consumed: int, digests: Iterable[int] = ()) -> None:
+        """
+        Сдвигает курсор, дописывая дайджесты `digests` новых выданных товаров.
+        Заголовок пишется последним: если запись прервется, курсор останется прежним.
+        """
+        new_digests = array('q', digests)
+        if not self._path.exists():
+            self._clear()
+
+        with self._path.open('r+b') as f:
+            f.seek(self._STATE.size + len(self.digests) * self._DIGEST.size)
+            if sys.byteorder != 'little':
+                swapped = array('q', new_digests)
+                swapped.byteswap()
+                f.write(swapped.tobytes())
+            else:
+                f.write(new_digests.tobytes())
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+            f.seek(0)
+            f.write(self._STATE.pack(self._MAGIC, head, consumed))
+            f.flush()
+            os.fsync(f.fileno())
+        self.head, self.consumed = head, consumed
+        self.digests.extend(new_digests)
+
+    def reset(self) -> None:
+        if self.head or self.consumed or self.digests:
+            self._clear()
+
+    def remove(self) -> None:
+        self._path.unlink(missing_ok=True)
+        self.head, self.consumed, self.digests = 0, 0, array('q')
+
+    def _clear(self) -> None:
+        tmp = self._path.with_name(self._path.name + '.tmp')
+        with tmp.open('wb') as f:
+            f.write(self._STATE.pack(self._MAGIC, 0, 0))
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(self._path)
+        self.head, self.consumed, self.digests = 0, 0, array('q')
+
+
+class FileGoodsSource(GoodsSource):
+    """
+    Представляет файл с товарами.
+
+    Рядом с файлом хранится индекс смещений товаров (`<имя файла>.idx`), благодаря которому
+    постраничное чтение не требует прохода по файлу с самого начала.
+
+    При загрузке кол-во товаров берется из заголовка индекса. Если файл был изменен в обход
+    источника, товары пересчитываются в фоне, а `is_counting` до окончания подсчета
+    возвращает `True`.
+
+    По умолчанию выданные товары сразу удаляются из файла. В режиме курсора
+    (`use_cursor=True`) выдача товаров не переписывает файл, а лишь сдвигает курсор
+    (`<имя файла>.cursor`). Выданные строки физически удаляются из файла при уплотнении,
+    которое запускается, когда выданная часть превышает `compact_threshold` байт или половину
+    файла, а также при выгрузке источника (остановке бота) и при изменении файла в обход
+    источника. До уплотнения выданные товары остаются в файле, поэтому режим включается
+    только явно.
+
+    При `use_mmap=True` подсчет товаров и перезапись файла выполняются через `mmap`:
+    переводы строк ищутся на уровне C, а не затронутые операцией и уже нормализованные
+    диапазоны файла копируются целиком средствами ОС. Результат побайтово совпадает
+    с построчной обработкой.
+
+    Если для источника включена проверка дубликатов (`set_deduplication`), рядом с файлом
+    хранится индекс хэшей товаров (`<имя файла>.hashes`): добавление товаров пропускает
+    товары, которые уже есть в файле, проверяя только новые товары.
+    """
+
+    supports_deduplication = True
+
+    def __init__(
+        self,
+        source: str | Path,
+        use_cursor: bool = False,
+        compact_threshold: int = 1 << 20,
+        use_mmap: bool = True,
+    ) -> None:
+        if not isinstance(source, (str, Path)):
+            raise ValueError('Source must be a string or Path object.')
+
+        super().__init__()
+        self._path = Path(source) if isinstance(source, str) else source
+        self._index = _OffsetIndex(self._path)
+        self._cursor = _Cursor(self._path.with_name(self._path.name + '.cursor'))
+        self._hashes = GoodsHashIndex(self._path.with_name(self._path.name + '.hashes'))
+        self._deduplicate = self._hashes.exists()
+        self._use_cursor = use_cursor
+        self._compact_threshold = compact_threshold
+        self._use_mmap = use_mmap
+        self._goods_amount = 0
+        self._counting_task: asyncio.Task[None] | None = None
+        self._lock = Lock()
+        self._source_id = f'file://{source}'
+
+    def _count_products(self) -> int:
+        return self._ensure_index()
+
+    def _ensure_index(self) -> int:
+        """
+        Перестраивает индекс, если товарный файл был изменен в обход источника.
+
+        :return: кол-во невыданных товаров в файле.
+        """
+        stat = self._path.stat()
+        if not self._index.is_valid(stat):
+            self._index.write(scan_offsets(self._path, use_mmap=self._use_mmap), stat)
+            self._validate_cursor(stat)
+        return len(self._index) - self._cursor.consumed
+
+    def _validate_cursor(self, stat: os.stat_result) -> None:
+        """
+        Проверяет, что курсор по-прежнему указывает на начало товара после изменения файла
+        в обход источника, а перед ним лежат те же выданные товары. Дописывание товаров
+        в конец файла курсор не сбивает; если же файл был переписан, выданные товары
+        удаляются из него по значению (см. `_drop_consumed`).
+        """
+        head, consumed = self._cursor.head, self._cursor.consumed
+        if not head and not consumed:
+            return
+
+        total = len(self._index)
+        if consumed < total:
+            valid = self._index.get_offset(consumed) == head
+        else:
+            last = self._index.get_offset(consumed - 1) if consumed else None
+            valid = consumed == total and (last is None or last < head) and head <= stat.st_size
+
+        if valid and len(self._cursor.digests) == consumed:
+            prefix = array('q', map(self._hashes.digest, self._read_goods(0, consumed)))
+            valid = prefix == self._cursor.digests
+
+        if not valid:
+            self._drop_consumed()
+
+    def _drop_consumed(self) -> None:
+        """
+        Удаляет из измененного в обход источника файла товары, уже выданные по курсору
+        (по дайджестам, сохраненным в курсоре), и сбрасывает курсор.
+        Курсор нельзя просто сбросить в начало: выданные товары остались в файле и были бы
+        выданы повторно.
+        """
+        head, consumed = self._cursor.head, self._cursor.consumed
+        if not head and not consumed:
+            return
+
+        if len(self._cursor.digests) < consumed:
+            logger.warning(
+                _en('Unable to remove %d sold goods from changed goods file %s: unknown goods.'),
+                consumed - len(self._cursor.digests),
+                self._path,
+            )
+
+        pending = Counter(self._cursor.digests)
+        dropped = 0
+
+        def kept() -> Iterator[str]:
+            nonlocal dropped
+            for product in self._iter_products(0):
+                digest = self._hashes.digest(product)
+                if pending[digest] > 0:
+                    pending[digest] -= 1
+                    dropped += 1
+                    continue
+                yield product
+
+        offsets = array('Q')
+        tmp = self._path.with_suffix('.tmp')
+        with tmp.open('wb') as f:
+            self._write_products(f, kept(), offsets, 0)
+
+        tmp.replace(self._path)
+        self._index.write(offsets, self._path.stat())
+        self._cursor.reset()
+        self._goods_amount = len(offsets)
+        logger.info(
+            _en('Removed %d sold goods from externally changed goods file %s.'),
+            dropped,
+            self._path,
+        )
+
+    def _refresh(self) -> bool:
+        """
+        Синхронизирует источник с файлом, если тот был изменен в обход источника.
+        Если в файл лишь дописали строки (уже проиндексированная часть сверяется с отпечатком
+        целиком), сканируются только новые байты; иначе индекс перестраивается.
+
+        :return: `True`, если файл был изменен.
+        """
+        if not self._path.exists():
+            return False
+
+        stat = self._path.stat()
+        if self._index.is_valid(stat):
+            return False
+
+        appended_from = self._index.appended_from(stat)
+        if appended_from is None:
+            # Файл переписан: выданные по курсору строки нужно найти и удалить по значению.
+            self._drop_consumed()
+            self._goods_amount = self._ensure_index()
+            return True
+
+        synced = self._index.synced_state()
+        offsets = scan_offsets(
+            self._path,
+            start=appended_from,
+            end=stat.st_size,
+            use_mmap=self._use_mmap,
+        )
+        self._index.append(offsets, stat)
+        self._goods_amount = len(self._index) - self._cursor.consumed
+
+        if self._deduplicate and self._hashes.state() == synced:
+            self._hashes.add(map(self._hashes.digest, self._iter_products(appended_from)))
+            self._hashes.mark_synced(stat)
+        return True
+
+    def _head_offset(self, consumed: int) -> int:
+        offset = self._index.get_offset(consumed)
+        return offset if offset is not None else self._path.stat().st_size
+
+    def _iter_products(self, offset: int) -> Iterator[str]:
+        with open(self._path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                line = line.rstrip(b'\r\n')
+                if line:
+                    yield line.decode('utf-8')
+
+    def _ensure_hashes(self) -> None:
+        """
+        Перестраивает индекс хэшей, если товарный файл был изменен в обход индекса.
+        """
+        stat = self._path.stat()
+        if self._hashes.is_valid(stat):
+            return
+        self._hashes.rebuild(map(self._hashes.digest, self._iter_products(self._cursor.head)))
+        self._hashes.mark_synced(stat)
+
+    def _sync_hashes(
+        self,
+        stat_before: os.stat_result,
+        added: Iterable[int] = (),
+        removed: Iterable[str] = (),
+    ) -> None:
+        """
+        Обновляет индекс хэшей после изменения файла источником. Если индекс был устаревшим
+        еще до изменения, он не трогается и будет перестроен при следующей проверке.
+        """
+        if not self._deduplicate or not self._hashes.is_valid(stat_before):
+            return
+        self._hashes.add(added)
+        self._hashes.discard(map(self._hashes.digest, removed))
+        self._hashes.mark_synced(self._path.stat())
+
+    def _drop_duplicates(
+        self,
+        products: Iterable[str],
+        known: set[int],
+        check_index: bool = True,
+    ) -> tuple[list[str], list[int], int]:
+        """
+        Отбрасывает пустые строки и дубликаты: товары, которые уже есть в индексе хэшей
+        (если `check_index`), и товары, дайджесты которых есть в `known`.
+        Дайджесты оставшихся товаров добавляются в `known`.
+
+        :return: оставшиеся товары, их дайджесты и кол-во отброшенных дубликатов.
+        """
+        normalized = [i for i in (i.rstrip('\r\n') for i in products) if i]
+        digests = [self._hashes.digest(i) for i in normalized]
+        existing = self._hashes.find(digests) if check_index else set()
+
+        result: list[str] = []
+        result_digests: list[int] = []
+        for product, digest in zip(normalized, digests):
+            if digest in existing or digest in known:
+                continue
+            known.add(digest)
+            result.append(product)
+            result_digests.append(digest)
+        return result, result_digests, len(normalized) - len(result)
+
+    def _set_deduplication(self, enabled: bool) -> None:
+        if not enabled:
+            self._hashes.remove()
+            self._deduplicate = False
+            return
+
+        self._create_file()
+        self._ensure_index()
+        self._deduplicate = True
+        self._ensure_hashes()
+
+    def _compact(self) -> None:
+        """
+        Физически удаляет из файла выданные товары и сбрасывает курсор.
+        """
+        head, consumed = self._cursor.head, self._cursor.consumed
+        if not head and not consumed:
+            return
+
+        stat_before = self._path.stat()
+
+        tmp = self._path.with_suffix('.tmp')
+        with self._path.open('rb') as fin, tmp.open('wb') as fout:
+            copy_file_tail(fin, fout, head)
+
+        offsets = array('Q', (i - head for i in self._index.read(consumed)))
+        tmp.replace(self._path)
+        self._index.write(offsets, self._path.stat())
+        self._cursor.reset()
+        self._sync_hashes(stat_before)
+
+    def _maybe_compact(self) -> None:
+        head = self._cursor.head
+        if head and (head >= self._compact_threshold or head * 2 >= self._path.stat().st_size):
+            self._compact()
+
+    def _rewrite_without(
+        self,
+        from_index: int,
+        to_index: int,
+        require_all: bool = False,
+    ) -> list[str]:
+        """
+        Перезаписывает файл без товаров с индексами `[from_index, to_index)` и обновляет индекс.
+        Уже выданные (по курсору) товары при этом также удаляются из файла.
+
+        :param require_all: не изменять файл, если в нем нет всех товаров из диапазона.
+
+        :return: удаленные товары.
+        """
+        total = self._ensure_index()
+        if require_all and total < to_index:
+            self._goods_amount = total
+            return []
+
+        consumed = self._cursor.consumed
+        from_index, to_index = min(from_index, total), min(max(to_index, from_index), total)
+        stat_before = self._path.stat()
+        size = stat_before.st_size
+        # Байтовые границы: [head, start) и [end, size) — сохраняемые товары,
+        # [start, end) — удаляемые.
+        head = self._cursor.head
+        start = self._head_offset(consumed + from_index)
+        end = self._head_offset(consumed + to_index)
+
+        tmp = self._path.with_suffix('.tmp')
+        with self._path.open('rb') as fin, tmp.open('wb') as fout:
+            removed = read_products(fin, start, end)
+            before, position = copy_products(
+                fin,
+                fout,
+                head,
+                start,
+                self._index.read(consumed, from_index),
+                0,
+                use_mmap=self._use_mmap,
+            )
+            after, _ = copy_products(
+                fin,
+                fout,
+                end,
+                size,
+                self._index.read(consumed + to_index),
+                position,
+                use_mmap=self._use_mmap,
+            )
+
+        offsets = before + after
+        tmp.replace(self._path)
+        self._index.write(offsets, self._path.stat())
+        self._cursor.reset()
+        self._goods_amount = len(offsets)
+        self._sync_hashes(stat_before, removed=removed)
+        return removed
+
+    def _create_file(self) -> None:
+        if not self.path.exists():
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._path.touch()
+            self._cursor.reset()
+            self._goods_amount = 0
+
+    def _load(self) -> bool:
+        """
+        Загружает кол-во товаров из заголовка индекса (размер и mtime файла на момент
+        последней синхронизации + смещения товаров), не читая сам файл.
+
+        :return: `False`, если индекс устарел и товары нужно пересчитать.
+        """
+        self._cursor.load()
+        if not os.path.exists(self._path):
+            self._create_file()
+
+        if not self._use_cursor and (self._cursor.head or self._cursor.consumed):
+            # Курсор остался от запуска в режиме курсора: выданные товары не должны
+            # оставаться в файле.
+            self._ensure_index()
+            self._compact()
+
+        if not self._index.is_valid(self._path.stat()):
+            return False
+        self._goods_amount = len(self._index) - self._cursor.consumed
+        return True
+
+    def _unload(self) -> None:
+        if self._path.exists():
+            self._ensure_index()
+            self._compact()
+        self._hashes.close()
+
+    def _remove(self) -> None:
+        if self.path.exists():
+            os.remove(self.path)
+        self._index.remove()
+        self._cursor.remove()
+        self._hashes.remove()
+
+    def _add_goods(self, products: Sequence[str]) -> int:
+        self._create_file()
+        self._ensure_index()
+        offsets = array('Q')
+        digests: list[int] = []
+        skipped = 0
+        if self._deduplicate:
+            self._ensure_hashes()
+            products, digests, skipped = self._drop_duplicates(products, set())
+        stat_before = self._path.stat()
+
+        with open(self._path, 'r+b') as f:
+            position = f.seek(0, os.SEEK_END)
+            # На случай, если пользователь своими ручонками сам засунул товарный файл без
+            # пустой строки в конце.
+            # Все методы получения / удаления товаров и т.д., корректно обрабатывают
+            # пустые строки.
+            position = self._ensure_trailing_newline(f, position)
+            self._write_products(f, products, offsets, position)
+
+        self._index.append(offsets, self._path.stat())
+        self._goods_amount += len(offsets)
+        self._sync_hashes(stat_before, added=digests)
+        return skipped
+
+    @staticmethod
+    def _ensure_trailing_newline(f: BinaryIO, position: int) -> int:
+        if position:
+            f.seek(position - 1)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+                position += 1
+        return position
+
+    @staticmethod
+    def _write_products(
+        f: BinaryIO,
+        products: Iterable[str],
+        offsets: array[int],
+        position: int,
+    ) -> int:
+        """
+        Записывает непустые товары в `f`, дописывая их смещения в `offsets`.
+
+        :return: новая позиция в `f`.
+        """
+        for i in products:
+            i = i.rstrip('\r\n')
+            if not i:
+                continue
+            data = i.encode('utf-8') + b'\n'
+            f.write(data)
+            offsets.append(position)
+            position += len(data)
+        return position
+
+    def _drop_staged_duplicates(
+        self,
+        products: list[str],
+        known: set[int],
+        check_index: bool,
+    ) -> tuple[list[str], int]:
+        """
+        Отбрасывает дубликаты из пачки товаров потоковой загрузки (см. `_drop_duplicates`).
+        Если `check_index`, обращается к индексу хэшей, поэтому должен выполняться
+        под блокировкой источника.
+
+        :return: оставшиеся товары и кол-во отброшенных дубликатов.
+        """
+        if check_index:
+            self._ensure_hashes()
+        products, _, skipped = self._drop_duplicates(products, known, check_index)
+        return products, skipped
+
+    def _commit_staging(
+        self,
+        staging: Path,
+        offsets: array[int],
+        replace: bool,
+        digests: set[int] | None,
+    ) -> None:
+        """
+        Переносит товары из промежуточного файла потоковой загрузки в товарный файл.
+        """
+        self._create_file()
+        if replace:
+            staging.replace(self._path)
+            self._index.write(offsets, self._path.stat())
+            self._cursor.reset()
+            self._goods_amount = len(offsets)
+            if digests is not None:
+                self._hashes.rebuild(digests)
+                self._hashes.mark_synced(self._path.stat())
+            return
+
+        self._ensure_index()
+        stat_before = self._path.stat()
+        with open(self._path, 'r+b') as f, staging.open('rb') as fin:
+            position = self._ensure_trailing_newline(f, f.seek(0, os.SEEK_END))
+            copy_range(fin, f, 0, os.fstat(fin.fileno()).st_size)
+
+        staging.unlink()
+        self._index.append(array('Q', (i + position for i in offsets)), self._path.stat())
+        self._goods_amount += len(offsets)
+        self._sync_hashes(stat_before, added=digests or ())
+
+    def _pop_goods(self, amount: int) -> list[str]:
+        self._create_file()
+        if not self._use_cursor:
+            result = self._rewrite_without(0, amount, require_all=True)
+            if len(result) < amount:
+                raise NotEnoughGoodsError(self, amount)
+            return result
+
+        self._goods_amount = self._ensure_index()
+        if self._goods_amount < amount:
+            raise NotEnoughGoodsError(self, amount)
+
+        stat_before = self._path.stat()
+        result = self._read_goods(self._cursor.head, amount)
+        consumed = self._cursor.consumed + amount
+        self._cursor.save(
+            self._head_offset(consumed),
+            consumed,
+            map(self._hashes.digest, result),
+        )
+        self._goods_amount -= amount
+        self._sync_hashes(stat_before, removed=result)
+        self._maybe_compact()
+        return result
+
+    def _read_goods(self, offset: int, amount: int | float) -> list[str]:
+        if not amount:
+            return []
+        products = self._iter_products(offset)
+        return list(products if amount == float('inf') else islice(products, amount))
+
+    def _get_goods(self, amount: int | float, start: int) -> list[str]:
+        self._goods_amount = self._ensure_index()
+        if start >= self._goods_amount:
+            return []
+
+        offset = self._index.get_offset(self._cursor.consumed + start)
+        if offset is None:
+            return []
+        return self._read_goods(offset, amount)
+
+    def _set_goods(self, goods: list[str]) -> int:
+        self._create_file()
+        tmp = self._path.with_suffix('.tmp')
+        offsets = array('Q')
+        digests: list[int] = []
+        skipped = 0
+        if self._deduplicate:
+            goods, digests, skipped = self._drop_duplicates(goods, set(), check_index=False)
+
+        with tmp.open('wb') as f:
+            self._write_products(f, goods, offsets, 0)
+
+        tmp.replace(self._path)
+        self._index.write(offsets, self._path.stat())
+        self._cursor.reset()
+        self._goods_amount = len(offsets)
+        if self._deduplicate:
+            self._hashes.rebuild(digests)
+            self._hashes.mark_synced(self._path.stat())
+        return skipped
+
+    async def load(self) -> None:
+        if await self._run_io(self._load):
+            return
+
+        # Индекс устарел (файл изменили в обход источника или источник загружается впервые):
+        # пересчитываем товары в фоне, чтобы не задерживать запуск.
+        self._counting_task = asyncio.create_task(
+            self._recount(),
+            name=f'goods_recount:{self._source_id}',
+        )
+
+    async def _recount(self) -> None:
+        try:
+            async with self._lock:
+                self._goods_amount = await self._run_io(self._count_products)
+        except Exception:
+            logger.error(_en('Unable to count goods in %s.'), self._path, exc_info=True)
+
+    async def refresh(self) -> bool:
+        if self.is_counting:
+            return False
+
+        async with self._lock:
+            return await self._run_io(self._refresh)
+
+    @property
+    def is_counting(self) -> bool:
+        return self._counting_task is not None and not self._counting_task.done()
+
+    async def wait_counted(self) -> None:
+        if self._counting_task is not None:
+            await asyncio.shield(self._counting_task)
+
+    async def reload(self) -> None:
+        async with self._lock:
+            await self.load()
+
+    async def unload(self) -> None:
+        async with self._lock:
+            await self._run_io(self._unload)
+
+    async def remove(self) -> None:
+        async with self._lock:
+            await self._run_io(self._remove)
+
+    async def add_goods(self, products: Sequence[str]) -> int:
+        if not len(products):
+            return 0
+
+        async with self._lock:
+            return await self._run_io(self._add_goods, products)
+
+    async def add_goods_stream(
+        self,
+        products: AsyncIterable[str],
+        replace: bool = False,
+    ) -> int:
+        """
+        Товары из потока сначала пишутся в промежуточный файл (`<имя файла>.<uuid>.upload`) без
+        блокировки источника (блокируется лишь проверка пачек по индексу хэшей), а затем
+        одной операцией дописываются в товарный файл или заменяют его. При ошибке посреди
+        потока источник не изменяется.
+        """
+        # У каждой загрузки свой промежуточный файл: загрузки в один источник могут идти
+        # одновременно.
+        staging = self._path.with_name(f'{self._path.name}.{uuid.uuid4().hex}.upload')
+        offsets = array('Q')
+        position = 0
+        skipped = 0
+        # Дайджесты уже записанных товаров потока: дубликаты внутри потока тоже отбрасываются.
+        known: set[int] | None = set() if self._deduplicate else None
+
+        f = await self._run_io(staging.open, 'xb')
+        try:
+            async for batch in batched(products, STREAM_BATCH_SIZE):
+                if known is not None:
+                    batch, batch_skipped = await self._stage_duplicates(batch, known, not replace)
+                    skipped += batch_skipped
+                position = await self._run_io(
+                    self._write_products,
+                    f,
+                    batch,
+                    offsets,
+                    position,
+                )
+            await self._run_io(f.close)
+        except BaseException:
+            f.close()
+            staging.unlink(missing_ok=True)
+            raise
+
+        async with self._lock:
+            await self._run_io(self._commit_staging, staging, offsets, replace, known)
+        return skipped
+
+    async def _stage_duplicates(
+        self,
+        batch: list[str],
+        known: set[int],
+        check_index: bool,
+    ) -> tuple[list[str], int]:
+        """
+        Проверка по индексу хэшей выполняется под блокировкой источника: соединение
+        с индексом общее для всех операций источника.
+        """
+        if not check_index:
+            return await self._run_io(self._drop_staged_duplicates, batch, known, False)
+
+        async with self._lock:
+            return await self._run_io(self._drop_staged_duplicates, batch, known, True)
+
+    async def pop_goods(self, amount: int) -> list[str]:
+        if amount < 1:
+            raise ValueError('Amount must be greater than 0.')
+
+        async with self._lock:
+            return await self._run_io(self._pop_goods, amount)
+
+    async def get_goods(self, amount: int, start: int = 0) -> list[str]:
+        if start < 0 or amount < -1:
+            raise ValueError('Start must be greater than 0.')
+
+        if amount == -1:
+            amount = float('inf')  # type: ignore[assignment]
+
+        if not amount:
+            return []
+
+        async with self._lock:
+            return await self._run_io(self._get_goods, amount, start)
+
+    async def set_goods(self, goods: list[str]) -> int:
+        async with self._lock:
+            return await self._run_io(self._set_goods, goods)
+
+    @property
+    def deduplicate(self) -> bool:
+        return self._deduplicate
+
+    async def set_deduplication(self, enabled: bool) -> None:
+        async with self._lock:
+            await self._run_io(self._set_deduplication, enabled)
+
+    async def remove_goods(self, from_index: int, amount: int) -> None:
+        if amount < 1:
+            raise ValueError('Amount must be greater than 0.')
+
+        async with self._lock:
+            await self._run_io(self._rewrite_without, from_index, from_index + amount)
+
+    def __len__(self) -> int:
+        return self._goods_amount
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def source_id(self) -> str:
+        return self._source_id
+
+    @property
+    def display_id(self) -> str:
+        return self._path.name
+
+    @property
+    def display_source(self) -> str:
+        return str(self._path.absolute())
+
+    @property
+    def display_source_type(self) -> str:
+        return '$txt_source_type'
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+
+__all__ = ['GoodsHashIndex']
+
+
+import os
+import hashlib
+import sqlite3
+from pathlib import Path
+from itertools import islice
+from collections import Counter
+from collections.abc import Iterable
+
+
+_QUERY_BATCH_SIZE = 500
+
+
+class GoodsHashIndex:
+    """
+    Хранимый индекс хэшей товаров источника для поиска дубликатов.
+
+    Для каждого товара хранится 64-битный дайджест blake2b и кол-во товаров с таким
+    дайджестом (в источнике уже могут быть дубликаты). Индекс лежит в SQLite базе рядом
+    с хранилищем источника, вместе с размером и mtime хранилища на момент последней
+    синхронизации: если хранилище изменили в обход источника, индекс нужно перестроить.
+
+    Все методы блокирующие и должны вызываться из пула потоков источника.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._connection: sqlite3.Connection | None = None
+
+    @staticmethod
+    def digest(product: str) -> int:
+        return int.from_bytes(
+            hashlib.blake2b(product.encode('utf-8'), digest_size=8).digest(),
+            'little',
+            signed=True,
+        )
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def exists(self) -> bool:
+        return self._path.exists()
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self._path, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS hashes '
+                '(digest INTEGER PRIMARY KEY, amount INTEGER NOT NULL) WITHOUT ROWID',
+            )
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS state (id INTEGER PRIMARY KEY CHECK (id = 0), '
+                'size INTEGER NOT NULL, mtime INTEGER NOT NULL)',
+            )
+            self._connection = connection
+        return self._connection
+
+    def state(self) -> tuple[int, int] | None:
+        """
+        :return: размер и mtime (нс) хранилища на момент последней синхронизации.
+        """
+        row = self._db.execute('SELECT size, mtime FROM state WHERE id = 0').fetchone()
+        return tuple(row) if row is not None else None
+
+    def is_valid(self, stat: os.stat_result) -> bool:
+        return self.state() == (stat.st_size, stat.st_mtime_ns)
+
+    def mark_synced(self, stat: os.stat_result) -> None:
+        self._db.execute(
+            'INSERT OR REPLACE INTO state (id, size, mtime) VALUES (0, ?, ?)',
+            (stat.st_size, stat.st_mtime_ns),
+        )
+
+    def find(self, digests: Iterable[int]) -> set[int]:
+        """
+        Возвращает дайджесты из `digests`, которые уже есть в индексе.
+        """
+        found: set[int] = set()
+        iterator = iter(digests)
+        while batch := list(islice(iterator, _QUERY_BATCH_SIZE)):
+            rows = self._db.execute(
+                f'SELECT digest FROM hashes WHERE digest IN ({",".join("?" * len(batch))})',
+                batch,
+            ).fetchall()
+            found.update(digest for (digest,) in rows)
+        return found
+
+    def add(self, digests: Iterable[int]) -> None:
+        counter = Counter(digests)
+        if not counter:
+            return
+
+        with self._db:
+            self._db.execute('BEGIN')
+            self._db.executemany(
+                'INSERT INTO hashes (digest, amount) VALUES (?, ?) '
+                'ON CONFLICT (digest) DO UPDATE SET amount = amount + excluded.amount',
+                counter.items(),
+            )
+
+    def discard(self, digests: Iterable[int]) -> None:
+        counter = Counter(digests)
+        if not counter:
+            return
+
+        with self._db:
+            self._db.execute('BEGIN')
+            self._db.executemany(
+                'UPDATE hashes SET amount = amount - ? WHERE digest = ?',
+                ((amount, digest) for digest, amount in counter.items()),
+            )
+            self._db.execute('DELETE FROM hashes WHERE amount <= 0')
+
+    def rebuild(self, digests: Iterable[int]) -> None:
+        with self._db:
+            self._db.execute('BEGIN')
+            self._db.execute('DELETE FROM hashes')
+            self._db.executemany(
+                'INSERT INTO hashes (digest, amount) VALUES (?, 1) '
+                'ON CONFLICT (digest) DO UPDATE SET amount = amount + 1',
+                ((i,) for i in digests),
+            )
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def remove(self) -> None:
+        self.close()
+        for suffix in ('', '-wal', '-shm'):
+            self._path.with_name(self._path.name + suffix).unlink(missing_ok=True)
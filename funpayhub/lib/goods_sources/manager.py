@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+
+__all__ = ['GoodsSourcesManager']
+
+
+import asyncio
+from typing import Any
+from dataclasses import dataclass
+from asyncio import Lock
+from pathlib import Path
+from collections.abc import Iterator, KeysView, ValuesView
+
+from funpayhub.loggers import goods as logger
+
+from funpayhub.lib.exceptions import GoodsError, NotEnoughGoodsError, GoodsSourceNotFoundError
+from funpayhub.lib.translater import _en
+
+from .base import GoodsSource, Reservation
+from .file import FileGoodsSource
+from .executor import GoodsIOExecutor
+
+
+@dataclass
+class _PendingPop:
+    amount: int
+    future: asyncio.Future[list[str]]
+
+
+@dataclass
+class _PendingCommit:
+    reservation: Reservation
+    future: asyncio.Future[None]
+
+
+def _wrap_error(error: Exception, message: str, source_id: str) -> Exception:
+    if isinstance(error, GoodsError):
+        return error
+    wrapped = GoodsError(message, source_id)
+    wrapped.__cause__ = error
+    return wrapped
+
+
+class GoodsSourcesManager:
+    def __init__(
+        self,
+        max_workers: int = 2,
+        batch_window: float = 0.02,
+        watch_interval: float = 5.0,
+    ) -> None:
+        """
+        :param max_workers: кол-во потоков в пуле для дисковых операций источников.
+        :param batch_window: время (в секундах), в течение которого выдачи товаров
+            из одного источника копятся, чтобы выполниться одной физической операцией.
+            Запросы, пришедшие во время выполнения операции, попадают в следующую пачку.
+        :param watch_interval: интервал (в секундах) проверки источников и директории
+            с товарами на изменения в обход бота (см. `start_watching`). `0` — не проверять.
+        """
+        self._sources: dict[str, GoodsSource] = {}
+        self._lock = Lock()
+        self._executor = GoodsIOExecutor(max_workers)
+        self._batch_window = batch_window
+        self._pending: dict[str, list[_PendingPop | _PendingCommit]] = {}
+        self._flushers: dict[str, asyncio.Task[None]] = {}
+        self.watch_interval = watch_interval
+        self._watcher: asyncio.Task[None] | None = None
+
+    @property
+    def executor(self) -> GoodsIOExecutor:
+        return self._executor
+
+    def get(self, source_id: str) -> GoodsSource | None:
+        return self._sources.get(source_id)
+
+    async def add_source[S: GoodsSource](
+        self,
+        source_cls: type[S],
+        source: Any,
+        *args: Any,
+        **kwargs: Any,
+    ) -> S:
+        async with self._lock:
+            source = source_cls(source, *args, **kwargs)
+            if source.source_id in self._sources:
+                raise ValueError(f'Source {source.source_id} already exists.')
+
+            source.executor = self._executor
+            try:
+                await source.load()
+            except GoodsError:
+                raise
+            except Exception as e:
+                raise GoodsError('Unable to load goods source %s.', source.source_id) from e
+            self._sources[source.source_id] = source
+            return source
+
+    async def remove_source(self, source_id: str) -> None:
+        async with self._lock:
+            if source_id not in self._sources:
+                return
+
+            source = self._sources[source_id]
+            await source.remove()
+            del self._sources[source_id]
+
+    async def unload_sources(self) -> None:
+        """
+        Останавливает проверку источников на изменения и выгружает все источники
+        (например, файловые источники при выгрузке удаляют из файлов выданные товары).
+        Вызывается при остановке бота.
+        """
+        self.stop_watching()
+        async with self._lock:
+            for source in self._sources.values():
+                try:
+                    await source.unload()
+                except Exception:
+                    logger.error(
+                        _en('Unable to unload goods source %s.'),
+                        source.source_id,
+                        exc_info=True,
+                    )
+
+    async def pop_goods(self, source_id: str, amount: int) -> list[str]:
+        source = self.get(source_id)
+        if source is None:
+            raise GoodsSourceNotFoundError(source_id)
+        if amount < 1:
+            raise ValueError('Amount must be greater than 0.')
+
+        future: asyncio.Future[list[str]] = asyncio.get_running_loop().create_future()
+        self._enqueue(source, _PendingPop(amount, future))
+        return await future
+
+    async def reserve(
+        self,
+        source_id: str,
+        amount: int,
+        ttl: float | None = None,
+    ) -> Reservation:
+        source = self.get(source_id)
+        if source is None:
+            raise GoodsSourceNotFoundError(source_id)
+
+        try:
+            return await source.reserve(amount, ttl)
+        except GoodsError:
+            raise
+        except Exception as e:
+            raise GoodsError('Unable to reserve goods in source %s.', source_id) from e
+
+    async def commit(self, reservation: Reservation) -> None:
+        source = self.get(reservation.source_id)
+        if source is None:
+            raise GoodsSourceNotFoundError(reservation.source_id)
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._enqueue(source, _PendingCommit(reservation, future))
+        await future
+
+    async def rollback(self, reservation: Reservation) -> None:
+        source = self.get(reservation.source_id)
+        if source is None:
+            return
+
+        try:
+            await source.rollback(reservation)
+        except GoodsError:
+            raise
+        except Exception as e:
+            raise GoodsError(
+                'Unable to rollback reservation in source %s.',
+                reservation.source_id,
+            ) from e
+
+    async def get_goods(self, source_id: str, amount: int, start: int = 0) -> list[str]:
+        source = self.get(source_id)
+        if source is None:
+            raise GoodsSourceNotFoundError(source_id)
+
+        try:
+            return await source.get_goods(amount, start)
+        except GoodsError:
+            raise
+        except Exception as e:
+            raise GoodsError('Unable to get goods from source %s.', source_id) from e
+
+    async def add_goods(self, source_id: str, goods: list[str]) -> int:
+        """
+        :return: кол-во пропущенных дубликатов.
+        """
+        async with self._lock:
+            source = self.get(source_id)
+            if source is None:
+                raise GoodsSourceNotFoundError(source_id)
+
+            try:
+                return await source.add_goods(goods)
+            except GoodsError:
+                raise
+            except Exception as e:
+                raise GoodsError('Unable to add goods to %s.', source_id) from e
+
+    async def refresh_sources(self, directory: Path | None = None) -> None:
+        """
+        Синхронизирует источники с их хранилищами, если те были изменены в обход бота
+        (например, товары дописали в файл скриптом), и регистрирует новые товарные файлы
+        (`*.txt`) из директории `directory`. Скрытые файлы (`.*`) пропускаются.
+        """
+        for source in list(self._sources.values()):
+            try:
+                if await source.refresh():
+                    logger.info(_en('Goods source %s was changed externally.'), source.source_id)
+            except Exception:
+                logger.error(
+                    _en('Unable to refresh goods source %s.'),
+                    source.source_id,
+                    exc_info=True,
+                )
+
+        if directory is None or not directory.is_dir():
+            return
+
+        known = {
+            i.path.absolute() for i in self._sources.values() if isinstance(i, FileGoodsSource)
+        }
+        for file in directory.iterdir():
+            # Скрытые файлы — временные (например, еще не скачанные до конца).
+            if file.name.startswith('.') or file.suffix != '.txt' or not file.is_file():
+                continue
+            if file.absolute() in known:
+                continue
+
+            logger.info(_en('Found new goods file %s.'), file)
+            try:
+                await self.add_source(FileGoodsSource, file)
+            except Exception:
+                logger.error(_en('Unable to load goods file %s.'), file, exc_info=True)
+
+    def start_watching(self, directory: Path | None = None) -> None:
+        """
+        Запускает фоновую проверку источников и директории `directory` на изменения
+        раз в `watch_interval` секунд.
+        """
+        if self._watcher is not None and not self._watcher.done():
+            return
+        self._watcher = asyncio.create_task(self._watch(directory), name='goods_watcher')
+
+    def stop_watching(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+    async def _watch(self, directory: Path | None) -> None:
+        while True:
+            if self.watch_interval <= 0:
+                await asyncio.sleep(1)
+                continue
+
+            await asyncio.sleep(self.watch_interval)
+            try:
+                await self.refresh_sources(directory)
+            except Exception:
+                logger.error(_en('Unable to check goods sources for changes.'), exc_info=True)
+
+    def _enqueue(self, source: GoodsSource, operation: _PendingPop | _PendingCommit) -> None:
+        self._pending.setdefault(source.source_id, []).append(operation)
+        flusher = self._flushers.get(source.source_id)
+        if flusher is None or flusher.done():
+            self._flushers[source.source_id] = asyncio.create_task(
+                self._flush(source),
+                name=f'goods_flush:{source.source_id}',
+            )
+
+    async def _flush(self, source: GoodsSource) -> None:
+        """
+        Выполняет накопленные выдачи и подтверждения резервов источника пачками.
+        """
+        if self._batch_window > 0:
+            await asyncio.sleep(self._batch_window)
+
+        while batch := self._pending.pop(source.source_id, None):
+            commits = [i for i in batch if isinstance(i, _PendingCommit) and not i.future.done()]
+            pops = [i for i in batch if isinstance(i, _PendingPop) and not i.future.done()]
+
+            if commits:
+                await self._commit_batch(source, commits)
+            if pops:
+                await self._pop_batch(source, pops)
+
+    async def _commit_batch(self, source: GoodsSource, commits: list[_PendingCommit]) -> None:
+        try:
+            errors = await source.commit_many([i.reservation for i in commits])
+        except Exception as e:
+            errors = [e] * len(commits)
+
+        for operation, error in zip(commits, errors):
+            if operation.future.done():
+                continue
+            if error is None:
+                operation.future.set_result(None)
+            else:
+                operation.future.set_exception(
+                    _wrap_error(
+                        error,
+                        'Unable to commit reservation in source %s.',
+                        source.source_id,
+                    ),
+                )
+
+    async def _pop_batch(self, source: GoodsSource, pops: list[_PendingPop]) -> None:
+        """
+        Выдает товары нескольким запросам одной физической операцией.
+        Товары раздаются в порядке поступления запросов; запросы, которым не хватило товаров,
+        получают собственный `NotEnoughGoodsError`, как при последовательной выдаче.
+        """
+        try:
+            await source.wait_counted()
+            free = len(source) - source.reserved_amount
+            granted: list[_PendingPop] = []
+            total = 0
+            for operation in pops:
+                if total + operation.amount <= free:
+                    granted.append(operation)
+                    total += operation.amount
+                else:
+                    operation.future.set_exception(NotEnoughGoodsError(source, operation.amount))
+
+            if not granted:
+                return
+
+            try:
+                # Выдача идет через резерв, чтобы не забрать товары, зарезервированные другими.
+                reservation = await source.reserve(total)
+                await source.commit(reservation)
+            except NotEnoughGoodsError:
+                # Свободные товары оказались разбиты резервами: выдаем по одному запросу.
+                for operation in granted:
+                    await self._pop_single(source, operation)
+                return
+        except Exception as e:
+            for operation in pops:
+                if not operation.future.done():
+                    operation.future.set_exception(
+                        _wrap_error(e, 'Unable to pop goods from source %s.', source.source_id),
+                    )
+            return
+
+        offset = 0
+        for operation in granted:
+            if not operation.future.done():
+                operation.future.set_result(reservation.goods[offset : offset + operation.amount])
+            offset += operation.amount
+
+    async def _pop_single(self, source: GoodsSource, operation: _PendingPop) -> None:
+        try:
+            reservation = await source.reserve(operation.amount)
+            await source.commit(reservation)
+        except Exception as e:
+            if not operation.future.done():
+                operation.future.set_exception(
+                    _wrap_error(e, 'Unable to pop goods from source %s.', source.source_id),
+                )
+            return
+
+        if not operation.future.done():
+            operation.future.set_result(reservation.goods)
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def __getitem__(self, key: str) -> GoodsSource:
+        return self._sources[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sources)
+
+    def keys(self) -> KeysView[str]:
+        return self._sources.keys()
+
+    def values(self) -> ValuesView[GoodsSource]:
+        return self._sources.values()
@@ -0,0 +1,238 @@
+"""
+Низкоуровневое сканирование и копирование товарных файлов.
+
+Для каждой операции есть два бэкенда: построчный (чтение файла по строкам средствами Python)
+и `mmap` (поиск переводов строк и проверки диапазонов выполняются на уровне C, а неизменяемые
+диапазоны файла копируются целиком через `os.copy_file_range` / `os.sendfile`).
+Результаты обоих бэкендов побайтово совпадают.
+"""
+
+from __future__ import annotations
+
+
+__all__ = ['scan_offsets', 'copy_products', 'read_products', 'copy_range', 'copy_file_tail']
+
+
+import os
+import re
+import mmap
+from typing import BinaryIO
+from re import Match
+from array import array
+from pathlib import Path
+from operator import add, methodcaller
+from itertools import repeat, compress, accumulate
+
+
+_LF = 10
+_COPY_CHUNK = 1 << 24
+_SCAN_CHUNK = 1 << 24
+_NEWLINE = re.compile(b'\n')
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    return os.copy_file_range(src_fd, dst_fd, count, offset)
+
+
+def _sendfile(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    return os.sendfile(dst_fd, src_fd, offset, count)
+
+
+_KERNEL_COPY_METHODS = [
+    method
+    for name, method in (('copy_file_range', _copy_file_range), ('sendfile', _sendfile))
+    if hasattr(os, name)
+]
+
+
+def _map(f: BinaryIO, size: int) -> mmap.mmap | None:
+    if not size:
+        return None
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def scan_offsets(
+    path: Path,
+    start: int = 0,
+    end: int | None = None,
+    use_mmap: bool = True,
+) -> array[int]:
+    """
+    Возвращает байтовые смещения начал непустых строк файла в диапазоне `[start, end)`.
+    `start` должен указывать на начало строки.
+    """
+    with path.open('rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if end is not None:
+            size = min(size, end)
+        if start >= size:
+            return array('Q')
+
+        if not use_mmap:
+            f.seek(start)
+            return _scan_lines(f, start, size)
+
+        with _map(f, size) as mm:  # type: ignore[union-attr]
+            return _scan_mmap(mm, start, size)
+
+
+def _scan_lines(f: BinaryIO, start: int, end: int) -> array[int]:
+    offsets = array('Q')
+    position = start
+    for line in f:
+        if position >= end:
+            break
+        if line.rstrip(b'\r\n'):
+            offsets.append(position)
+        position += len(line)
+    return offsets
+
+
+def _scan_mmap(mm: mmap.mmap, start: int, end: int) -> array[int]:
+    """
+    Если диапазон уже нормализован (нет пустых строк и `\\r`), начала товаров — это позиции
+    сразу за переводами строк; их ищет `re` без создания объектов строк.
+
+    Иначе файл сканируется кусками по `_SCAN_CHUNK` байт (по границам строк): длины строк,
+    их смещения и фильтрация пустых строк вычисляются встроенными итераторами.
+    """
+    if _is_normalized(mm, start, end):
+        offsets = array('Q', [start])
+        offsets.extend(map(Match.end, _NEWLINE.finditer(mm, start, end)))
+        if offsets[-1] == end:
+            offsets.pop()
+        return offsets
+
+    offsets = array('Q')
+    position = start
+    while position < end:
+        chunk_end = min(position + _SCAN_CHUNK, end)
+        if chunk_end < end:
+            newline = mm.rfind(b'\n', position, chunk_end)
+            if newline == -1:
+                newline = mm.find(b'\n', chunk_end, end)
+            chunk_end = end if newline == -1 else newline + 1
+
+        lines = mm[position:chunk_end].split(b'\n')
+        if not lines[-1]:
+            lines.pop()
+        starts = accumulate(map(add, map(len, lines), repeat(1)), initial=position)
+        offsets.extend(compress(starts, map(methodcaller('rstrip', b'\r'), lines)))
+        position = chunk_end
+    return offsets
+
+
+def _is_normalized(mm: mmap.mmap, start: int, end: int) -> bool:
+    """
+    Проверяет, что диапазон уже записан в нормализованном виде: без пустых строк
+    и `\\r`. Такой диапазон можно копировать целиком.
+    """
+    return (
+        mm.find(b'\r', start, end) == -1
+        and mm.find(b'\n\n', start, end) == -1
+        and mm[start] != _LF
+    )
+
+
+def copy_range(src: BinaryIO, dst: BinaryIO, start: int, end: int) -> None:
+    """
+    Копирует байты `[start, end)` из `src` в текущую позицию `dst` без прохода данных
+    через Python, если ОС это позволяет.
+    """
+    dst.flush()
+    src_fd, dst_fd = src.fileno(), dst.fileno()
+    offset = start
+
+    for method in _KERNEL_COPY_METHODS:
+        try:
+            while offset < end:
+                copied = method(src_fd, dst_fd, offset, end - offset)
+                if not copied:
+                    break
+                offset += copied
+        except OSError:
+            # Не поддерживается файловой системой (например, копирование между разными ФС
+            # на старых ядрах): пробуем следующий способ.
+            continue
+        if offset >= end:
+            return
+
+    if offset < end:
+        src.seek(offset)
+        remaining = end - offset
+        while remaining:
+            chunk = src.read(min(remaining, _COPY_CHUNK))
+            if not chunk:
+                break
+            dst.write(chunk)
+            remaining -= len(chunk)
+
+
+def copy_products(
+    src: BinaryIO,
+    dst: BinaryIO,
+    start: int,
+    end: int,
+    src_offsets: array[int] | None,
+    position: int,
+    use_mmap: bool = True,
+) -> tuple[array[int], int]:
+    """
+    Копирует товары из диапазона `[start, end)` файла `src` в `dst`, нормализуя их:
+    пустые строки удаляются, окончания строк приводятся к `\\n`.
+
+    :param src_offsets: смещения товаров диапазона в `src` (из индекса). Если они переданы
+        и диапазон уже нормализован, он копируется целиком, а смещения лишь сдвигаются.
+    :param position: текущая позиция в `dst`.
+
+    :return: смещения скопированных товаров в `dst` и новая позиция в `dst`.
+    """
+    if start >= end:
+        return array('Q'), position
+
+    size = os.fstat(src.fileno()).st_size
+    if use_mmap and src_offsets is not None:
+        with _map(src, size) as mm:  # type: ignore[union-attr]
+            if _is_normalized(mm, start, end):
+                copy_range(src, dst, start, end)
+                shift = position - start
+                offsets = array('Q', (i + shift for i in src_offsets))
+                position += end - start
+                if mm[end - 1] != _LF:
+                    dst.write(b'\n')
+                    position += 1
+                return offsets, position
+
+    offsets = array('Q')
+    src.seek(start)
+    remaining = end - start
+    for line in src:
+        remaining -= len(line)
+        line = line.rstrip(b'\r\n')
+        if line:
+            offsets.append(position)
+            dst.write(line + b'\n')
+            position += len(line) + 1
+        if remaining <= 0:
+            break
+    return offsets, position
+
+
+def read_products(src: BinaryIO, start: int, end: int) -> list[str]:
+    """
+    Возвращает непустые строки из диапазона `[start, end)`.
+    """
+    if start >= end:
+        return []
+    src.seek(start)
+    data = src.read(end - start)
+    return [i.decode('utf-8') for i in (j.rstrip(b'\r') for j in data.split(b'\n')) if i]
+
+
+def copy_file_tail(src: BinaryIO, dst: BinaryIO, start: int) -> None:
+    """
+    Копирует файл `src` начиная с байта `start` в `dst`.
+    """
+    size = os.fstat(src.fileno()).st_size
+    if start < size:
+        copy_range(src, dst, start, size)
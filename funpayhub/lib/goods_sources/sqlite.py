@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+
+__all__ = ['SqliteGoodsSource']
+
+
+import sqlite3
+from asyncio import Lock
+from pathlib import Path
+from contextlib import closing
+from collections.abc import Sequence
+
+from funpayhub.lib.exceptions import NotEnoughGoodsError
+
+from .base import GoodsSource
+
+
+_IMPORT_BATCH_SIZE = 10_000
+
+
+class SqliteGoodsSource(GoodsSource):
+    """
+    Представляет таблицу с товарами в SQLite базе данных.
+
+    Каждый источник — отдельная таблица с автоинкрементным `id`, порядок выдачи товаров
+    совпадает с порядком `id`. База открывается в режиме WAL, выдача товаров — один
+    `DELETE ... RETURNING` по наименьшим `id` в рамках одной транзакции.
+    """
+
+    def __init__(self, source: str | Path, table: str) -> None:
+        if not isinstance(source, (str, Path)):
+            raise ValueError('Source must be a string or Path object.')
+        if not table:
+            raise ValueError('Table name must not be empty.')
+
+        super().__init__()
+        self._path = Path(source) if isinstance(source, str) else source
+        self._table = table
+        self._quoted_table = '"' + table.replace('"', '""') + '"'
+        self._connection: sqlite3.Connection | None = None
+        self._goods_amount = 0
+        self._data_version: int | None = None
+        self._lock = Lock()
+        self._source_id = f'sqlite://{source}#{table}'
+
+    @staticmethod
+    def list_tables(path: str | Path) -> list[str]:
+        """
+        Возвращает список таблиц с товарами в базе данных.
+        """
+        with closing(sqlite3.connect(path)) as connection:
+            rows = connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' "
+                "AND name NOT LIKE 'sqlite_%' ORDER BY name",
+            ).fetchall()
+        return [name for (name,) in rows]
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self._path,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {self._quoted_table} '
+                f'(id INTEGER PRIMARY KEY AUTOINCREMENT, product TEXT NOT NULL)',
+            )
+            self._connection = connection
+        return self._connection
+
+    def _count_products(self) -> int:
+        return self._db.execute(f'SELECT COUNT(*) FROM {self._quoted_table}').fetchone()[0]
+
+    def _insert(self, products: Sequence[str]) -> int:
+        rows = [(i,) for i in (i.rstrip('\r\n') for i in products) if i]
+        self._db.executemany(f'INSERT INTO {self._quoted_table} (product) VALUES (?)', rows)
+        return len(rows)
+
+    def _start_id(self, start: int) -> int | None:
+        """
+        Возвращает `id` товара с порядковым номером `start`.
+
+        Пока в `id` нет дыр (товары выдаются и удаляются с начала), `id` вычисляется
+        без прохода по таблице.
+        """
+        first, last = self._db.execute(
+            f'SELECT MIN(id), MAX(id) FROM {self._quoted_table}',
+        ).fetchone()
+        if first is None:
+            return None
+
+        if last - first + 1 == self._goods_amount:
+            return first + start
+
+        row = self._db.execute(
+            f'SELECT id FROM {self._quoted_table} ORDER BY id LIMIT 1 OFFSET ?',
+            (start,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _get_data_version(self) -> int:
+        return self._db.execute('PRAGMA data_version').fetchone()[0]
+
+    def _load(self) -> None:
+        self._goods_amount = self._count_products()
+        self._data_version = self._get_data_version()
+
+    def _refresh(self) -> bool:
+        # `data_version` меняется только при коммитах из других соединений, поэтому таблица
+        # пересчитывается, лишь если базу изменили в обход источника.
+        data_version = self._get_data_version()
+        if data_version == self._data_version:
+            return False
+
+        self._data_version = data_version
+        amount = self._count_products()
+        changed = amount != self._goods_amount
+        self._goods_amount = amount
+        return changed
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _remove(self) -> None:
+        self._db.execute(f'DROP TABLE IF EXISTS {self._quoted_table}')
+        self._close()
+        self._goods_amount = 0
+
+    def _add_goods(self, products: Sequence[str]) -> None:
+        with self._db:
+            self._db.execute('BEGIN IMMEDIATE')
+            added = self._insert(products)
+        self._goods_amount += added
+
+    def _pop_goods(self, amount: int) -> list[str]:
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            rows = self._db.execute(
+                f'DELETE FROM {self._quoted_table} WHERE id IN '
+                f'(SELECT id FROM {self._quoted_table} ORDER BY id LIMIT ?) '
+                f'RETURNING id, product',
+                (amount,),
+            ).fetchall()
+            if len(rows) < amount:
+                self._db.execute('ROLLBACK')
+                self._goods_amount = len(rows)
+                raise NotEnoughGoodsError(self, amount)
+            self._db.execute('COMMIT')
+        except sqlite3.Error:
+            if self._db.in_transaction:
+                self._db.execute('ROLLBACK')
+            raise
+
+        self._goods_amount -= amount
+        # Порядок строк в RETURNING не гарантирован.
+        return [product for _, product in sorted(rows)]
+
+    def _get_goods(self, amount: int, start: int) -> list[str]:
+        start_id = self._start_id(start)
+        if start_id is None:
+            return []
+
+        rows = self._db.execute(
+            f'SELECT product FROM {self._quoted_table} WHERE id >= ? ORDER BY id LIMIT ?',
+            (start_id, amount),
+        ).fetchall()
+        return [product for (product,) in rows]
+
+    def _set_goods(self, goods: list[str]) -> None:
+        with self._db:
+            self._db.execute('BEGIN IMMEDIATE')
+            self._db.execute(f'DELETE FROM {self._quoted_table}')
+            added = self._insert(goods)
+        self._goods_amount = added
+
+    def _remove_goods(self, from_index: int, amount: int) -> None:
+        with self._db:
+            self._db.execute('BEGIN IMMEDIATE')
+            removed = self._db.execute(
+                f'DELETE FROM {self._quoted_table} WHERE id IN '
+                f'(SELECT id FROM {self._quoted_table} ORDER BY id LIMIT ? OFFSET ?)',
+                (amount, from_index),
+            ).rowcount
+        self._goods_amount -= removed
+
+    def _import_file(self, path: str | Path) -> int:
+        imported = 0
+        with self._db, open(path, 'r', encoding='utf-8') as f:
+            self._db.execute('BEGIN IMMEDIATE')
+            batch: list[str] = []
+            for line in f:
+                batch.append(line)
+                if len(batch) >= _IMPORT_BATCH_SIZE:
+                    imported += self._insert(batch)
+                    batch.clear()
+            imported += self._insert(batch)
+        self._goods_amount += imported
+        return imported
+
+    async def load(self) -> None:
+        await self._run_io(self._load)
+
+    async def refresh(self) -> bool:
+        async with self._lock:
+            return await self._run_io(self._refresh)
+
+    async def reload(self) -> None:
+        async with self._lock:
+            await self.load()
+
+    async def unload(self) -> None:
+        async with self._lock:
+            await self._run_io(self._close)
+
+    async def remove(self) -> None:
+        async with self._lock:
+            await self._run_io(self._remove)
+
+    async def add_goods(self, products: Sequence[str]) -> int:
+        if not len(products):
+            return 0
+
+        async with self._lock:
+            await self._run_io(self._add_goods, products)
+        return 0
+
+    async def pop_goods(self, amount: int) -> list[str]:
+        if amount < 1:
+            raise ValueError('Amount must be greater than 0.')
+
+        async with self._lock:
+            return await self._run_io(self._pop_goods, amount)
+
+    async def get_goods(self, amount: int, start: int = 0) -> list[str]:
+        if start < 0 or amount < -1:
+            raise ValueError('Start must be greater than 0.')
+
+        if not amount:
+            return []
+
+        async with self._lock:
+            return await self._run_io(self._get_goods, amount, start)
+
+    async def set_goods(self, goods: list[str]) -> int:
+        async with self._lock:
+            await self._run_io(self._set_goods, goods)
+        return 0
+
+    async def remove_goods(self, from_index: int, amount: int) -> None:
+        if amount < 1:
+            raise ValueError('Amount must be greater than 0.')
+
+        async with self._lock:
+            await self._run_io(self._remove_goods, from_index, amount)
+
+    async def import_file(self, path: str | Path) -> int:
+        """
+        Однократно импортирует товары из текстового файла (каждый товар с новой строки)
+        в конец таблицы. Пустые строки пропускаются.
+
+        :return: кол-во импортированных товаров.
+        """
+        async with self._lock:
+            return await self._run_io(self._import_file, path)
+
+    def __len__(self) -> int:
+        return self._goods_amount
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def table(self) -> str:
+        return self._table
+
+    @property
+    def source_id(self) -> str:
+        return self._source_id
+
+    @property
+    def display_id(self) -> str:
+        return self._table
+
+    @property
+    def display_source(self) -> str:
+        return f'{self._path.absolute()}#{self._table}'
+
+    @property
+    def display_source_type(self) -> str:
+        return '$sqlite_source_type'
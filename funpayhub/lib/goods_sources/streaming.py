@@ -0,0 +1,76 @@
+"""
+Потоковые преобразования товаров: чтение товаров из потока байтов и сериализация товаров
+в поток байтов. Ни одна из функций не держит в памяти больше одной пачки товаров.
+"""
+
+from __future__ import annotations
+
+
+__all__ = ['STREAM_BATCH_SIZE', 'batched', 'iter_lines', 'encode_goods']
+
+
+import zlib
+import codecs
+from collections.abc import AsyncIterable, AsyncIterator
+
+
+STREAM_BATCH_SIZE = 10_000
+"""Кол-во товаров в одной пачке при потоковой загрузке / выгрузке."""
+
+
+async def batched[T](iterable: AsyncIterable[T], size: int) -> AsyncIterator[list[T]]:
+    """
+    Разбивает асинхронный поток на пачки по `size` элементов.
+    """
+    batch: list[T] = []
+    async for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def iter_lines(chunks: AsyncIterable[bytes], encoding: str = 'utf-8') -> AsyncIterator[str]:
+    """
+    Декодирует поток байтов и разбивает его на строки (без символов перевода строки).
+    Строки и многобайтовые символы, разорванные между кусками, склеиваются.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    tail = ''
+    async for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).split('\n')
+        tail = lines.pop()
+        for line in lines:
+            yield line.rstrip('\r')
+
+    tail += decoder.decode(b'', final=True)
+    if tail:
+        yield tail.rstrip('\r')
+
+
+async def encode_goods(
+    batches: AsyncIterable[list[str]],
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Сериализует пачки товаров в байты (каждый товар с новой строки).
+
+    :param compress: сжимать ли поток в формат gzip.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    first = True
+    async for batch in batches:
+        if not batch:
+            continue
+        data = ('' if first else '\n') + '\n'.join(batch)
+        first = False
+        encoded = data.encode('utf-8')
+        if compressor is None:
+            yield encoded
+        elif compressed := compressor.compress(encoded):
+            yield compressed
+
+    if compressor is not None:
+        yield compressor.flush()
@@ -14,9 +14,8 @@ from abc import ABC, abstractmethod
 from collections.abc import Callable
 
 from typing_extensions import Any
-from eventry.asyncio.callable_wrappers import CallableWrapper
 
-from funpayhub.lib.core import classproperty
+from funpayhub.lib.core import classproperty, injection_plan
 
 
 @dataclass
@@ -39,12 +38,10 @@ class Hook(ABC):
     def __init__(self, *args: Any, **kwargs: Any) -> None: ...
 
     async def __call__(self, **data: Any) -> str:
-        wrapper = CallableWrapper(self.format)
-        return await wrapper((), data)
+        return await injection_plan(type(self).format)((self,), data)
 
     async def __filter_wrapped__(self, **data: Any) -> bool:
-        wrapper = CallableWrapper(self.filter)
-        return await wrapper((), data)
+        return await injection_plan(type(self).filter)((self,), data)
 
     async def filter(self, *args: Any, **kwargs: Any) -> bool:
         return True
@@ -81,4 +78,6 @@ class HooksRegistry:
         if hook.name in self._hooks and not overwrite:
             raise ValueError(f'Hook {hook.name!r} already exists.')
 
+        injection_plan(hook.format)
+        injection_plan(hook.filter)
         self._hooks[hook.name] = hook
@@ -28,7 +28,8 @@
 from __future__ import annotations
 
 
-__all__ = ['FormattersRegistry', 'Formatter', 'Image', 'MessagesStack']
+__all__ = ['FormattersRegistry', 'Formatter', 'Image', 'MessagesStack', 'FormatterStats']
 
 
+from .stats import FormatterStats
 from .formatters_registry import Image, Formatter, MessagesStack, FormattersRegistry
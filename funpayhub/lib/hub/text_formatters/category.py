@@ -22,7 +22,8 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any, Never, Union, TypeAlias
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from functools import reduce
+from collections.abc import Callable, Hashable
 
 
 if TYPE_CHECKING:
@@ -163,11 +164,36 @@ class CategoriesQuery(ABC, _LogicalOperatorsMixin):
     - фильтрации форматтеров,
     - комбинирования категорий,
     - передачи условий в `FormattersRegistry`.
+
+    Реестр компилирует запрос в битовую маску подходящих форматтеров (`mask`) и кэширует
+    ее по `cache_key`, поэтому проверка форматтера по запросу выполняется за O(1).
     """
 
     @abstractmethod
     def __call__(self, formatter: type[Formatter], registry: FormattersRegistry) -> bool: ...
 
+    @property
+    def cache_key(self) -> Hashable:
+        """
+        Ключ, по которому реестр кэширует маску запроса.
+
+        Одинаковые по структуре запросы должны возвращать одинаковые ключи.
+        По умолчанию ключом является сам объект запроса.
+        """
+        return self
+
+    def mask(self, registry: FormattersRegistry) -> int:
+        """
+        Битовая маска форматтеров реестра, подходящих под запрос (см. `registry.formatter_bit`).
+
+        По умолчанию каждый форматтер реестра проверяется через `__call__`.
+        """
+        result = 0
+        for formatter in registry._formatters.values():
+            if self(formatter, registry):
+                result |= registry.formatter_bit(formatter.key)
+        return result
+
 
 class InCategory(CategoriesQuery):
     """
@@ -181,7 +207,15 @@ class InCategory(CategoriesQuery):
         self.category = category
 
     def __call__(self, formatter: type[Formatter], registry: FormattersRegistry) -> bool:
-        return self.category.id in registry._formatters_to_categories.get(formatter.key, [])
+        mask = registry.category_mask(self.category.id)
+        return bool(mask & registry.formatter_bit(formatter.key))
+
+    @property
+    def cache_key(self) -> Hashable:
+        return 'in', self.category.id
+
+    def mask(self, registry: FormattersRegistry) -> int:
+        return registry.category_mask(self.category.id)
 
 
 class CategoriesAndQuery(CategoriesQuery):
@@ -201,6 +235,13 @@ class CategoriesAndQuery(CategoriesQuery):
                 return False
         return True
 
+    @property
+    def cache_key(self) -> Hashable:
+        return 'and', *(i.cache_key for i in self.queries)
+
+    def mask(self, registry: FormattersRegistry) -> int:
+        return reduce(lambda a, b: a & b.mask(registry), self.queries, registry.formatters_mask)
+
 
 class CategoriesOrQuery(CategoriesQuery):
     """
@@ -219,6 +260,13 @@ class CategoriesOrQuery(CategoriesQuery):
                 return True
         return False
 
+    @property
+    def cache_key(self) -> Hashable:
+        return 'or', *(i.cache_key for i in self.queries)
+
+    def mask(self, registry: FormattersRegistry) -> int:
+        return reduce(lambda a, b: a | b.mask(registry), self.queries, 0)
+
 
 class CategoriesNotQuery(CategoriesQuery):
     """
@@ -232,3 +280,10 @@ class CategoriesNotQuery(CategoriesQuery):
 
     def __call__(self, formatter: type[Formatter], registry: FormattersRegistry) -> bool:
         return not self.query(formatter, registry)
+
+    @property
+    def cache_key(self) -> Hashable:
+        return 'not', self.query.cache_key
+
+    def mask(self, registry: FormattersRegistry) -> int:
+        return registry.formatters_mask & ~self.query.mask(registry)
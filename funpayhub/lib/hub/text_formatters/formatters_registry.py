@@ -33,12 +33,23 @@ class MyFormatter(
 - изображение (`Image`),
 - список строк и/или изображений.
 
+Форматтеры выполняются по очереди, в порядке следования вызовов. Форматтеры без побочных
+эффектов можно объявить с `concurrent=True`: вызовы таких форматтеров в одном тексте
+выполняются одновременно.
+
+Форматтеры, результат которых зависит только от аргументов и контекста, объявляются с
+`pure=True`: повторные вызовы с теми же аргументами в одном тексте выполняются один раз.
+Если результат не зависит и от контекста, можно указать `cache_ttl` (в секундах) — тогда
+результат переиспользуется и между форматированиями.
+
 Реестр форматтеров (`FormattersRegistry`) отвечает за:
 - регистрацию форматтеров,
 - регистрацию категорий,
 - фильтрацию форматтеров по категориям,
 - форматирование текста с обработкой ошибок и сохранением исходных вызовов
   при невозможности выполнения.
+- сбор статистики выполнения форматтеров и ограничение времени их выполнения
+  (`timeout`).
 
 Модуль также содержит вспомогательные структуры для представления изображений
 и отправки итогового набора сообщений.
@@ -47,17 +58,23 @@ class MyFormatter(
 
 from __future__ import annotations
 
+import time
+import asyncio
 from typing import TYPE_CHECKING, Any, Type
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
+from types import MappingProxyType
+from weakref import WeakKeyDictionary
+from collections import OrderedDict
+from collections.abc import Hashable
 
-from eventry.asyncio.callable_wrappers import CallableWrapper
-
-from funpayhub.lib.core import classproperty
+from funpayhub.lib.core import classproperty, injection_plan
+from funpayhub.lib.properties import Parameter
 from funpayhub.lib.translater import _en
 from funpayhub.lib.exceptions.formatters import FormatterError, FormatterContextMismatch
 
-from .parser import TextWithFormattersInvocations, extract_calls
+from .stats import FormatterStats
+from .parser import Invocation, TextWithFormattersInvocations, extract_calls
 from .category import InCategory, CategoriesQuery, FormatterCategory
 
 
@@ -68,6 +85,12 @@ if TYPE_CHECKING:
 
 type FORMATTER_R = str | Image | list[str | Image]
 
+_RESULTS_CACHE_SIZE = 1024
+"""Максимальное кол-во результатов форматтеров в кэше реестра (см. `Formatter.cache_ttl`)."""
+
+_QUERIES_CACHE_SIZE = 256
+"""Максимальное кол-во скомпилированных запросов в кэше реестра."""
+
 
 class Formatter[CTX](ABC):
     if TYPE_CHECKING:
@@ -80,11 +103,20 @@ class Formatter[CTX](ABC):
         description: str
         context_type: type[Any] | tuple[type[Any], ...]
 
+    __concurrent__: bool = False
+    __pure__: bool = False
+    __cache_ttl__: float | None = None
+    __timeout__: float | None = None
+
     def __init_subclass__(cls, **kwargs: Any) -> None:
         key = kwargs.pop('key', None)
         name = kwargs.pop('name', None)
         description = kwargs.pop('description', None)
         context_type = kwargs.pop('context_type', None)
+        concurrent = kwargs.pop('concurrent', None)
+        pure = kwargs.pop('pure', None)
+        cache_ttl = kwargs.pop('cache_ttl', None)
+        timeout = kwargs.pop('timeout', None)
 
         if not getattr(cls, '__key__', None):
             if any(not i for i in [key, name, description, context_type]):
@@ -121,6 +153,18 @@ class Formatter[CTX](ABC):
             cls.__description__ = description
         if context_type is not None:
             cls.__context_type__ = context_type
+        if concurrent is not None:
+            cls.__concurrent__ = concurrent
+        if pure is not None:
+            cls.__pure__ = pure
+        if cache_ttl is not None:
+            if cache_ttl <= 0:
+                raise ValueError(
+                    f"Keyword argument 'cache_ttl' must be positive, got {cache_ttl}.",
+                )
+            cls.__cache_ttl__ = cache_ttl
+        if timeout is not None:
+            cls.__timeout__ = timeout
 
         super().__init_subclass__(**kwargs)
 
@@ -128,8 +172,7 @@ class Formatter[CTX](ABC):
         self.context = context
 
     async def __call__(self, **data: Any) -> str:
-        wrapper = CallableWrapper(self.format)
-        return await wrapper((), data)
+        return await injection_plan(type(self).format)((self,), data)
 
     @abstractmethod
     async def format(self, *args: Any, **kwargs: Any) -> FORMATTER_R: ...
@@ -154,6 +197,50 @@ class Formatter[CTX](ABC):
     def context_type(cls) -> type[Any] | tuple[type[Any]]:
         return cls.__context_type__
 
+    @classproperty
+    @classmethod
+    def concurrent(cls) -> bool:
+        """
+        Может ли форматтер выполняться одновременно с другими форматтерами.
+
+        Только форматтеры без побочных эффектов объявляются с `concurrent=True`: такой
+        форматтер может выполниться, даже если форматирование прервется ошибкой
+        предыдущего вызова.
+        """
+        return cls.__concurrent__
+
+    @classproperty
+    @classmethod
+    def pure(cls) -> bool:
+        """
+        Зависит ли результат форматтера только от аргументов вызова и контекста.
+
+        Результаты чистых форматтеров переиспользуются в пределах одного форматирования:
+        повторные вызовы с теми же аргументами не выполняются заново.
+        """
+        return cls.__pure__ or cls.__cache_ttl__ is not None
+
+    @classproperty
+    @classmethod
+    def cache_ttl(cls) -> float | None:
+        """
+        Время (в секундах), в течение которого результат форматтера переиспользуется
+        между форматированиями.
+
+        Указывается только для форматтеров, результат которых не зависит от контекста.
+        """
+        return cls.__cache_ttl__
+
+    @classproperty
+    @classmethod
+    def timeout(cls) -> float | None:
+        """
+        Ограничение времени выполнения форматтера (в секундах).
+
+        Если не указано, используется `FormattersRegistry.default_timeout`.
+        """
+        return cls.__timeout__
+
     @classmethod
     def is_suitable_context(cls, context: Any) -> bool:
         context_types = (
@@ -188,9 +275,23 @@ class MessagesStack:
 
 
 class FormattersRegistry:
-    def __init__(self, workflow_data: Mapping[str, Any] | None = None) -> None:
+    def __init__(
+        self,
+        workflow_data: Mapping[str, Any] | None = None,
+        templates_cache_size: int = 256,
+        max_concurrency: int = 8,
+        default_timeout: float | None = None,
+    ) -> None:
         """
         Реестр форматтеров.
+
+        :param workflow_data: данные, передаваемые в форматтеры.
+        :param templates_cache_size: максимальное кол-во разобранных текстов в LRU кэше.
+            `0` отключает кэш.
+        :param max_concurrency: максимальное кол-во одновременно выполняемых форматтеров
+            при конкурентном форматировании. `1` отключает конкурентное выполнение.
+        :param default_timeout: ограничение времени выполнения (в секундах) для форматтеров,
+            у которых не указан собственный `timeout`. `None` — без ограничения.
         """
         self._formatters: dict[str, type[Formatter]] = {}
         self._categories: dict[str, type[FormatterCategory]] = {}
@@ -198,8 +299,26 @@ class FormattersRegistry:
         self._categories_to_formatters: dict[str, list[str]] = {}
         self._formatters_to_categories: dict[str, list[str]] = {}
 
+        # Принадлежность форматтеров категориям в виде битовых масок: каждому форматтеру
+        # выделяется бит в порядке регистрации.
+        self._formatters_bits: dict[str, int] = {}
+        self._categories_masks: dict[str, int] = {}
+        self._queries_masks: dict[Hashable, int] = {}
+
         self._workflow_data = workflow_data if workflow_data is not None else {}
 
+        self._max_concurrency = max_concurrency
+        self._default_timeout = default_timeout
+        self._timeouts: dict[str, float | None] = {}
+        self._stats: dict[str, FormatterStats] = {}
+        self._results_cache: dict[tuple[Any, ...], tuple[float, FORMATTER_R]] = {}
+        self._templates_cache_size = templates_cache_size
+        self._templates: OrderedDict[str, TextWithFormattersInvocations] = OrderedDict()
+        self._pinned_templates: WeakKeyDictionary[
+            Parameter[str],
+            tuple[str, TextWithFormattersInvocations],
+        ] = WeakKeyDictionary()
+
     def add_formatter(self, formatter: type[Formatter]) -> None:
         """
         Добавляет форматтер в реестр.
@@ -214,14 +333,18 @@ class FormattersRegistry:
         if formatter.key in self._formatters:
             raise ValueError(f'Formatter with key {formatter.key!r} already exists.')
 
+        injection_plan(formatter.format)
         self._formatters[formatter.key] = formatter
         self._formatters_to_categories[formatter.key] = []
+        bit = self._formatters_bits[formatter.key] = 1 << len(self._formatters_bits)
 
         for cat, formatters in self._categories_to_formatters.items():
             category = self._categories[cat]
             if category.contains(formatter, self):
                 formatters.append(formatter.key)
                 self._formatters_to_categories[formatter.key].append(cat)
+                self._categories_masks[cat] |= bit
+        self._queries_masks.clear()
 
     def add_category(self, category: type[FormatterCategory]) -> None:
         if category.id in self._categories:
@@ -229,19 +352,23 @@ class FormattersRegistry:
 
         self._categories[category.id] = category
         self._categories_to_formatters[category.id] = []
+        self._categories_masks[category.id] = 0
 
         for fmt_key, categories in self._formatters_to_categories.items():
             formatter = self._formatters[fmt_key]
             if category.contains(formatter, self):
                 categories.append(category.id)
                 self._categories_to_formatters[category.id].append(fmt_key)
+                self._categories_masks[category.id] |= self._formatters_bits[fmt_key]
+        self._queries_masks.clear()
 
     def get_formatters(
         self,
         query: type[FormatterCategory] | str | CategoriesQuery,
     ) -> list[type[Formatter]]:
         if isinstance(query, CategoriesQuery):
-            return [i for i in self._formatters.values() if query(i, self)]
+            mask = self.query_mask(query)
+            return [i for i in self._formatters.values() if self._formatters_bits[i.key] & mask]
 
         result = []
         formatter_ids = self._categories_to_formatters.get(query.id, [])
@@ -255,12 +382,145 @@ class FormattersRegistry:
     def get_category(self, category_id: str) -> type[FormatterCategory] | None:
         return self._categories.get(category_id, None)
 
+    def formatter_bit(self, formatter_key: str) -> int:
+        """
+        Бит форматтера в масках категорий и запросов (`0`, если форматтер не зарегистрирован).
+        """
+        return self._formatters_bits.get(formatter_key, 0)
+
+    def category_mask(self, category_id: str) -> int:
+        """
+        Битовая маска форматтеров, входящих в категорию.
+        """
+        return self._categories_masks.get(category_id, 0)
+
+    @property
+    def formatters_mask(self) -> int:
+        """
+        Битовая маска всех зарегистрированных форматтеров.
+        """
+        return (1 << len(self._formatters_bits)) - 1
+
+    def query_mask(self, query: type[FormatterCategory] | CategoriesQuery) -> int:
+        """
+        Возвращает битовую маску форматтеров, подходящих под запрос.
+
+        Маски кэшируются по `CategoriesQuery.cache_key` до регистрации нового форматтера
+        или категории.
+        """
+        if not isinstance(query, CategoriesQuery):
+            query = InCategory(query)
+
+        key = query.cache_key
+        if (mask := self._queries_masks.get(key)) is None:
+            if len(self._queries_masks) >= _QUERIES_CACHE_SIZE:
+                self._queries_masks.clear()
+            mask = self._queries_masks[key] = query.mask(self)
+        return mask
+
+    def compile(
+        self,
+        text: str | TextWithFormattersInvocations | Parameter[str],
+    ) -> TextWithFormattersInvocations:
+        """
+        Возвращает разобранный текст с форматтер-вызовами.
+
+        Строки разбираются один раз и хранятся в LRU кэше.
+        Текст параметра разбирается один раз и закрепляется за параметром до изменения
+        его значения (см. `pin`).
+        """
+        if isinstance(text, TextWithFormattersInvocations):
+            return text
+        if isinstance(text, Parameter):
+            return self.pin(text)
+
+        if (parsed := self._templates.get(text)) is not None:
+            self._templates.move_to_end(text)
+            return parsed
+
+        parsed = extract_calls(text)
+        if self._templates_cache_size > 0:
+            self._templates[text] = parsed
+            if len(self._templates) > self._templates_cache_size:
+                self._templates.popitem(last=False)
+        return parsed
+
+    def pin(self, parameter: Parameter[str]) -> TextWithFormattersInvocations:
+        """
+        Разбирает значение параметра и закрепляет результат за параметром.
+
+        Закрепленные тексты не вытесняются из кэша. Они сбрасываются через `unpin`
+        при изменении значения параметра (хук `on_parameter_value_changed`) либо при
+        сборке параметра сборщиком мусора.
+        """
+        value = parameter.value
+        pinned = self._pinned_templates.get(parameter)
+        # Проверка на идентичность страхует от изменений значения в обход хуков.
+        if pinned is not None and pinned[0] is value:
+            return pinned[1]
+
+        parsed = extract_calls(value)
+        self._pinned_templates[parameter] = (value, parsed)
+        return parsed
+
+    def unpin(self, parameter: Parameter[str]) -> bool:
+        return self._pinned_templates.pop(parameter, None) is not None
+
+    def is_pinned(self, parameter: Parameter[Any]) -> bool:
+        return parameter in self._pinned_templates
+
+    def clear_templates_cache(self) -> None:
+        self._templates.clear()
+        self._pinned_templates.clear()
+
+    def clear_results_cache(self) -> None:
+        self._results_cache.clear()
+
+    @property
+    def default_timeout(self) -> float | None:
+        return self._default_timeout
+
+    @default_timeout.setter
+    def default_timeout(self, value: float | None) -> None:
+        self._default_timeout = value
+
+    def set_timeout(self, formatter_key: str, timeout: float | None) -> None:
+        """
+        Устанавливает ограничение времени выполнения форматтера (в секундах).
+        Имеет приоритет над `Formatter.timeout` и `default_timeout`.
+
+        :param formatter_key: ключ форматтера.
+        :param timeout: ограничение времени. `None` — без ограничения.
+        """
+        self._timeouts[formatter_key] = timeout
+
+    def reset_timeout(self, formatter_key: str) -> None:
+        self._timeouts.pop(formatter_key, None)
+
+    def get_timeout(self, formatter: type[Formatter]) -> float | None:
+        if formatter.key in self._timeouts:
+            return self._timeouts[formatter.key]
+        if formatter.timeout is not None:
+            return formatter.timeout
+        return self._default_timeout
+
+    @property
+    def stats(self) -> MappingProxyType[str, FormatterStats]:
+        """
+        Статистика выполнения форматтеров: {ключ форматтера: статистика}.
+        """
+        return MappingProxyType(self._stats)
+
+    def reset_stats(self) -> None:
+        self._stats.clear()
+
     async def format_text(
         self,
-        text: str | TextWithFormattersInvocations,
+        text: str | TextWithFormattersInvocations | Parameter[str],
         context: Any,
         query: Type[FormatterCategory] | CategoriesQuery | None = None,
         raise_on_error: bool = True,
+        concurrent: bool = True,
     ) -> MessagesStack:
         """
         Форматирует текст, выполняя найденные форматтер-вызовы.
@@ -268,12 +528,14 @@ class FormattersRegistry:
         Если форматтер не найден, оставляется текст его вызова. Исключение не возбуждается.
         Если форматтер не подходит по `query`,
             оставляется текст его вызоыва. Исключние не возбуждается.
+
+        Разобранный текст берется из кэша (см. `compile`).
         """
         if query is not None and not isinstance(query, CategoriesQuery):
             query = InCategory(query)
 
-        parsed = extract_calls(text) if isinstance(text, str) else text
-        return await self.execute_formatters(parsed, context, query, raise_on_error)
+        parsed = self.compile(text)
+        return await self.execute_formatters(parsed, context, query, raise_on_error, concurrent)
 
     async def execute_formatters(
         self,
@@ -281,16 +543,35 @@ class FormattersRegistry:
         context: Any,
         query: Type[FormatterCategory] | CategoriesQuery | None = None,
         raise_on_error: bool = True,
+        concurrent: bool = True,
     ) -> MessagesStack:
+        """
+        Выполняет форматтер-вызовы и собирает итоговый набор сообщений.
+
+        Если `concurrent=True`, форматтеры, поддерживающие конкурентное выполнение
+        (`Formatter.concurrent`), запускаются одновременно (не более `max_concurrency` за раз).
+        Остальные форматтеры выполняются по очереди в порядке следования вызовов.
+        Результаты в любом случае собираются в исходном порядке, а ошибки обрабатываются так же,
+        как при последовательном выполнении: возбуждается ошибка первого по порядку вызова.
+        Если `raise_on_error=True`, после ошибки вызова одновременно выполняемые вызовы,
+        идущие после него, отменяются.
+        """
+        mask = self.query_mask(query) if query is not None else self.formatters_mask
+        memo: dict[tuple[Any, ...], asyncio.Future[FORMATTER_R]] = {}
+        prefetched = (
+            await self._prefetch_formatters(calls, context, mask, memo, raise_on_error)
+            if concurrent
+            else {}
+        )
         result: list[str | Image] = []
 
-        for part in calls.split:
+        for index, part in enumerate(calls.split):
             if isinstance(part, str):
                 result.append(part)
                 continue
 
             formatter_cls = self._formatters.get(part.name)
-            if not formatter_cls or (query and not query(formatter_cls, self)):
+            if not formatter_cls or not self._formatters_bits[part.name] & mask:
                 result.append(part.string)
                 continue
 
@@ -301,8 +582,12 @@ class FormattersRegistry:
                 continue
 
             try:
-                formatter = formatter_cls(context, *part.args)
-                formatted = await formatter(**self._workflow_data)
+                if index in prefetched:
+                    formatted = prefetched[index]
+                    if isinstance(formatted, BaseException):
+                        raise formatted
+                else:
+                    formatted = await self._run_formatter(formatter_cls, part, context, memo)
 
                 if isinstance(formatted, list):
                     result.extend(formatted)
@@ -322,9 +607,161 @@ class FormattersRegistry:
                 result.append(part.string)
         return MessagesStack(normalize_messages(result))
 
-    @staticmethod
-    def extract_calls(text: str) -> TextWithFormattersInvocations:
-        return extract_calls(text)
+    async def _run_formatter(
+        self,
+        formatter_cls: type[Formatter],
+        invocation: Invocation,
+        context: Any,
+        memo: dict[tuple[Any, ...], asyncio.Future[FORMATTER_R]],
+    ) -> FORMATTER_R:
+        """
+        Выполняет форматтер-вызов.
+
+        Результаты чистых форматтеров запоминаются в `memo` (в пределах одного форматирования)
+        и, если у форматтера указан `cache_ttl`, в кэше реестра.
+        """
+        if not formatter_cls.pure:
+            return await self._call_formatter(formatter_cls, invocation, context)
+
+        # Тип аргумента входит в ключ, т.к. 1 == 1.0 == True.
+        key = (formatter_cls.key, *((type(i), i) for i in invocation.args))
+        if (future := memo.get(key)) is None:
+            future = memo[key] = asyncio.ensure_future(
+                self._run_cacheable_formatter(formatter_cls, invocation, context, key),
+            )
+        return await asyncio.shield(future)
+
+    async def _run_cacheable_formatter(
+        self,
+        formatter_cls: type[Formatter],
+        invocation: Invocation,
+        context: Any,
+        key: tuple[Any, ...],
+    ) -> FORMATTER_R:
+        ttl = formatter_cls.cache_ttl
+        if ttl is not None and (cached := self._results_cache.get(key)) is not None:
+            expires_at, result = cached
+            if expires_at > time.monotonic():
+                return result
+
+        result = await self._call_formatter(formatter_cls, invocation, context)
+
+        if ttl is not None:
+            now = time.monotonic()
+            if len(self._results_cache) >= _RESULTS_CACHE_SIZE:
+                self._results_cache = {k: v for k, v in self._results_cache.items() if v[0] > now}
+            if len(self._results_cache) < _RESULTS_CACHE_SIZE:
+                self._results_cache[key] = (now + ttl, result)
+        return result
+
+    async def _call_formatter(
+        self,
+        formatter_cls: type[Formatter],
+        invocation: Invocation,
+        context: Any,
+    ) -> FORMATTER_R:
+        """
+        Создает и выполняет форматтер с ограничением по времени, записывая статистику.
+        """
+        stats = self._stats.get(formatter_cls.key)
+        if stats is None:
+            stats = self._stats[formatter_cls.key] = FormatterStats()
+        timeout = self.get_timeout(formatter_cls)
+
+        deadline = asyncio.timeout(timeout)
+        started_at = time.perf_counter()
+        try:
+            async with deadline:
+                formatter = formatter_cls(context, *invocation.args)
+                result = await formatter(**self._workflow_data)
+        except TimeoutError as e:
+            # TimeoutError может выбросить и сам форматтер (например, таймаут HTTP-клиента):
+            # это обычная ошибка форматтера, а не превышение ограничения реестра.
+            if not deadline.expired():
+                stats.record(time.perf_counter() - started_at, error=True)
+                raise
+            stats.record(time.perf_counter() - started_at, timeout=True)
+            raise FormatterError(
+                _en('Formatter %s did not finish in %s seconds.'),
+                formatter_cls.key,
+                timeout,
+            ) from e
+        except Exception:
+            stats.record(time.perf_counter() - started_at, error=True)
+            raise
+
+        stats.record(time.perf_counter() - started_at)
+        return result
+
+    async def _prefetch_formatters(
+        self,
+        calls: TextWithFormattersInvocations,
+        context: Any,
+        mask: int,
+        memo: dict[tuple[Any, ...], asyncio.Future[FORMATTER_R]],
+        raise_on_error: bool = True,
+    ) -> dict[int, FORMATTER_R | BaseException]:
+        """
+        Одновременно выполняет конкурентные форматтер-вызовы.
+
+        Если `raise_on_error=True`, при ошибке вызова отменяются вызовы, идущие после него:
+        до них форматирование все равно не дойдет.
+
+        :return: словарь {индекс вызова в `calls.split`: результат или исключение}.
+            Отмененных вызовов в словаре нет.
+        """
+        jobs: list[tuple[int, type[Formatter], Invocation]] = []
+        for index, part in enumerate(calls.split):
+            if isinstance(part, str):
+                continue
+            formatter_cls = self._formatters.get(part.name)
+            if (
+                formatter_cls is None
+                or not formatter_cls.concurrent
+                or not self._formatters_bits[part.name] & mask
+                or not formatter_cls.is_suitable_context(context)
+            ):
+                continue
+            jobs.append((index, formatter_cls, part))
+
+        if len(jobs) < 2 or self._max_concurrency < 2:
+            return {}
+
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def run(formatter_cls: type[Formatter], invocation: Invocation) -> FORMATTER_R:
+            async with semaphore:
+                return await self._run_formatter(formatter_cls, invocation, context, memo)
+
+        tasks = [
+            asyncio.ensure_future(run(formatter_cls, part)) for _, formatter_cls, part in jobs
+        ]
+        try:
+            pending: set[asyncio.Future[FORMATTER_R]] = set(tasks)
+            while pending:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+                if not raise_on_error:
+                    continue
+                failed = next((i for i, t in enumerate(tasks) if _failed(t)), None)
+                if failed is not None:
+                    for task in tasks[failed + 1 :]:
+                        task.cancel()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        return {
+            index: task.exception() or task.result()
+            for (index, _, _), task in zip(jobs, tasks, strict=True)
+            if not task.cancelled()
+        }
+
+    def extract_calls(self, text: str | Parameter[str]) -> TextWithFormattersInvocations:
+        return self.compile(text)
+
+
+def _failed(future: asyncio.Future[Any]) -> bool:
+    return future.done() and not future.cancelled() and future.exception() is not None
 
 
 def normalize_messages(items: list[str | Image]) -> list[str | Image]:
@@ -3,10 +3,28 @@ from __future__ import annotations
 import re
 from typing import Any
 from dataclasses import field, dataclass
+from functools import lru_cache
 
 
 KEY_RE = re.compile(r'(?<!\$)\$[a-zA-Zа-яА-Я0-9-_]+')
 
+# Кавычка открывает / закрывает строку, только если перед ней нет `\`.
+_QUOTED = r'"(?:[^"]++|(?<=\\)")*+(?<!\\)"'
+
+INVOCATION_RE = re.compile(
+    rf"""
+    (?<!\$)\$(?P<name>[a-zA-Zа-яА-Я0-9-_]+)
+    (?:<(?P<args>(?:[^<>"]++|(?<=\\)"|{_QUOTED})*+)>)?
+    """,
+    re.VERBOSE,
+)
+"""Вызов форматтера вместе со списком аргументов (если он корректен)."""
+
+ARG_RE = re.compile(rf'(?:[^,"]++|(?<=\\)"|{_QUOTED})*+')
+"""Один аргумент внутри списка аргументов (до запятой вне кавычек)."""
+
+_NUMBER_START = frozenset('0123456789+-.iInN')
+
 
 @dataclass
 class Invocation:
@@ -75,11 +93,87 @@ def extract_calls(text: str, /) -> TextWithFormattersInvocations:
     - Последовательность `$$` интерпретируется как литеральный символ `$`
       и не считается началом вызова.
 
+    Текст разбирается за один проход `INVOCATION_RE`. Тексты с некорректными списками
+    аргументов и с `$` внутри аргументов разбираются посимвольно (`_extract_calls_slow`),
+    результат при этом не отличается.
+
     :param text: Исходная строка для разбора.
     :return: Объект `TextWithFormattersInvocations`, содержащий исходный текст и
              список фрагментов (`str` и `Invocation`) в порядке следования.
     """
+    if '$' not in text:
+        return TextWithFormattersInvocations(text, [text] if text else [])
 
+    result = TextWithFormattersInvocations(text)
+    split = result.split
+    pos = 0
+
+    for m in INVOCATION_RE.finditer(text):
+        start, end = m.span()
+        name, args_text = m.group('name', 'args')
+
+        if args_text is None:
+            if end < len(text) and text[end] == '<':
+                # Некорректный список аргументов: ошибку сформирует посимвольный разбор.
+                return _extract_calls_slow(text)
+            args: list[Any] = []
+        elif '$' in args_text:
+            # Поиск вызовов продолжается внутри аргументов (как при посимвольном разборе).
+            return _extract_calls_slow(text)
+        else:
+            args = _split_args(args_text)
+
+        if start > pos:
+            split.append(text[pos:start])
+        split.append(Invocation(string=text[start:end], name=name, args=args))
+        pos = end
+
+    if pos < len(text):
+        split.append(text[pos:])
+
+    return result
+
+
+def _split_args(args_text: str) -> list[Any]:
+    """
+    Разбивает список аргументов (без угловых скобок) на аргументы и конвертирует их типы.
+    """
+    if not args_text:
+        return []
+
+    if '"' in args_text:
+        # Запятые внутри кавычек не разделяют аргументы.
+        pieces = []
+        pos = 0
+        while True:
+            end = ARG_RE.match(args_text, pos).end()
+            pieces.append(args_text[pos:end])
+            if end == len(args_text):
+                break
+            pos = end + 1
+    else:
+        pieces = args_text.split(',')
+
+    # Пустой последний аргумент допустим только без пробелов: `<a,>`.
+    if not pieces[-1]:
+        pieces.pop()
+
+    args: list[Any] = []
+    for piece in pieces:
+        if not (arg := piece.strip()):
+            raise ValueError('Unexpected ,')
+        args.append(_evaluate_type_cached(arg))
+    return args
+
+
+def _extract_calls_slow(text: str) -> TextWithFormattersInvocations:
+    """
+    Посимвольный разбор текста.
+
+    Используется для текстов, которые не разбираются `INVOCATION_RE` за один проход:
+    с некорректными списками аргументов (возбуждает соответствующую ошибку) и с `$`
+    внутри аргументов.
+    """
     result = TextWithFormattersInvocations(text)
     pos = 0
 
@@ -190,6 +284,10 @@ def evaluate_type(arg: str) -> Any:
         return False
     if arg == 'None':
         return None
+    if arg.isdecimal():
+        return int(arg)
+    if arg[0] not in _NUMBER_START and not arg[0].isdecimal():
+        return arg
     try:
         return int(arg)
     except ValueError:
@@ -201,3 +299,7 @@ def evaluate_type(arg: str) -> Any:
         pass
 
     return arg
+
+
+_evaluate_type_cached = lru_cache(maxsize=1024)(evaluate_type)
+"""`evaluate_type` с кэшем: аргументы в шаблонах часто повторяются, а результаты неизменяемы."""
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+
+__all__ = ['FormatterStats']
+
+
+from dataclasses import field, dataclass
+from collections import deque
+
+
+LATENCY_SAMPLES = 1024
+"""Кол-во последних замеров, по которым считаются перцентили времени выполнения."""
+
+
+@dataclass
+class FormatterStats:
+    """
+    Статистика выполнения форматтера.
+
+    Перцентили считаются по последним `LATENCY_SAMPLES` выполнениям, остальные
+    значения — за все время работы.
+    """
+
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    samples: deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    @property
+    def avg_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> float:
+        return self.percentile(95)
+
+    def percentile(self, percent: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def record(self, elapsed: float, error: bool = False, timeout: bool = False) -> None:
+        self.calls += 1
+        self.errors += error or timeout
+        self.timeouts += timeout
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.samples.append(elapsed)
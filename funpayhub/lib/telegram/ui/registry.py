@@ -12,10 +12,11 @@ from typing import Any, Type
 from dataclasses import field, dataclass
 
 from aiogram.types import Message
-from eventry.asyncio.callable_wrappers import CallableWrapper
 
 from funpayhub.loggers import telegram_ui as logger
 
+from funpayhub.lib.core import inject
+
 from .types import (
     Menu,
     Button,
@@ -56,8 +57,7 @@ class _MenuBuilder:
 
         if finalize and result.finalizer:
             try:
-                wrapped = CallableWrapper(result.finalizer)
-                result = await wrapped((context, result), data)
+                result = await inject(result.finalizer, (context, result), data)
             except:
                 import traceback
 
@@ -11,5 +11,6 @@ telegram = getLogger('funpayhub.telegram')
 telegram_ui = getLogger('funpayhub.telegram_ui')
 callbacks = getLogger('funpayhub.callbacks')
 offers_raiser = getLogger('funpayhub.offers_raiser')
+goods = getLogger('funpayhub.goods')
 
 greetings_logger = getLogger('funpayhub.greetings')
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+from pytest import fixture
+
+from funpayhub.lib.hub.text_formatters.parser import extract_calls, _extract_calls_slow
+
+
+INVOCATIONS_AMOUNT = 5_000
+ROUNDS = 5
+CHECK_TIMINGS = bool(os.environ.get('FUNPAYHUB_CHECK_BENCHMARKS'))
+"""Сравнивать время работы парсеров (на загруженных машинах замеры нестабильны)."""
+
+
+@fixture
+def long_template() -> str:
+    parts = [
+        'Спасибо за покупку, $message<username>! ',
+        'Заказ $order<id> на сумму $order<fullsum>. ',
+        'Время: $datetime<"%H:%M, %d.%m">, ваш товар:\n$goods\n',
+        '$image<123456> $me $plugin<1, 2.5, True, None, "a, \\"b\\"", text> $$escaped. ',
+    ]
+    return ''.join(parts[i % len(parts)] for i in range(INVOCATIONS_AMOUNT // 2))
+
+
+@pytest.mark.parametrize(
+    'text',
+    [
+        '',
+        'plain text',
+        '$a',
+        '$a<>',
+        '$a<1,>',
+        '$a<"x > y", 1.5, -2, True>tail',
+        '$a<"\\"q\\""> $$b $c<\\"x>',
+        '$a<$b>',
+        '$a<"$b">',
+    ],
+)
+def test_extract_calls_matches_slow_parser(text: str):
+    assert extract_calls(text) == _extract_calls_slow(text)
+
+
+@pytest.mark.parametrize('text', ['$a<', '$a<1, >', '$a<,1>', '$a<<>', '$a<"x>', '$a< >'])
+def test_extract_calls_errors_match_slow_parser(text: str):
+    with pytest.raises(ValueError) as slow_error:
+        _extract_calls_slow(text)
+    with pytest.raises(ValueError, match=str(slow_error.value)):
+        extract_calls(text)
+
+
+def test_extract_calls_matches_slow_parser_on_long_template(long_template: str):
+    assert extract_calls(long_template) == _extract_calls_slow(long_template)
+
+
+def test_extract_calls_benchmark(long_template: str):
+    timings, results = {}, {}
+    for parser in (_extract_calls_slow, extract_calls):
+        timings[parser] = float('inf')
+        for _ in range(ROUNDS):
+            started_at = time.perf_counter()
+            results[parser] = parser(long_template)
+            timings[parser] = min(timings[parser], time.perf_counter() - started_at)
+
+    assert results[extract_calls] == results[_extract_calls_slow]
+    if CHECK_TIMINGS:
+        assert timings[extract_calls] <= timings[_extract_calls_slow]
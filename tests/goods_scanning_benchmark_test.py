@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+from pytest import fixture
+
+from funpayhub.lib.goods_sources import FileGoodsSource
+from funpayhub.lib.goods_sources.scanning import scan_offsets
+
+
+PRODUCTS_AMOUNT = 200_000
+ROUNDS = 3
+CHECK_TIMINGS = bool(os.environ.get('FUNPAYHUB_CHECK_BENCHMARKS'))
+"""Сравнивать время работы бэкендов (на загруженных машинах замеры нестабильны)."""
+
+
+@fixture
+def normalized_goods() -> bytes:
+    return b''.join(f'login{i}:password{i}\n'.encode() for i in range(PRODUCTS_AMOUNT))
+
+
+@fixture
+def dirty_goods() -> bytes:
+    return b'\n\r\na\r\n\n\nb\nc\r\r\n\r\nd\n\ne'
+
+
+def _write(path: Path, data: bytes) -> Path:
+    path.write_bytes(data)
+    return path
+
+
+@pytest.mark.parametrize('data', ['normalized_goods', 'dirty_goods'])
+def test_scan_offsets_backends_match(tmp_path: Path, data: str, request: pytest.FixtureRequest):
+    path = _write(tmp_path / 'goods.txt', request.getfixturevalue(data))
+    assert scan_offsets(path, use_mmap=True) == scan_offsets(path, use_mmap=False)
+
+
+@pytest.mark.parametrize('data', ['normalized_goods', 'dirty_goods'])
+@pytest.mark.parametrize('use_cursor', [True, False])
+@pytest.mark.asyncio
+async def test_rewrite_backends_match(
+    tmp_path: Path,
+    data: str,
+    use_cursor: bool,
+    request: pytest.FixtureRequest,
+):
+    content = request.getfixturevalue(data)
+    results: dict[bool, tuple[bytes, list[str], list[str]]] = {}
+
+    for use_mmap in (True, False):
+        path = _write(tmp_path / f'goods_{use_mmap}.txt', content)
+        source = FileGoodsSource(path, use_cursor=use_cursor, use_mmap=use_mmap)
+        await source.load()
+        await source.wait_counted()
+
+        popped = await source.pop_goods(2)
+        await source.remove_goods(1, 1)
+        rest = await source.get_goods(-1)
+        await source.unload()
+        results[use_mmap] = path.read_bytes(), popped, rest
+
+    assert results[True] == results[False]
+
+
+def test_scan_offsets_benchmark(tmp_path: Path, normalized_goods: bytes):
+    path = _write(tmp_path / 'goods.txt', normalized_goods)
+
+    timings, results = {}, {}
+    for use_mmap in (False, True):
+        timings[use_mmap] = float('inf')
+        for _ in range(ROUNDS):
+            started_at = time.perf_counter()
+            results[use_mmap] = scan_offsets(path, use_mmap=use_mmap)
+            timings[use_mmap] = min(timings[use_mmap], time.perf_counter() - started_at)
+
+    assert len(results[True]) == PRODUCTS_AMOUNT
+    assert results[True] == results[False]
+    if CHECK_TIMINGS:
+        assert timings[True] <= timings[False]
+
+
+@pytest.mark.asyncio
+async def test_remove_goods_benchmark(tmp_path: Path, normalized_goods: bytes):
+    timings, results = {}, {}
+    for use_mmap in (False, True):
+        timings[use_mmap] = float('inf')
+        for i in range(ROUNDS):
+            path = _write(tmp_path / f'goods_{use_mmap}_{i}.txt', normalized_goods)
+            source = FileGoodsSource(path, use_mmap=use_mmap)
+            await source.load()
+            await source.wait_counted()
+
+            started_at = time.perf_counter()
+            await source.remove_goods(PRODUCTS_AMOUNT // 2, 1)
+            timings[use_mmap] = min(timings[use_mmap], time.perf_counter() - started_at)
+            assert len(source) == PRODUCTS_AMOUNT - 1
+            results[use_mmap] = path.read_bytes()
+
+    assert results[True] == results[False]
+    if CHECK_TIMINGS:
+        assert timings[True] <= timings[False]
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from funpayhub.lib.exceptions import GoodsError
+from funpayhub.lib.goods_sources import FileGoodsSource, GoodsSourcesManager
+
+
+@pytest.mark.asyncio
+async def test_pop_goods_raises_when_counting_fails(tmp_path: Path):
+    path = tmp_path / 'goods.txt'
+    path.write_text('a\nb\nc\n', encoding='utf-8')
+
+    manager = GoodsSourcesManager(batch_window=0)
+    source = await manager.add_source(FileGoodsSource, path)
+
+    async def broken_wait_counted() -> None:
+        raise OSError('Broken goods file.')
+
+    source.wait_counted = broken_wait_counted  # type: ignore[method-assign]
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            manager.pop_goods(source.source_id, 1),
+            manager.pop_goods(source.source_id, 2),
+            return_exceptions=True,
+        ),
+        timeout=5,
+    )
+
+    assert all(isinstance(i, GoodsError) for i in results)
+    assert all(isinstance(i.__cause__, OSError) for i in results)
+
+
+@pytest.mark.asyncio
+async def test_refresh_sources_skips_hidden_files(tmp_path: Path):
+    (tmp_path / 'goods.txt').write_text('a\n', encoding='utf-8')
+    (tmp_path / '.goods.txt').write_text('b\n', encoding='utf-8')
+    (tmp_path / '.0123abcd.part').write_text('c\n', encoding='utf-8')
+
+    manager = GoodsSourcesManager()
+    await manager.refresh_sources(tmp_path)
+
+    assert [i.path.name for i in manager.values()] == ['goods.txt']